@@ -4,11 +4,26 @@ Database configuration management
 
 import os
 from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# First driver release that accepts liveness_check_timeout
+LIVENESS_CHECK_MIN_DRIVER = (5, 15)
+
+
+def _optional_float(value: Optional[str]) -> Optional[float]:
+    """Parse an optional float environment value ('' or unset means None)"""
+    return float(value) if value not in (None, '') else None
+
+
+def _driver_version() -> Tuple[int, ...]:
+    """(major, minor) of the installed neo4j driver"""
+    import neo4j
+    return tuple(int(part) for part in neo4j.__version__.split(".")[:2] if part.isdigit())
+
 
 @dataclass
 class DatabaseConfig:
@@ -16,6 +31,39 @@ class DatabaseConfig:
     uri: str
     username: str
     password: str
+    batch_size: int = 1000
+    fetch_size: int = 1000
+    # Connection pool tuning
+    max_connection_pool_size: int = 100
+    connection_acquisition_timeout: float = 60.0
+    max_connection_lifetime: float = 3600.0
+    # Only passed to the driver when set; needs neo4j >= 5.15
+    liveness_check_timeout: Optional[float] = None
+    keep_alive: bool = True
+    # Chain bookmarks across sessions so reads see this process's earlier writes
+    causal_consistency: bool = True
+    # EXPLAIN every registered query on connect to fill the plan cache
+    warm_up_queries: bool = True
+    # Read-through entity cache (size 0 disables it)
+    entity_cache_size: int = 10000
+    entity_cache_ttl: float = 30.0
+    entity_cache_negative_ttl: float = 5.0
+    # Friend-of-friend suggestions: relationships expanded per player and cache lifetime (0 disables caching)
+    friend_suggestion_degree_cap: int = 200
+    friend_suggestion_cache_ttl: float = 300.0
+    # Bloom filter of known ids per label (memory 0 disables it)
+    existence_index_memory: int = 1024 * 1024
+    existence_index_trust_positive: bool = False
+    existence_index_reconcile_interval: float = 300.0
+    # Parallel relationship writes: worker sessions and retries of deadlocked chunks
+    parallel_write_workers: int = 4
+    write_retry_attempts: int = 5
+    write_retry_backoff: float = 0.05
+    # In-memory leaderboards for rank lookups, reloaded from the database this often (0: on first use only)
+    leaderboard_in_memory: bool = True
+    leaderboard_reload_interval: float = 300.0
+    # Analytics snapshots are rebuilt after writes and at most this old (None: writes only)
+    snapshot_max_staleness: Optional[float] = 60.0
 
     @classmethod
     def from_environment(cls):
@@ -23,5 +71,47 @@ class DatabaseConfig:
         return cls(
             uri=os.getenv('NEO4J_URI', 'bolt://localhost:7687'),
             username=os.getenv('NEO4J_USER', 'neo4j'),
-            password=os.getenv('NEO4J_PASSWORD', 'gamepass123')
-        )
\ No newline at end of file
+            password=os.getenv('NEO4J_PASSWORD', 'gamepass123'),
+            batch_size=int(os.getenv('NEO4J_BATCH_SIZE', '1000')),
+            fetch_size=int(os.getenv('NEO4J_FETCH_SIZE', '1000')),
+            max_connection_pool_size=int(os.getenv('NEO4J_MAX_POOL_SIZE', '100')),
+            connection_acquisition_timeout=float(os.getenv('NEO4J_ACQUISITION_TIMEOUT', '60')),
+            max_connection_lifetime=float(os.getenv('NEO4J_MAX_CONNECTION_LIFETIME', '3600')),
+            liveness_check_timeout=_optional_float(os.getenv('NEO4J_LIVENESS_CHECK_TIMEOUT')),
+            keep_alive=os.getenv('NEO4J_KEEP_ALIVE', 'true').lower() in ('1', 'true', 'yes'),
+            causal_consistency=os.getenv('NEO4J_CAUSAL_CONSISTENCY', 'true').lower() in ('1', 'true', 'yes'),
+            warm_up_queries=os.getenv('NEO4J_WARM_UP_QUERIES', 'true').lower() in ('1', 'true', 'yes'),
+            entity_cache_size=int(os.getenv('ENTITY_CACHE_SIZE', '10000')),
+            entity_cache_ttl=float(os.getenv('ENTITY_CACHE_TTL', '30')),
+            entity_cache_negative_ttl=float(os.getenv('ENTITY_CACHE_NEGATIVE_TTL', '5')),
+            friend_suggestion_degree_cap=int(os.getenv('FRIEND_SUGGESTION_DEGREE_CAP', '200')),
+            friend_suggestion_cache_ttl=float(os.getenv('FRIEND_SUGGESTION_CACHE_TTL', '300')),
+            existence_index_memory=int(os.getenv('EXISTENCE_INDEX_MEMORY', str(1024 * 1024))),
+            existence_index_trust_positive=os.getenv('EXISTENCE_INDEX_TRUST_POSITIVE', 'false').lower() in ('1', 'true', 'yes'),
+            existence_index_reconcile_interval=float(os.getenv('EXISTENCE_INDEX_RECONCILE_INTERVAL', '300')),
+            parallel_write_workers=int(os.getenv('PARALLEL_WRITE_WORKERS', '4')),
+            write_retry_attempts=int(os.getenv('WRITE_RETRY_ATTEMPTS', '5')),
+            write_retry_backoff=float(os.getenv('WRITE_RETRY_BACKOFF', '0.05')),
+            leaderboard_in_memory=os.getenv('LEADERBOARD_IN_MEMORY', 'true').lower() in ('1', 'true', 'yes'),
+            leaderboard_reload_interval=float(os.getenv('LEADERBOARD_RELOAD_INTERVAL', '300')),
+            snapshot_max_staleness=_optional_float(os.getenv('SNAPSHOT_MAX_STALENESS', '60'))
+        )
+
+    def driver_options(self) -> Dict[str, Any]:
+        """Keyword arguments for GraphDatabase.driver / AsyncGraphDatabase.driver"""
+        options = {
+            "max_connection_pool_size": self.max_connection_pool_size,
+            "connection_acquisition_timeout": self.connection_acquisition_timeout,
+            "max_connection_lifetime": self.max_connection_lifetime,
+            "keep_alive": self.keep_alive,
+            "fetch_size": self.fetch_size
+        }
+        # Drivers reject unknown keys, so unset options are left out entirely
+        if self.liveness_check_timeout is not None:
+            if _driver_version() < LIVENESS_CHECK_MIN_DRIVER:
+                raise ValueError(
+                    "NEO4J_LIVENESS_CHECK_TIMEOUT needs neo4j >= 5.15; "
+                    "upgrade the driver or leave the setting empty"
+                )
+            options["liveness_check_timeout"] = self.liveness_check_timeout
+        return options
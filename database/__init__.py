@@ -3,5 +3,7 @@ Database package
 """
 
 from .connection import Neo4jConnection
+from .async_connection import AsyncNeo4jConnection
+from .unit_of_work import UnitOfWork
 
-__all__ = ['Neo4jConnection']
+__all__ = ['Neo4jConnection', 'AsyncNeo4jConnection', 'UnitOfWork']
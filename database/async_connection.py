@@ -0,0 +1,163 @@
+"""
+Asyncio Neo4j connection management
+"""
+
+from neo4j import AsyncGraphDatabase, AsyncDriver, AsyncSession, READ_ACCESS, WRITE_ACCESS
+from config.database_config import DatabaseConfig
+from database.pool_monitor import PoolMonitor
+from database.query_monitor import QueryMonitor
+from queries.registry import QUERY_REGISTRY, QueryRegistry
+from database.unit_of_work import UnitOfWork
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class AsyncNeo4jConnection:
+    """Handles Neo4j database connections on the asyncio driver"""
+
+    def __init__(self, config: DatabaseConfig):
+        self.config = config
+        self.pool_monitor = PoolMonitor()
+        self.query_monitor = QueryMonitor(QUERY_REGISTRY)
+        self.bookmark_manager = None
+        # State shared by every repository bound to this connection (caches, indexes)
+        self.shared: Dict[str, Any] = {}
+        self.driver: Optional[AsyncDriver] = None
+
+    async def connect(self) -> bool:
+        """Establish connection to Neo4j database"""
+        try:
+            self.driver = AsyncGraphDatabase.driver(
+                self.config.uri,
+                auth=(self.config.username, self.config.password),
+                **self.config.driver_options()
+            )
+            if self.config.causal_consistency:
+                self.bookmark_manager = AsyncGraphDatabase.bookmark_manager()
+
+            self.pool_monitor.instrument_async(self.driver)
+
+            # Test connection
+            await self.driver.verify_connectivity()
+
+            if self.config.warm_up_queries:
+                await self.warm_up_queries()
+
+            logger.info(f"✅ Connected to Neo4j (async) at {self.config.uri}")
+            return True
+
+        except Exception as e:
+            logger.error(f"❌ Failed to connect to Neo4j: {e}")
+            return False
+
+    async def close(self) -> None:
+        """Close database connection"""
+        if self.driver:
+            await self.driver.close()
+            logger.info("🔌 Neo4j async connection closed")
+
+    def get_session(self, **session_config) -> AsyncSession:
+        """Get database session; keyword arguments are passed to driver.session().
+
+        With causal consistency enabled every session shares the connection's
+        bookmark manager, so a read always observes earlier writes made through
+        this connection, even when it is routed to a follower or read replica.
+        """
+        if not self.driver:
+            raise ConnectionError("Database not connected. Call connect() first.")
+        if self.bookmark_manager is not None and 'bookmarks' not in session_config:
+            session_config.setdefault('bookmark_manager', self.bookmark_manager)
+        return self.driver.session(**session_config)
+
+    def read_session(self, **session_config) -> AsyncSession:
+        """Get a READ-mode session that the cluster can route to any reader"""
+        return self.get_session(default_access_mode=READ_ACCESS, **session_config)
+
+    def write_session(self, **session_config) -> AsyncSession:
+        """Get a WRITE-mode session routed to the leader"""
+        return self.get_session(default_access_mode=WRITE_ACCESS, **session_config)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool occupancy, acquisition wait times and timeouts"""
+        return self.pool_monitor.snapshot(self.driver, self.config.max_connection_pool_size)
+
+    async def warm_up_queries(self, registry: QueryRegistry = QUERY_REGISTRY) -> int:
+        """EXPLAIN every registered query so the server has its plan cached.
+
+        Each query is planned in a session of its own access mode, so a cluster
+        warms the members that will actually run it. Schema changes evict
+        cached plans, so warm up again after creating indexes or constraints.
+        Returns the number of queries planned.
+        """
+        warmed = 0
+        for access_mode in (READ_ACCESS, WRITE_ACCESS):
+            queries = [query for query in registry if query.access_mode == access_mode]
+            if not queries:
+                continue
+            async with self.get_session(default_access_mode=access_mode) as session:
+                for query in queries:
+                    started = time.perf_counter()
+                    try:
+                        result = await session.run("EXPLAIN " + query.cypher, query.parameters)
+                        summary = await result.consume()
+                    except Exception as e:
+                        logger.warning(f"Plan warm-up failed for {query.name}: {e}")
+                        continue
+                    planning = summary.result_available_after
+                    self.query_monitor.record_planning(
+                        query.name,
+                        planning / 1000 if planning is not None else time.perf_counter() - started
+                    )
+                    warmed += 1
+
+        logger.info(f"🔥 Warmed up {warmed}/{len(registry)} query plans")
+        return warmed
+
+    def query_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Planning and execution timings per named query"""
+        return self.query_monitor.snapshot()
+
+    @asynccontextmanager
+    async def unit_of_work(self) -> AsyncIterator[UnitOfWork]:
+        """Open an explicit transaction shared by every async repository of the unit of work.
+
+        Commits when the block exits normally and rolls back on any exception.
+        The block runs once; use run_unit_of_work() for automatic retries.
+        """
+        async with self.write_session() as session:
+            async with await session.begin_transaction() as tx:
+                uow = UnitOfWork(self, tx)
+                yield uow
+                await tx.commit()
+        uow.committed()
+
+    async def run_unit_of_work(self, work: Callable[[UnitOfWork], Awaitable[T]]) -> T:
+        """Await work(uow) in a managed write transaction, retried on transient errors"""
+        attempts: List[UnitOfWork] = []
+
+        async def transaction_function(tx):
+            attempts.append(UnitOfWork(self, tx))
+            return await work(attempts[-1])
+
+        async with self.write_session() as session:
+            result = await session.execute_write(transaction_function)
+        attempts[-1].committed()
+        return result
+
+    async def test_connection(self) -> bool:
+        """Test if connection is working"""
+        try:
+            async with self.get_session() as session:
+                result = await session.run("RETURN 'Connection OK' as message")
+                record = await result.single()
+                logger.info(f"🧪 Connection test: {record['message']}")
+                return True
+        except Exception as e:
+            logger.error(f"❌ Connection test failed: {e}")
+            return False
@@ -2,21 +2,34 @@
 Neo4j connection management
 """
 
-from neo4j import GraphDatabase, Driver, Session
+from neo4j import GraphDatabase, Driver, Session, READ_ACCESS, WRITE_ACCESS
 from config.database_config import DatabaseConfig
-from typing import Optional
+from database.pool_monitor import PoolMonitor
+from database.query_monitor import QueryMonitor
+from queries.registry import QUERY_REGISTRY, QueryRegistry
+from database.unit_of_work import UnitOfWork
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
 import logging
+import time
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+T = TypeVar('T')
+
 
 class Neo4jConnection:
     """Handles Neo4j database connections"""
 
     def __init__(self, config: DatabaseConfig):
         self.config = config
+        self.pool_monitor = PoolMonitor()
+        self.query_monitor = QueryMonitor(QUERY_REGISTRY)
+        self.bookmark_manager = None
+        # State shared by every repository bound to this connection (caches, indexes)
+        self.shared: Dict[str, Any] = {}
         self.driver: Optional[Driver] = None
 
     def connect(self) -> bool:
@@ -24,12 +37,19 @@ class Neo4jConnection:
         try:
             self.driver = GraphDatabase.driver(
                 self.config.uri,
-                auth=(self.config.username, self.config.password)
+                auth=(self.config.username, self.config.password),
+                **self.config.driver_options()
             )
+            if self.config.causal_consistency:
+                self.bookmark_manager = GraphDatabase.bookmark_manager()
+
+            self.pool_monitor.instrument(self.driver)
 
             # Test connection
-            with self.driver.session() as session:
-                session.run("RETURN 1")
+            self.driver.verify_connectivity()
+
+            if self.config.warm_up_queries:
+                self.warm_up_queries()
 
             logger.info(f"✅ Connected to Neo4j at {self.config.uri}")
             return True
@@ -44,11 +64,97 @@ class Neo4jConnection:
             self.driver.close()
             logger.info("🔌 Neo4j connection closed")
 
-    def get_session(self) -> Session:
-        """Get database session"""
+    def get_session(self, **session_config) -> Session:
+        """Get database session; keyword arguments are passed to driver.session().
+
+        With causal consistency enabled every session shares the connection's
+        bookmark manager, so a read always observes earlier writes made through
+        this connection, even when it is routed to a follower or read replica.
+        """
         if not self.driver:
             raise ConnectionError("Database not connected. Call connect() first.")
-        return self.driver.session()
+        if self.bookmark_manager is not None and 'bookmarks' not in session_config:
+            session_config.setdefault('bookmark_manager', self.bookmark_manager)
+        return self.driver.session(**session_config)
+
+    def read_session(self, **session_config) -> Session:
+        """Get a READ-mode session that the cluster can route to any reader"""
+        return self.get_session(default_access_mode=READ_ACCESS, **session_config)
+
+    def write_session(self, **session_config) -> Session:
+        """Get a WRITE-mode session routed to the leader"""
+        return self.get_session(default_access_mode=WRITE_ACCESS, **session_config)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool occupancy, acquisition wait times and timeouts"""
+        return self.pool_monitor.snapshot(self.driver, self.config.max_connection_pool_size)
+
+    def warm_up_queries(self, registry: QueryRegistry = QUERY_REGISTRY) -> int:
+        """EXPLAIN every registered query so the server has its plan cached.
+
+        Each query is planned in a session of its own access mode, so a cluster
+        warms the members that will actually run it. Schema changes evict
+        cached plans, so warm up again after creating indexes or constraints.
+        Returns the number of queries planned.
+        """
+        warmed = 0
+        for access_mode in (READ_ACCESS, WRITE_ACCESS):
+            queries = [query for query in registry if query.access_mode == access_mode]
+            if not queries:
+                continue
+            with self.get_session(default_access_mode=access_mode) as session:
+                for query in queries:
+                    started = time.perf_counter()
+                    try:
+                        result = session.run("EXPLAIN " + query.cypher, query.parameters)
+                        summary = result.consume()
+                    except Exception as e:
+                        logger.warning(f"Plan warm-up failed for {query.name}: {e}")
+                        continue
+                    planning = summary.result_available_after
+                    self.query_monitor.record_planning(
+                        query.name,
+                        planning / 1000 if planning is not None else time.perf_counter() - started
+                    )
+                    warmed += 1
+
+        logger.info(f"🔥 Warmed up {warmed}/{len(registry)} query plans")
+        return warmed
+
+    def query_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Planning and execution timings per named query"""
+        return self.query_monitor.snapshot()
+
+    @contextmanager
+    def unit_of_work(self) -> Iterator[UnitOfWork]:
+        """Open an explicit transaction shared by every repository of the unit of work.
+
+        Commits when the block exits normally and rolls back on any exception.
+        The block runs once; use run_unit_of_work() for automatic retries.
+        """
+        with self.write_session() as session:
+            with session.begin_transaction() as tx:
+                uow = UnitOfWork(self, tx)
+                yield uow
+                tx.commit()
+        uow.committed()
+
+    def run_unit_of_work(self, work: Callable[[UnitOfWork], T]) -> T:
+        """Run work(uow) in a managed write transaction, retried on transient errors.
+
+        The function may be called more than once, so it must not have side
+        effects outside the transaction.
+        """
+        attempts: List[UnitOfWork] = []
+
+        def transaction_function(tx):
+            attempts.append(UnitOfWork(self, tx))
+            return work(attempts[-1])
+
+        with self.write_session() as session:
+            result = session.execute_write(transaction_function)
+        attempts[-1].committed()
+        return result
 
     def test_connection(self) -> bool:
         """Test if connection is working"""
@@ -0,0 +1,131 @@
+"""
+Connection pool telemetry
+"""
+
+from collections import deque
+from typing import Any, Dict, Tuple
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Number of recent acquisition wait times kept for percentiles
+WAIT_SAMPLE_SIZE = 1024
+
+
+class PoolMonitor:
+    """Records connection acquisitions and reports pool occupancy.
+
+    The driver has no public pool metrics, so the monitor wraps the pool's
+    acquire() and reads its connection lists. Both are driver internals: if
+    they are missing the monitor logs a warning and reports what it can.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=WAIT_SAMPLE_SIZE)
+        self.acquisitions = 0
+        self.acquisition_timeouts = 0
+        self.acquisition_failures = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, waited: float, error: Exception = None) -> None:
+        """Record one acquisition attempt and how long it waited"""
+        with self._lock:
+            self._waits.append(waited)
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            if error is None:
+                self.acquisitions += 1
+            elif self._is_acquisition_timeout(error):
+                self.acquisition_timeouts += 1
+            else:
+                self.acquisition_failures += 1
+
+    @staticmethod
+    def _is_acquisition_timeout(error: Exception) -> bool:
+        """Tell acquisition timeouts apart from other connection errors"""
+        return ("AcquisitionTimeout" in type(error).__name__
+                or "failed to obtain a connection from the pool" in str(error))
+
+    def instrument(self, driver) -> bool:
+        """Wrap a sync driver's pool.acquire() to time acquisitions"""
+        pool = getattr(driver, '_pool', None)
+        acquire = getattr(pool, 'acquire', None)
+        if acquire is None:
+            logger.warning("Connection pool telemetry unavailable for this driver version")
+            return False
+
+        def timed_acquire(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                connection = acquire(*args, **kwargs)
+            except Exception as e:
+                self.record(time.perf_counter() - started, e)
+                raise
+            self.record(time.perf_counter() - started)
+            return connection
+
+        pool.acquire = timed_acquire
+        return True
+
+    def instrument_async(self, driver) -> bool:
+        """Wrap an async driver's pool.acquire() to time acquisitions"""
+        pool = getattr(driver, '_pool', None)
+        acquire = getattr(pool, 'acquire', None)
+        if acquire is None:
+            logger.warning("Connection pool telemetry unavailable for this driver version")
+            return False
+
+        async def timed_acquire(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                connection = await acquire(*args, **kwargs)
+            except Exception as e:
+                self.record(time.perf_counter() - started, e)
+                raise
+            self.record(time.perf_counter() - started)
+            return connection
+
+        pool.acquire = timed_acquire
+        return True
+
+    @staticmethod
+    def connection_counts(driver) -> Tuple[int, int]:
+        """Count (in use, idle) connections across every server in the pool"""
+        connections = getattr(getattr(driver, '_pool', None), 'connections', None)
+        if not connections:
+            return 0, 0
+
+        in_use = idle = 0
+        try:
+            for server_connections in list(connections.values()):
+                for connection in list(server_connections):
+                    if getattr(connection, 'in_use', False):
+                        in_use += 1
+                    else:
+                        idle += 1
+        except RuntimeError:
+            # The pool changed while we were counting; report what we saw
+            pass
+        return in_use, idle
+
+    def snapshot(self, driver, max_pool_size: int) -> Dict[str, Any]:
+        """Current pool occupancy and acquisition statistics"""
+        in_use, idle = self.connection_counts(driver) if driver else (0, 0)
+        with self._lock:
+            waits = sorted(self._waits)
+            attempts = self.acquisitions + self.acquisition_timeouts + self.acquisition_failures
+            return {
+                "in_use": in_use,
+                "idle": idle,
+                "max_pool_size": max_pool_size,
+                "acquisitions": self.acquisitions,
+                "acquisition_timeouts": self.acquisition_timeouts,
+                "acquisition_failures": self.acquisition_failures,
+                "avg_wait_ms": round(self.total_wait / attempts * 1000, 3) if attempts else 0.0,
+                "p95_wait_ms": round(waits[int(len(waits) * 0.95) - 1] * 1000, 3) if waits else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3)
+            }
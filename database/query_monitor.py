@@ -0,0 +1,90 @@
+"""
+Per-query planning and execution telemetry
+"""
+
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+import threading
+import time
+
+# Number of recent execution times kept per query for percentiles
+TIMING_SAMPLE_SIZE = 256
+
+# Name under which statements missing from the registry are recorded
+UNREGISTERED = "unregistered"
+
+
+class _QueryTimings:
+    """Timings of one named query"""
+
+    def __init__(self):
+        self.executions = deque(maxlen=TIMING_SAMPLE_SIZE)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.planning: Optional[float] = None
+
+
+class QueryMonitor:
+    """Records planning times (from warm-up) and execution times per named query.
+
+    Statements are named through the query registry; anything not registered
+    is recorded under UNREGISTERED.
+    """
+
+    def __init__(self, registry):
+        self.registry = registry
+        self._lock = threading.Lock()
+        self._timings: Dict[str, _QueryTimings] = {}
+
+    def _entry(self, name: str) -> _QueryTimings:
+        """Timings for a name, created on first use (caller holds the lock)"""
+        if name not in self._timings:
+            self._timings[name] = _QueryTimings()
+        return self._timings[name]
+
+    def record_planning(self, name: str, seconds: float) -> None:
+        """Record how long the server took to plan a query"""
+        with self._lock:
+            self._entry(name).planning = seconds
+
+    def record_execution(self, cypher: str, seconds: float, error: Exception = None) -> None:
+        """Record one execution of a statement"""
+        name = self.registry.name_for(cypher) or UNREGISTERED
+        with self._lock:
+            timings = self._entry(name)
+            timings.executions.append(seconds)
+            timings.count += 1
+            timings.total += seconds
+            timings.max = max(timings.max, seconds)
+            if error is not None:
+                timings.errors += 1
+
+    @contextmanager
+    def timed(self, cypher: str) -> Iterator[None]:
+        """Time the enclosed execution of a statement"""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.record_execution(cypher, time.perf_counter() - started, e)
+            raise
+        self.record_execution(cypher, time.perf_counter() - started)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Planning and execution statistics per query name"""
+        with self._lock:
+            report = {}
+            for name, timings in sorted(self._timings.items()):
+                executions = sorted(timings.executions)
+                report[name] = {
+                    "planning_ms": round(timings.planning * 1000, 3) if timings.planning is not None else None,
+                    "executions": timings.count,
+                    "errors": timings.errors,
+                    "avg_ms": round(timings.total / timings.count * 1000, 3) if timings.count else 0.0,
+                    "p95_ms": round(executions[int(len(executions) * 0.95) - 1] * 1000, 3) if executions else 0.0,
+                    "max_ms": round(timings.max * 1000, 3)
+                }
+            return report
@@ -0,0 +1,35 @@
+"""
+Unit of work: several repositories sharing one Neo4j transaction
+"""
+
+from typing import Any, Callable, Dict, List, Type, TypeVar
+
+R = TypeVar('R')
+
+
+class UnitOfWork:
+    """Binds repositories to a single transaction"""
+
+    def __init__(self, connection, transaction):
+        self.connection = connection
+        self.transaction = transaction
+        self._repositories: Dict[type, Any] = {}
+        self._after_commit: List[Callable[[], None]] = []
+
+    def repository(self, repository_class: Type[R]) -> R:
+        """Get a repository of the given class bound to this transaction"""
+        if repository_class not in self._repositories:
+            self._repositories[repository_class] = repository_class(
+                self.connection, transaction=self.transaction, unit_of_work=self
+            )
+        return self._repositories[repository_class]
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """Run callback once the transaction has committed (e.g. cache invalidation)"""
+        self._after_commit.append(callback)
+
+    def committed(self) -> None:
+        """Run the after-commit callbacks; called by the connection after a successful commit"""
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            callback()
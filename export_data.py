@@ -0,0 +1,74 @@
+"""
+Export command: stream the gaming graph to JSONL or Parquet files
+
+Usage:
+    python export_data.py exports/2024-06-01
+    python export_data.py exports/nightly --format parquet --workers 4
+    python export_data.py exports/owns --types OWNS RATED --labels
+    python export_data.py exports/nightly --verify
+
+Each label and relationship type is written to its own directory of part
+files, with a manifest.json recording the row count and SHA-256 of every
+file (see services/export_service.py).
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+
+from config import DatabaseConfig
+from database import Neo4jConnection
+from services.export_service import DEFAULT_ROWS_PER_FILE, EXPORT_FORMATS, ExportService, verify_export
+from utils import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def parse_arguments(argv=None) -> argparse.Namespace:
+    """Command line options"""
+    parser = argparse.ArgumentParser(description="Export Neo4j labels and relationship types to chunked files")
+    parser.add_argument("directory", help="export directory (manifest.json is written there)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="jsonl", help="file format (default: jsonl)")
+    parser.add_argument("--rows-per-file", type=int, default=DEFAULT_ROWS_PER_FILE, help="rows per part file")
+    parser.add_argument("--workers", type=int, default=1, help="labels and types exported in parallel")
+    parser.add_argument("--labels", nargs="*", help="only these labels (none: no nodes)")
+    parser.add_argument("--types", nargs="*", help="only these relationship types (none: no relationships)")
+    parser.add_argument("--verify", action="store_true", help="check an existing export against its manifest")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """Export (or verify) and exit with status 1 on failure"""
+    arguments = parse_arguments(argv)
+    if arguments.verify:
+        problems = verify_export(arguments.directory)
+        for problem in problems:
+            logger.error(f"❌ {problem}")
+        if not problems:
+            logger.info(f"✅ {arguments.directory} matches its manifest")
+        return 1 if problems else 0
+
+    connection = Neo4jConnection(DatabaseConfig.from_environment())
+    if not connection.connect():
+        logger.error("❌ Failed to connect to Neo4j database")
+        return 1
+
+    try:
+        ExportService(connection).export(
+            arguments.directory,
+            file_format=arguments.format,
+            rows_per_file=arguments.rows_per_file,
+            workers=arguments.workers,
+            labels=arguments.labels,
+            relationship_types=arguments.types
+        )
+        return 0
+
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    exit(main())
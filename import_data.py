@@ -0,0 +1,76 @@
+"""
+Bulk import command: load CSV or JSONL files into the gaming graph
+
+Usage:
+    python import_data.py games data/games.csv
+    python import_data.py players data/players-*.jsonl --batch-size 5000
+    python import_data.py owns data/owns.csv --checkpoint-dir .checkpoints --rejects owns.rejects.jsonl
+
+Kinds: developers, games, players, owns, rates, friends. Columns (or JSON
+keys) are the fields of the matching models.entities class; relationship
+files add the endpoint ids (player_id/game_id, or player1_id/player2_id for
+friends). Interrupted imports resume from their checkpoint; pass --restart
+to start over.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+
+from config import DatabaseConfig
+from database import Neo4jConnection
+from services.import_service import IMPORT_KINDS, ImportService
+from utils import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def parse_arguments(argv=None) -> argparse.Namespace:
+    """Command line options"""
+    parser = argparse.ArgumentParser(description="Import CSV or JSONL files into Neo4j in UNWIND batches")
+    parser.add_argument("kind", choices=sorted(IMPORT_KINDS), help="what the files contain")
+    parser.add_argument("paths", nargs="+", help="CSV or JSONL files, imported in order")
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="file format (default: from the extension)")
+    parser.add_argument("--batch-size", type=int, help="rows per transaction (default: NEO4J_BATCH_SIZE)")
+    parser.add_argument("--checkpoint-dir", help="where checkpoints are kept (default: next to each file)")
+    parser.add_argument("--restart", action="store_true", help="ignore existing checkpoints")
+    parser.add_argument("--rejects", help="append invalid rows to this JSONL file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """Import every file; exit status 1 if any file did not complete"""
+    arguments = parse_arguments(argv)
+    connection = Neo4jConnection(DatabaseConfig.from_environment())
+    if not connection.connect():
+        logger.error("❌ Failed to connect to Neo4j database")
+        return 1
+
+    try:
+        service = ImportService(connection)
+        completed = True
+        for path in arguments.paths:
+            report = service.import_file(
+                arguments.kind, path,
+                file_format=arguments.format,
+                batch_size=arguments.batch_size,
+                checkpoint_dir=arguments.checkpoint_dir,
+                restart=arguments.restart,
+                rejects_path=arguments.rejects
+            )
+            status = "✅" if report.completed else "❌"
+            logger.info(
+                f"{status} {path}: {report.rows_imported} rows imported, {report.rows_skipped} skipped, "
+                f"{report.rows_rejected} rejected, {report.rows_per_second:.0f} rows/s"
+            )
+            completed = completed and report.completed
+        return 0 if completed else 1
+
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    exit(main())
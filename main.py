@@ -9,9 +9,12 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from config import DatabaseConfig
 from database import Neo4jConnection
-from services import GameService, PlayerService, AnalyticsService
+from services import GameService, PlayerService, AnalyticsService, LeaderboardService, RecommendationService
 from models import Developer, Game, Player
-from repositories import DeveloperRepository
+from repositories import (
+    DeveloperRepository, GameRepository, PlayerRepository, entity_cache_stats, existence_index_stats,
+    leaderboard_stats
+)
 from queries import DatabaseQueries
 from utils import setup_logger
 from datetime import date
@@ -28,6 +31,8 @@ class GamingDatabaseApp:
         self.game_service = None
         self.player_service = None
         self.analytics_service = None
+        self.recommendation_service = None
+        self.leaderboard_service = None
         self.developer_repo = None
 
     def initialize(self) -> bool:
@@ -43,6 +48,8 @@ class GamingDatabaseApp:
         self.game_service = GameService(self.connection)
         self.player_service = PlayerService(self.connection)
         self.analytics_service = AnalyticsService(self.connection)
+        self.recommendation_service = RecommendationService(self.connection)
+        self.leaderboard_service = LeaderboardService(self.connection)
         self.developer_repo = DeveloperRepository(self.connection)
 
         logger.info("✅ Application initialized successfully")
@@ -70,8 +77,16 @@ class GamingDatabaseApp:
                 except Exception:
                     pass
 
+        # New indexes and constraints evict cached plans
+        self.connection.warm_up_queries()
+
         logger.info("✅ Database structure ready")
 
+    def load_existence_indexes(self):
+        """Load the in-memory id indexes consulted by the *_exists checks"""
+        for repository_class in (GameRepository, PlayerRepository, DeveloperRepository):
+            repository_class(self.connection).load_existence_index()
+
     def create_sample_data(self):
         """Create comprehensive sample data"""
         logger.info("📝 Creating comprehensive sample data...")
@@ -85,9 +100,8 @@ class GamingDatabaseApp:
             Developer("Nintendo EPD", 2015, "Japan", 800)
         ]
 
-        for dev in developers:
-            self.developer_repo.create_developer(dev)
-            logger.info(f"   🏢 Created developer: {dev.name}")
+        report = self.developer_repo.create_developers_bulk(developers)
+        logger.info(f"   🏢 Created {report.rows_written} developers")
 
         # Create Games
         games_data = [
@@ -239,6 +253,12 @@ class GamingDatabaseApp:
         # 5. Business Intelligence
         self._demo_business_intelligence()
 
+        # 6. Recommendations
+        self._demo_recommendations()
+
+        # 7. Leaderboards
+        self._demo_leaderboards()
+
         logger.info("\n" + "="*70)
         logger.info("✨ DEMONSTRATION COMPLETED")
         logger.info("="*70)
@@ -344,6 +364,35 @@ class GamingDatabaseApp:
         logger.info("   • Diverse price points appealing to different segments")
         logger.info("   • Strong relationships between players and games")
 
+    def _demo_recommendations(self):
+        """Demonstrate precomputed collaborative-filtering recommendations"""
+        logger.info("\n🎁 6. RECOMMENDATIONS")
+        logger.info("-" * 50)
+
+        self.recommendation_service.refresh_all()
+        for player_id in ['player001', 'player002']:
+            picks = self.recommendation_service.recommend_for_player(player_id, 3)
+            titles = ", ".join(game['title'] for game in picks) or "nothing new yet"
+            logger.info(f"👤 {player_id} might also like: {titles}")
+
+        similar = self.recommendation_service.recommend_for_game('witcher3', 3)
+        titles = ", ".join(f"{game['title']} ({game['score']:.2f})" for game in similar) or "none yet"
+        logger.info(f"🎮 Players who own The Witcher 3 also own: {titles}")
+
+    def _demo_leaderboards(self):
+        """Demonstrate top-N leaderboards and rank lookups"""
+        logger.info("\n🏆 7. LEADERBOARDS")
+        logger.info("-" * 50)
+
+        for metric in ("level", "total_playtime"):
+            top = self.leaderboard_service.top_players(metric, 3)
+            entries = ", ".join(f"#{entry['rank']} {entry['username']} ({entry['score']})" for entry in top)
+            logger.info(f"📶 Top players by {metric}: {entries}")
+
+        rank = self.leaderboard_service.player_rank('player001', 'level')
+        if rank:
+            logger.info(f"👤 player001 is #{rank['rank']} by level ({rank['score']})")
+
     def run(self):
         """Run the complete application"""
         try:
@@ -353,6 +402,7 @@ class GamingDatabaseApp:
 
             # Setup database
             self.setup_database()
+            self.load_existence_indexes()
 
             # Create sample data
             self.create_sample_data()
@@ -360,6 +410,13 @@ class GamingDatabaseApp:
             # Demonstrate features
             self.demonstrate_features()
 
+            logger.info(f"🏊 Connection pool: {self.connection.pool_stats()}")
+            logger.info(f"🗃️ Entity caches: {entity_cache_stats(self.connection)}")
+            logger.info(f"🔎 Existence indexes: {existence_index_stats(self.connection)}")
+            logger.info(f"🏆 Leaderboards: {leaderboard_stats(self.connection)}")
+            logger.info(f"⏱️ Query timings: {self.connection.query_stats()}")
+            logger.info(f"📸 Analytics snapshots: {self.analytics_service.snapshots.stats()}")
+
             logger.info("\n🎊 Application completed successfully!")
             logger.info("🌐 You can explore the data in Neo4j Browser at: http://localhost:7474")
             logger.info("🔑 Login with: neo4j / gamepass123")
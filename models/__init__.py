@@ -4,10 +4,10 @@ Models package
 
 from .entities import (
     Game, Player, Developer, Genre, Platform,
-    PlayerOwnsGame, PlayerRatesGame, PlayerFriendship
+    PlayerOwnsGame, PlayerRatesGame, PlayerFriendship, PurchaseStatus
 )
 
 __all__ = [
     'Game', 'Player', 'Developer', 'Genre', 'Platform',
-    'PlayerOwnsGame', 'PlayerRatesGame', 'PlayerFriendship'
+    'PlayerOwnsGame', 'PlayerRatesGame', 'PlayerFriendship', 'PurchaseStatus'
 ]
\ No newline at end of file
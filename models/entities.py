@@ -1,14 +1,18 @@
 # models/entities.py
 """
 Basic entities for the gaming domain
+
+Entities are slotted dataclasses: no per-instance __dict__, so large result
+sets hydrated as entities stay compact.
 """
 
 from dataclasses import dataclass
 from datetime import date
+from enum import Enum
 from typing import List, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class Game:
     """Game entity"""
     id: str
@@ -19,7 +23,7 @@ class Game:
     description: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Player:
     """Player entity"""
     id: str
@@ -30,7 +34,7 @@ class Player:
     total_playtime: int
 
 
-@dataclass
+@dataclass(slots=True)
 class Developer:
     """Developer entity"""
     name: str
@@ -39,14 +43,14 @@ class Developer:
     employees: int
 
 
-@dataclass
+@dataclass(slots=True)
 class Genre:
     """Game genre"""
     name: str
     description: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Platform:
     """Gaming platform"""
     name: str
@@ -54,14 +58,14 @@ class Platform:
 
 
 # Relationship data classes
-@dataclass
+@dataclass(slots=True)
 class PlayerOwnsGame:
     """Relationship: Player owns a Game"""
     purchase_date: date
     playtime: int
 
 
-@dataclass
+@dataclass(slots=True)
 class PlayerRatesGame:
     """Relationship: Player rates a Game"""
     rating: float
@@ -69,7 +73,21 @@ class PlayerRatesGame:
     review_text: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class PlayerFriendship:
     """Relationship: Players are friends"""
-    since: date
\ No newline at end of file
+    since: date
+
+
+# Operation results
+class PurchaseStatus(Enum):
+    """Outcome of a game purchase"""
+    CREATED = "created"
+    ALREADY_OWNED = "already_owned"
+    MISSING_PLAYER = "missing_player"
+    MISSING_GAME = "missing_game"
+
+    @property
+    def owned(self) -> bool:
+        """True when the player owns the game after the purchase"""
+        return self in (PurchaseStatus.CREATED, PurchaseStatus.ALREADY_OWNED)
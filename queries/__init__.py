@@ -4,10 +4,14 @@ Queries package initialization
 
 from .basic_queries import (
     DatabaseQueries, GameQueries, PlayerQueries,
-    DeveloperQueries, RelationshipQueries, AnalyticsQueries
+    DeveloperQueries, RelationshipQueries, AnalyticsQueries,
+    RecommendationQueries, ProjectionQueries, LeaderboardQueries
 )
+from .registry import NamedQuery, QueryRegistry, QUERY_REGISTRY
 
 __all__ = [
     'DatabaseQueries', 'GameQueries', 'PlayerQueries',
-    'DeveloperQueries', 'RelationshipQueries', 'AnalyticsQueries'
+    'DeveloperQueries', 'RelationshipQueries', 'AnalyticsQueries',
+    'RecommendationQueries', 'ProjectionQueries', 'LeaderboardQueries',
+    'NamedQuery', 'QueryRegistry', 'QUERY_REGISTRY'
 ]
\ No newline at end of file
@@ -2,6 +2,33 @@
 Basic Cypher queries for the gaming system
 """
 
+import re
+
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def _identifier(name: str) -> str:
+    """Validate a label or property name before it is interpolated into Cypher"""
+    if not _IDENTIFIER.match(name):
+        raise ValueError(f"Invalid Cypher identifier: {name!r}")
+    return f"`{name}`"
+
+
+def _describe_columns(expression: str, alias: str, percentile_count: int) -> str:
+    """RETURN columns summarizing an expression: sum, avg, min, max, stDev and percentiles"""
+    columns = [
+        f"sum({expression}) as {alias}_sum",
+        f"avg({expression}) as {alias}_avg",
+        f"min({expression}) as {alias}_min",
+        f"max({expression}) as {alias}_max",
+        f"stDev({expression}) as {alias}_stdev"
+    ]
+    columns += [
+        f"percentileCont({expression}, $percentile_{i}) as {alias}_percentile_{i}"
+        for i in range(percentile_count)
+    ]
+    return ",\n               ".join(columns)
+
 
 class DatabaseQueries:
     """Database setup and management queries"""
@@ -23,7 +50,10 @@ class DatabaseQueries:
         return [
             "CREATE INDEX game_title_index IF NOT EXISTS FOR (g:Game) ON (g.title)",
             "CREATE INDEX player_username_index IF NOT EXISTS FOR (p:Player) ON (p.username)",
-            "CREATE INDEX game_rating_index IF NOT EXISTS FOR (g:Game) ON (g.rating)"
+            "CREATE INDEX game_rating_index IF NOT EXISTS FOR (g:Game) ON (g.rating)",
+            "CREATE INDEX player_level_index IF NOT EXISTS FOR (p:Player) ON (p.level)",
+            "CREATE INDEX player_playtime_index IF NOT EXISTS FOR (p:Player) ON (p.total_playtime)",
+            "CREATE INDEX owns_playtime_index IF NOT EXISTS FOR ()-[o:OWNS]-() ON (o.playtime)"
         ]
 
     @staticmethod
@@ -45,11 +75,48 @@ class GameQueries:
             release_date: date($release_date),
             rating: $rating,
             price: $price,
-            description: $description
+            description: $description,
+            owner_count: 0,
+            rating_count: 0,
+            rating_sum: 0.0
         })
         RETURN g
         """
 
+    @staticmethod
+    def create_games_bulk():
+        """Create a batch of games from $rows"""
+        return """
+        UNWIND $rows AS row
+        CREATE (g:Game {
+            id: row.id,
+            title: row.title,
+            release_date: date(row.release_date),
+            rating: row.rating,
+            price: row.price,
+            description: row.description,
+            owner_count: 0,
+            rating_count: 0,
+            rating_sum: 0.0
+        })
+        """
+
+    @staticmethod
+    def merge_games_bulk():
+        """Create the games of $rows that do not exist yet, keyed by id"""
+        return """
+        UNWIND $rows AS row
+        MERGE (g:Game {id: row.id})
+        ON CREATE SET g.title = row.title,
+                      g.release_date = date(row.release_date),
+                      g.rating = row.rating,
+                      g.price = row.price,
+                      g.description = row.description,
+                      g.owner_count = 0,
+                      g.rating_count = 0,
+                      g.rating_sum = 0.0
+        """
+
     @staticmethod
     def get_all_games():
         """Get all games"""
@@ -61,6 +128,33 @@ class GameQueries:
         ORDER BY g.title
         """
 
+    @staticmethod
+    def get_games_first_page():
+        """Get the first page of games in title order"""
+        return """
+        MATCH (g:Game)
+        WHERE g.title IS NOT NULL
+        RETURN g.id as id, g.title as title, g.rating as rating,
+               g.release_date as release_date, g.price as price,
+               g.description as description
+        ORDER BY g.title, g.id
+        LIMIT $limit
+        """
+
+    @staticmethod
+    def get_games_page_after():
+        """Get the page of games that follows ($after_title, $after_id), seeking on the title index"""
+        return """
+        MATCH (g:Game)
+        WHERE g.title >= $after_title
+          AND (g.title > $after_title OR g.id > $after_id)
+        RETURN g.id as id, g.title as title, g.rating as rating,
+               g.release_date as release_date, g.price as price,
+               g.description as description
+        ORDER BY g.title, g.id
+        LIMIT $limit
+        """
+
     @staticmethod
     def get_game_by_id():
         """Get a specific game by ID"""
@@ -82,6 +176,34 @@ class GameQueries:
         LIMIT $limit
         """
 
+    @staticmethod
+    def repair_game_aggregates():
+        """Recompute the owner and rating aggregates of the games in $rows"""
+        return """
+        UNWIND $rows AS row
+        MATCH (g:Game {id: row.id})
+        CALL {
+            WITH g
+            MATCH (g)<-[rated:RATED]-(:Player)
+            RETURN count(rated) as rating_count, coalesce(sum(rated.rating), 0.0) as rating_sum
+        }
+        SET g.owner_count = COUNT { (g)<-[:OWNS]-(:Player) },
+            g.rating_count = rating_count,
+            g.rating_sum = rating_sum,
+            g.avg_user_rating = CASE WHEN rating_count = 0 THEN null
+                                     ELSE rating_sum / rating_count END
+        """
+
+    @staticmethod
+    def get_game_statistics(percentile_count: int = 0):
+        """Aggregate rating and price statistics over every game in one pass"""
+        return f"""
+        MATCH (g:Game)
+        RETURN count(g) as count,
+               {_describe_columns('g.rating', 'rating', percentile_count)},
+               {_describe_columns('g.price', 'price', percentile_count)}
+        """
+
 
 class PlayerQueries:
     """Queries related to players"""
@@ -101,6 +223,34 @@ class PlayerQueries:
         RETURN p
         """
 
+    @staticmethod
+    def create_players_bulk():
+        """Create a batch of players from $rows"""
+        return """
+        UNWIND $rows AS row
+        CREATE (p:Player {
+            id: row.id,
+            username: row.username,
+            email: row.email,
+            join_date: date(row.join_date),
+            level: row.level,
+            total_playtime: row.total_playtime
+        })
+        """
+
+    @staticmethod
+    def merge_players_bulk():
+        """Create the players of $rows that do not exist yet, keyed by id"""
+        return """
+        UNWIND $rows AS row
+        MERGE (p:Player {id: row.id})
+        ON CREATE SET p.username = row.username,
+                      p.email = row.email,
+                      p.join_date = date(row.join_date),
+                      p.level = row.level,
+                      p.total_playtime = row.total_playtime
+        """
+
     @staticmethod
     def get_all_players():
         """Get all players"""
@@ -112,6 +262,33 @@ class PlayerQueries:
         ORDER BY p.username
         """
 
+    @staticmethod
+    def get_players_first_page():
+        """Get the first page of players in username order"""
+        return """
+        MATCH (p:Player)
+        WHERE p.username IS NOT NULL
+        RETURN p.id as id, p.username as username, p.email as email,
+               p.join_date as join_date, p.level as level,
+               p.total_playtime as total_playtime
+        ORDER BY p.username, p.id
+        LIMIT $limit
+        """
+
+    @staticmethod
+    def get_players_page_after():
+        """Get the page of players that follows ($after_username, $after_id), seeking on the username index"""
+        return """
+        MATCH (p:Player)
+        WHERE p.username >= $after_username
+          AND (p.username > $after_username OR p.id > $after_id)
+        RETURN p.id as id, p.username as username, p.email as email,
+               p.join_date as join_date, p.level as level,
+               p.total_playtime as total_playtime
+        ORDER BY p.username, p.id
+        LIMIT $limit
+        """
+
     @staticmethod
     def get_player_by_id():
         """Get a specific player by ID"""
@@ -122,6 +299,16 @@ class PlayerQueries:
                p.total_playtime as total_playtime
         """
 
+    @staticmethod
+    def get_player_statistics(percentile_count: int = 0):
+        """Aggregate level and playtime statistics over every player in one pass"""
+        return f"""
+        MATCH (p:Player)
+        RETURN count(p) as count,
+               {_describe_columns('p.level', 'level', percentile_count)},
+               {_describe_columns('p.total_playtime', 'playtime', percentile_count)}
+        """
+
 
 class DeveloperQueries:
     """Queries related to developers"""
@@ -139,6 +326,30 @@ class DeveloperQueries:
         RETURN d
         """
 
+    @staticmethod
+    def create_developers_bulk():
+        """Create a batch of developers from $rows"""
+        return """
+        UNWIND $rows AS row
+        CREATE (d:Developer {
+            name: row.name,
+            founded_year: row.founded_year,
+            country: row.country,
+            employees: row.employees
+        })
+        """
+
+    @staticmethod
+    def merge_developers_bulk():
+        """Create the developers of $rows that do not exist yet, keyed by name"""
+        return """
+        UNWIND $rows AS row
+        MERGE (d:Developer {name: row.name})
+        ON CREATE SET d.founded_year = row.founded_year,
+                      d.country = row.country,
+                      d.employees = row.employees
+        """
+
     @staticmethod
     def get_all_developers():
         """Get all developers"""
@@ -149,6 +360,15 @@ class DeveloperQueries:
         ORDER BY d.name
         """
 
+    @staticmethod
+    def get_developer_by_name():
+        """Get a specific developer by name"""
+        return """
+        MATCH (d:Developer {name: $name})
+        RETURN d.name as name, d.founded_year as founded_year,
+               d.country as country, d.employees as employees
+        """
+
 
 class RelationshipQueries:
     """Queries for creating relationships"""
@@ -173,9 +393,45 @@ class RelationshipQueries:
             purchase_date: date($purchase_date),
             playtime: $playtime
         }]->(g)
+        SET g.owner_count = coalesce(g.owner_count, 0) + 1,
+            p.library_version = coalesce(p.library_version, 0) + 1
         RETURN p, g
         """
 
+    @staticmethod
+    def purchase_game():
+        """Idempotently create OWNS between player and game, reporting which endpoints exist"""
+        return """
+        OPTIONAL MATCH (p:Player {id: $player_id})
+        OPTIONAL MATCH (g:Game {id: $game_id})
+        FOREACH (_ IN CASE WHEN p IS NULL OR g IS NULL THEN [] ELSE [1] END |
+            MERGE (p)-[o:OWNS]->(g)
+            ON CREATE SET o.purchase_date = date($purchase_date), o.playtime = $playtime,
+                          g.owner_count = coalesce(g.owner_count, 0) + 1,
+                          p.library_version = coalesce(p.library_version, 0) + 1
+        )
+        RETURN p IS NOT NULL as player_found, g IS NOT NULL as game_found
+        """
+
+    @staticmethod
+    def purchase_games():
+        """Idempotently create OWNS between a player and every game in $game_ids"""
+        return """
+        OPTIONAL MATCH (p:Player {id: $player_id})
+        UNWIND $game_ids AS game_id
+        OPTIONAL MATCH (g:Game {id: game_id})
+        OPTIONAL MATCH (p)-[owned:OWNS]->(g)
+        WITH p, g, game_id, count(owned) > 0 AS already_owned
+        FOREACH (_ IN CASE WHEN p IS NULL OR g IS NULL OR already_owned THEN [] ELSE [1] END |
+            MERGE (p)-[o:OWNS]->(g)
+            ON CREATE SET o.purchase_date = date($purchase_date), o.playtime = $playtime,
+                          g.owner_count = coalesce(g.owner_count, 0) + 1,
+                          p.library_version = coalesce(p.library_version, 0) + 1
+        )
+        RETURN game_id, p IS NOT NULL as player_found, g IS NOT NULL as game_found,
+               already_owned
+        """
+
     @staticmethod
     def player_rates_game():
         """Create RATED relationship between player and game"""
@@ -187,6 +443,10 @@ class RelationshipQueries:
             review_date: date($review_date),
             review_text: $review_text
         }]->(g)
+        SET g.rating_count = coalesce(g.rating_count, 0) + 1,
+            g.rating_sum = coalesce(g.rating_sum, 0.0) + $rating,
+            p.library_version = coalesce(p.library_version, 0) + 1
+        SET g.avg_user_rating = g.rating_sum / g.rating_count
         RETURN p, g
         """
 
@@ -197,9 +457,156 @@ class RelationshipQueries:
         MATCH (p1:Player {id: $player1_id})
         MATCH (p2:Player {id: $player2_id})
         CREATE (p1)-[:FRIENDS_WITH {since: date($since)}]->(p2)
+        SET p1.friends_version = coalesce(p1.friends_version, 0) + 1,
+            p2.friends_version = coalesce(p2.friends_version, 0) + 1
         RETURN p1, p2
         """
 
+    @staticmethod
+    def get_friend_suggestions():
+        """Rank friends of friends by mutual friends, then shared owned games.
+
+        Both hops are capped at $degree_cap relationships per player, so a
+        player (or friend) with thousands of friends is sampled rather than
+        fully expanded. Only the $candidate_limit players with the most
+        mutual friends are checked for shared games. Returns one row with the
+        (capped) friend ids and up to $limit suggestions.
+        """
+        return """
+        MATCH (p:Player {id: $player_id})
+        CALL {
+            WITH p
+            MATCH (p)-[:FRIENDS_WITH]-(friend:Player)
+            RETURN friend
+            LIMIT $degree_cap
+        }
+        WITH p, collect(friend) as friends
+        CALL {
+            WITH p, friends
+            UNWIND friends AS friend
+            CALL {
+                WITH friend
+                MATCH (friend)-[:FRIENDS_WITH]-(candidate:Player)
+                RETURN candidate
+                LIMIT $degree_cap
+            }
+            WITH p, candidate, count(*) as mutual_friends
+            WHERE candidate <> p AND NOT (p)-[:FRIENDS_WITH]-(candidate)
+            WITH p, candidate, mutual_friends
+            ORDER BY mutual_friends DESC, candidate.id
+            LIMIT $candidate_limit
+            WITH candidate, mutual_friends,
+                 COUNT { (p)-[:OWNS]->(:Game)<-[:OWNS]-(candidate) } as shared_games
+            ORDER BY mutual_friends DESC, shared_games DESC, candidate.id
+            LIMIT $limit
+            RETURN collect({
+                id: candidate.id,
+                username: candidate.username,
+                mutual_friends: mutual_friends,
+                shared_games: shared_games
+            }) as suggestions
+        }
+        RETURN [friend IN friends | friend.id] as friend_ids, suggestions
+        """
+
+    @staticmethod
+    def developer_develops_game_bulk():
+        """Create a batch of DEVELOPED relationships from $rows"""
+        return """
+        UNWIND $rows AS row
+        MATCH (d:Developer {name: row.developer_name})
+        MATCH (g:Game {id: row.game_id})
+        CREATE (d)-[:DEVELOPED]->(g)
+        """
+
+    @staticmethod
+    def player_owns_game_bulk():
+        """Create a batch of OWNS relationships from $rows"""
+        return """
+        UNWIND $rows AS row
+        MATCH (p:Player {id: row.player_id})
+        MATCH (g:Game {id: row.game_id})
+        CREATE (p)-[:OWNS {
+            purchase_date: date(row.purchase_date),
+            playtime: row.playtime
+        }]->(g)
+        SET g.owner_count = coalesce(g.owner_count, 0) + 1,
+            p.library_version = coalesce(p.library_version, 0) + 1
+        """
+
+    @staticmethod
+    def merge_player_owns_game_bulk():
+        """Create the OWNS relationships of $rows that do not exist yet, updating aggregates only for new ones"""
+        return """
+        UNWIND $rows AS row
+        MATCH (p:Player {id: row.player_id})
+        MATCH (g:Game {id: row.game_id})
+        MERGE (p)-[o:OWNS]->(g)
+        ON CREATE SET o.purchase_date = date(row.purchase_date), o.playtime = row.playtime,
+                      g.owner_count = coalesce(g.owner_count, 0) + 1,
+                      p.library_version = coalesce(p.library_version, 0) + 1
+        """
+
+    @staticmethod
+    def player_rates_game_bulk():
+        """Create a batch of RATED relationships from $rows"""
+        return """
+        UNWIND $rows AS row
+        MATCH (p:Player {id: row.player_id})
+        MATCH (g:Game {id: row.game_id})
+        CREATE (p)-[:RATED {
+            rating: row.rating,
+            review_date: date(row.review_date),
+            review_text: row.review_text
+        }]->(g)
+        SET g.rating_count = coalesce(g.rating_count, 0) + 1,
+            g.rating_sum = coalesce(g.rating_sum, 0.0) + row.rating,
+            p.library_version = coalesce(p.library_version, 0) + 1
+        SET g.avg_user_rating = g.rating_sum / g.rating_count
+        """
+
+    @staticmethod
+    def merge_player_rates_game_bulk():
+        """Create the RATED relationships of $rows that do not exist yet, updating aggregates only for new ones"""
+        return """
+        UNWIND $rows AS row
+        MATCH (p:Player {id: row.player_id})
+        MATCH (g:Game {id: row.game_id})
+        MERGE (p)-[r:RATED]->(g)
+        ON CREATE SET r.rating = row.rating,
+                      r.review_date = date(row.review_date),
+                      r.review_text = row.review_text,
+                      g.rating_count = coalesce(g.rating_count, 0) + 1,
+                      g.rating_sum = coalesce(g.rating_sum, 0.0) + row.rating,
+                      p.library_version = coalesce(p.library_version, 0) + 1
+        SET g.avg_user_rating = g.rating_sum / g.rating_count
+        """
+
+    @staticmethod
+    def players_are_friends_bulk():
+        """Create a batch of FRIENDS_WITH relationships from $rows"""
+        return """
+        UNWIND $rows AS row
+        MATCH (p1:Player {id: row.player1_id})
+        MATCH (p2:Player {id: row.player2_id})
+        CREATE (p1)-[:FRIENDS_WITH {since: date(row.since)}]->(p2)
+        SET p1.friends_version = coalesce(p1.friends_version, 0) + 1,
+            p2.friends_version = coalesce(p2.friends_version, 0) + 1
+        """
+
+    @staticmethod
+    def merge_players_are_friends_bulk():
+        """Create the FRIENDS_WITH relationships of $rows that do not exist yet"""
+        return """
+        UNWIND $rows AS row
+        MATCH (p1:Player {id: row.player1_id})
+        MATCH (p2:Player {id: row.player2_id})
+        MERGE (p1)-[f:FRIENDS_WITH]->(p2)
+        ON CREATE SET f.since = date(row.since),
+                      p1.friends_version = coalesce(p1.friends_version, 0) + 1,
+                      p2.friends_version = coalesce(p2.friends_version, 0) + 1
+        """
+
 
 class AnalyticsQueries:
     """Queries for analytics and insights"""
@@ -218,15 +625,13 @@ class AnalyticsQueries:
 
     @staticmethod
     def get_game_stats():
-        """Get statistics for a specific game"""
+        """Get statistics for a specific game from its maintained aggregates"""
         return """
         MATCH (g:Game {id: $game_id})
-        OPTIONAL MATCH (g)<-[:OWNS]-(owner:Player)
-        OPTIONAL MATCH (g)<-[rated:RATED]-(rater:Player)
         RETURN g.title as title,
-               count(DISTINCT owner) as total_owners,
-               avg(rated.rating) as avg_user_rating,
-               count(DISTINCT rater) as total_ratings
+               coalesce(g.owner_count, 0) as total_owners,
+               g.avg_user_rating as avg_user_rating,
+               coalesce(g.rating_count, 0) as total_ratings
         """
 
     @staticmethod
@@ -238,4 +643,347 @@ class AnalyticsQueries:
         UNWIND nodeLabels as label
         RETURN label, sum(count) as total_count
         ORDER BY total_count DESC
-        """
\ No newline at end of file
+        """
+
+    @staticmethod
+    def get_relationship_summary():
+        """Count relationships per type"""
+        return """
+        MATCH ()-[r]->()
+        RETURN type(r) as type, count(r) as total_count
+        ORDER BY total_count DESC
+        """
+
+    @staticmethod
+    def export_nodes(label: str):
+        """Every node with a label: element id, labels and all properties"""
+        return f"""
+        MATCH (n:{_identifier(label)})
+        RETURN elementId(n) as element_id, labels(n) as labels, properties(n) as properties
+        """
+
+    @staticmethod
+    def export_relationships(relationship_type: str):
+        """Every relationship of a type with the key of each endpoint ($key_properties: label -> key, default id)"""
+        return f"""
+        MATCH (a)-[r:{_identifier(relationship_type)}]->(b)
+        WITH a, r, b, head(labels(a)) as start_label, head(labels(b)) as end_label
+        RETURN elementId(r) as element_id,
+               start_label, a[coalesce($key_properties[start_label], 'id')] as start_key,
+               end_label, b[coalesce($key_properties[end_label], 'id')] as end_key,
+               properties(r) as properties
+        """
+
+    @staticmethod
+    def project_properties(label: str, properties):
+        """Project the given properties of every node with a label"""
+        columns = ", ".join(f"n.{_identifier(name)} as {_identifier(name)}" for name in properties)
+        return f"""
+        MATCH (n:{_identifier(label)})
+        RETURN {columns}
+        """
+
+
+class RecommendationQueries:
+    """Queries for precomputed "players who own/like this also own/like" recommendations.
+
+    A player interacts with a game by owning it or rating it at least
+    $like_threshold. Top-k lists are stored as RECOMMENDED relationships,
+    Game->Game (similar games) and Player->Game (personal picks), ranked from 1.
+    """
+
+    @staticmethod
+    def get_interaction_counts():
+        """Number of distinct players interacting with each game"""
+        return """
+        MATCH (g:Game)
+        CALL {
+            WITH g
+            MATCH (g)<-[r:OWNS|RATED]-(p:Player)
+            WHERE type(r) = 'OWNS' OR r.rating >= $like_threshold
+            RETURN count(DISTINCT p) as players
+        }
+        RETURN g.id as game_id, players
+        """
+
+    @staticmethod
+    def get_interaction_counts_for_games():
+        """Number of distinct players interacting with each game in $game_ids"""
+        return """
+        UNWIND $game_ids AS game_id
+        MATCH (g:Game {id: game_id})
+        CALL {
+            WITH g
+            MATCH (g)<-[r:OWNS|RATED]-(p:Player)
+            WHERE type(r) = 'OWNS' OR r.rating >= $like_threshold
+            RETURN count(DISTINCT p) as players
+        }
+        RETURN g.id as game_id, players
+        """
+
+    @staticmethod
+    def get_co_occurring_games():
+        """For each game in $game_ids, the games most often shared with its players and how many share them"""
+        return """
+        UNWIND $game_ids AS game_id
+        MATCH (g:Game {id: game_id})
+        CALL {
+            WITH g
+            MATCH (g)<-[r1:OWNS|RATED]-(p:Player)
+            WHERE type(r1) = 'OWNS' OR r1.rating >= $like_threshold
+            WITH DISTINCT g, p
+            MATCH (p)-[r2:OWNS|RATED]->(other:Game)
+            WHERE other <> g AND (type(r2) = 'OWNS' OR r2.rating >= $like_threshold)
+            WITH other, count(DISTINCT p) as together
+            ORDER BY together DESC, other.id
+            LIMIT $candidate_limit
+            RETURN collect([other.id, together]) as candidates
+        }
+        RETURN g.id as game_id, candidates
+        """
+
+    @staticmethod
+    def store_game_recommendations():
+        """Replace the RECOMMENDED games of each game in $rows ({game_id, recommendations: [{game_id, rank, score}]})"""
+        return """
+        UNWIND $rows AS row
+        MATCH (g:Game {id: row.game_id})
+        SET g.recommended_at = datetime()
+        WITH g, row
+        CALL {
+            WITH g
+            MATCH (g)-[old:RECOMMENDED]->(:Game)
+            DELETE old
+        }
+        UNWIND row.recommendations AS recommendation
+        MATCH (other:Game {id: recommendation.game_id})
+        CREATE (g)-[:RECOMMENDED {rank: recommendation.rank, score: recommendation.score}]->(other)
+        """
+
+    @staticmethod
+    def refresh_player_recommendations():
+        """Recompute the top $limit games of each player in $rows from the similar games of their library.
+
+        The player's library version is recorded first, which also locks the
+        player, so a purchase committed meanwhile leaves the player stale.
+        """
+        return """
+        UNWIND $rows AS row
+        MATCH (p:Player {id: row.player_id})
+        SET p.recommended_version = coalesce(p.library_version, 0),
+            p.recommended_at = datetime()
+        WITH p
+        CALL {
+            WITH p
+            MATCH (p)-[old:RECOMMENDED]->(:Game)
+            DELETE old
+        }
+        CALL {
+            WITH p
+            MATCH (p)-[r:OWNS|RATED]->(g:Game)
+            WHERE type(r) = 'OWNS' OR r.rating >= $like_threshold
+            WITH DISTINCT p, g
+            MATCH (g)-[s:RECOMMENDED]->(other:Game)
+            WHERE NOT (p)-[:OWNS|RATED]->(other)
+            WITH other, sum(s.score) as score
+            ORDER BY score DESC, other.id
+            LIMIT $limit
+            RETURN collect(other) as games, collect(score) as scores
+        }
+        UNWIND range(0, size(games) - 1) AS i
+        WITH p, games[i] as other, i + 1 as rank, scores[i] as score
+        CREATE (p)-[:RECOMMENDED {rank: rank, score: score}]->(other)
+        """
+
+    @staticmethod
+    def get_stale_players():
+        """Players whose library changed since their recommendations were computed (or never computed)"""
+        return """
+        MATCH (p:Player)
+        WHERE p.recommended_version IS NULL
+           OR p.recommended_version <> coalesce(p.library_version, 0)
+        RETURN p.id as player_id
+        """
+
+    @staticmethod
+    def get_all_player_ids():
+        """Every player id"""
+        return """
+        MATCH (p:Player)
+        RETURN p.id as player_id
+        """
+
+    @staticmethod
+    def get_games_of_players():
+        """Distinct games the players in $player_ids interact with"""
+        return """
+        UNWIND $player_ids AS player_id
+        MATCH (:Player {id: player_id})-[r:OWNS|RATED]->(g:Game)
+        WHERE type(r) = 'OWNS' OR r.rating >= $like_threshold
+        RETURN DISTINCT g.id as game_id
+        """
+
+    @staticmethod
+    def get_player_recommendations():
+        """The stored top games for a player, skipping games bought or rated since they were computed"""
+        return """
+        MATCH (p:Player {id: $player_id})-[r:RECOMMENDED]->(g:Game)
+        WHERE NOT (p)-[:OWNS|RATED]->(g)
+        RETURN g.id as id, g.title as title, g.price as price, r.score as score
+        ORDER BY r.rank
+        LIMIT $limit
+        """
+
+    @staticmethod
+    def get_similar_games():
+        """The stored top games for a game, skipping games $player_id owns (null: no filter)"""
+        return """
+        MATCH (g:Game {id: $game_id})-[r:RECOMMENDED]->(other:Game)
+        WHERE $player_id IS NULL OR NOT EXISTS { MATCH (:Player {id: $player_id})-[:OWNS]->(other) }
+        RETURN other.id as id, other.title as title, other.price as price, r.score as score
+        ORDER BY r.rank
+        LIMIT $limit
+        """
+
+
+class ProjectionQueries:
+    """Queries streaming the player/game graph into an in-process projection.
+
+    Edge queries return (source, target, weight) rows keyed by id; the
+    per-player variants take $player_ids and return every edge of those
+    players, FRIENDS_WITH in both directions.
+    """
+
+    @staticmethod
+    def get_player_versions():
+        """Every player id with its library and friends versions"""
+        return """
+        MATCH (p:Player)
+        RETURN p.id as id,
+               coalesce(p.library_version, 0) as library_version,
+               coalesce(p.friends_version, 0) as friends_version
+        """
+
+    @staticmethod
+    def get_game_ids():
+        """Every game id"""
+        return """
+        MATCH (g:Game)
+        RETURN g.id as id
+        """
+
+    @staticmethod
+    def get_owns_edges():
+        """Every OWNS relationship weighted by playtime"""
+        return """
+        MATCH (p:Player)-[r:OWNS]->(g:Game)
+        RETURN p.id as source, g.id as target, r.playtime as weight
+        """
+
+    @staticmethod
+    def get_rated_edges():
+        """Every RATED relationship weighted by rating"""
+        return """
+        MATCH (p:Player)-[r:RATED]->(g:Game)
+        RETURN p.id as source, g.id as target, r.rating as weight
+        """
+
+    @staticmethod
+    def get_friendship_edges():
+        """Every FRIENDS_WITH relationship, once, in its stored direction"""
+        return """
+        MATCH (a:Player)-[:FRIENDS_WITH]->(b:Player)
+        RETURN a.id as source, b.id as target, 1.0 as weight
+        """
+
+    @staticmethod
+    def get_player_owns_edges():
+        """OWNS relationships of the players in $player_ids"""
+        return """
+        UNWIND $player_ids AS player_id
+        MATCH (p:Player {id: player_id})-[r:OWNS]->(g:Game)
+        RETURN p.id as source, g.id as target, r.playtime as weight
+        """
+
+    @staticmethod
+    def get_player_rated_edges():
+        """RATED relationships of the players in $player_ids"""
+        return """
+        UNWIND $player_ids AS player_id
+        MATCH (p:Player {id: player_id})-[r:RATED]->(g:Game)
+        RETURN p.id as source, g.id as target, r.rating as weight
+        """
+
+    @staticmethod
+    def get_player_friendship_edges():
+        """Friends of the players in $player_ids, whichever way the relationship points"""
+        return """
+        UNWIND $player_ids AS player_id
+        MATCH (p:Player {id: player_id})-[:FRIENDS_WITH]-(f:Player)
+        RETURN DISTINCT p.id as source, f.id as target, 1.0 as weight
+        """
+
+
+class LeaderboardQueries:
+    """Player rankings, served by the level, total_playtime and OWNS.playtime indexes.
+
+    Ranks are competition ranks: 1 + the number of strictly higher scores.
+    """
+
+    # Player properties with a global leaderboard
+    METRICS = ("level", "total_playtime")
+
+    @staticmethod
+    def get_top_players(metric: str):
+        """Top $limit players by a property, best first, read in index order"""
+        score = f"p.{_identifier(metric)}"
+        return f"""
+        MATCH (p:Player)
+        WHERE {score} IS NOT NULL
+        RETURN p.id as id, p.username as username, {score} as score
+        ORDER BY {score} DESC, p.id
+        LIMIT $limit
+        """
+
+    @staticmethod
+    def get_player_rank(metric: str):
+        """Score and rank of $player_id, counting higher scores with an index range seek"""
+        score = _identifier(metric)
+        return f"""
+        MATCH (p:Player {{id: $player_id}})
+        WHERE p.{score} IS NOT NULL
+        RETURN p.{score} as score,
+               COUNT {{ MATCH (other:Player) WHERE other.{score} > p.{score} }} + 1 as rank
+        """
+
+    @staticmethod
+    def get_scores(metric: str):
+        """Id and score of every player with a value for the property"""
+        score = f"p.{_identifier(metric)}"
+        return f"""
+        MATCH (p:Player)
+        WHERE {score} IS NOT NULL
+        RETURN p.id as id, {score} as score
+        """
+
+    @staticmethod
+    def get_game_top_players():
+        """Top $limit owners of $game_id by playtime, best first"""
+        return """
+        MATCH (p:Player)-[o:OWNS]->(g:Game {id: $game_id})
+        WHERE o.playtime IS NOT NULL
+        RETURN p.id as id, p.username as username, o.playtime as score
+        ORDER BY o.playtime DESC, p.id
+        LIMIT $limit
+        """
+
+    @staticmethod
+    def get_game_player_rank():
+        """Playtime and rank of $player_id among the owners of $game_id"""
+        return """
+        MATCH (p:Player {id: $player_id})-[o:OWNS]->(g:Game {id: $game_id})
+        WHERE o.playtime IS NOT NULL
+        WITH g, max(o.playtime) as score
+        RETURN score,
+               COUNT { MATCH (:Player)-[other:OWNS]->(g) WHERE other.playtime > score } + 1 as rank
+        """
@@ -0,0 +1,171 @@
+"""
+Registry of named queries with sample parameters and access modes
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional
+from queries.basic_queries import (
+    GameQueries, PlayerQueries, DeveloperQueries, RelationshipQueries, AnalyticsQueries,
+    RecommendationQueries, ProjectionQueries, LeaderboardQueries
+)
+from utils.statistics import DEFAULT_PERCENTILES, percentile_parameters
+
+# Access modes; equal to neo4j.READ_ACCESS / neo4j.WRITE_ACCESS
+READ = "READ"
+WRITE = "WRITE"
+
+
+@dataclass(frozen=True)
+class NamedQuery:
+    """A Cypher statement with a stable name.
+
+    `parameters` holds sample values of the right types: the server caches
+    plans per parameter type, so EXPLAIN with these fills the same cache entry
+    the real calls hit.
+    """
+    name: str
+    cypher: str
+    parameters: Dict[str, Any] = field(default_factory=dict)
+    access_mode: str = READ
+
+
+class QueryRegistry:
+    """Named queries, looked up by name or by Cypher text"""
+
+    def __init__(self):
+        self._queries: Dict[str, NamedQuery] = {}
+        self._names: Dict[str, str] = {}
+
+    def register(self, query: NamedQuery) -> NamedQuery:
+        """Add a query; names must be unique"""
+        if query.access_mode not in (READ, WRITE):
+            raise ValueError(f"Unknown access mode for {query.name}: {query.access_mode!r}")
+        if query.name in self._queries:
+            raise ValueError(f"Query already registered: {query.name}")
+        self._queries[query.name] = query
+        self._names[query.cypher] = query.name
+        return query
+
+    def get(self, name: str) -> NamedQuery:
+        """Get a query by name"""
+        return self._queries[name]
+
+    def name_for(self, cypher: str) -> Optional[str]:
+        """Name of a registered Cypher statement, None if it is not registered"""
+        return self._names.get(cypher)
+
+    def __iter__(self) -> Iterator[NamedQuery]:
+        return iter(self._queries.values())
+
+    def __len__(self) -> int:
+        return len(self._queries)
+
+
+def _default_registry() -> QueryRegistry:
+    """Register every fixed query of basic_queries with sample parameters"""
+    registry = QueryRegistry()
+    game = {"id": "", "title": "", "release_date": "2000-01-01", "rating": 0.0, "price": 0.0, "description": ""}
+    player = {"id": "", "username": "", "email": "", "join_date": "2000-01-01", "level": 0, "total_playtime": 0}
+    developer = {"name": "", "founded_year": 0, "country": "", "employees": 0}
+    ownership = {"player_id": "", "game_id": "", "purchase_date": "2000-01-01", "playtime": 0}
+    rating = {"player_id": "", "game_id": "", "rating": 0.0, "review_date": "2000-01-01", "review_text": ""}
+    rows = {"rows": []}
+    percentiles = percentile_parameters(DEFAULT_PERCENTILES)
+
+    for query in (
+        NamedQuery("game.create", GameQueries.create_game(), game, WRITE),
+        NamedQuery("game.create_bulk", GameQueries.create_games_bulk(), rows, WRITE),
+        NamedQuery("game.merge_bulk", GameQueries.merge_games_bulk(), rows, WRITE),
+        NamedQuery("game.all", GameQueries.get_all_games()),
+        NamedQuery("game.first_page", GameQueries.get_games_first_page(), {"limit": 0}),
+        NamedQuery("game.page_after", GameQueries.get_games_page_after(),
+                   {"after_title": "", "after_id": "", "limit": 0}),
+        NamedQuery("game.by_id", GameQueries.get_game_by_id(), {"game_id": ""}),
+        NamedQuery("game.top_rated", GameQueries.get_top_rated_games(), {"limit": 0}),
+        NamedQuery("game.repair_aggregates", GameQueries.repair_game_aggregates(), rows, WRITE),
+        NamedQuery("game.statistics", GameQueries.get_game_statistics(len(DEFAULT_PERCENTILES)), percentiles),
+        NamedQuery("player.create", PlayerQueries.create_player(), player, WRITE),
+        NamedQuery("player.create_bulk", PlayerQueries.create_players_bulk(), rows, WRITE),
+        NamedQuery("player.merge_bulk", PlayerQueries.merge_players_bulk(), rows, WRITE),
+        NamedQuery("player.all", PlayerQueries.get_all_players()),
+        NamedQuery("player.first_page", PlayerQueries.get_players_first_page(), {"limit": 0}),
+        NamedQuery("player.page_after", PlayerQueries.get_players_page_after(),
+                   {"after_username": "", "after_id": "", "limit": 0}),
+        NamedQuery("player.by_id", PlayerQueries.get_player_by_id(), {"player_id": ""}),
+        NamedQuery("player.statistics", PlayerQueries.get_player_statistics(len(DEFAULT_PERCENTILES)), percentiles),
+        NamedQuery("developer.create", DeveloperQueries.create_developer(), developer, WRITE),
+        NamedQuery("developer.create_bulk", DeveloperQueries.create_developers_bulk(), rows, WRITE),
+        NamedQuery("developer.merge_bulk", DeveloperQueries.merge_developers_bulk(), rows, WRITE),
+        NamedQuery("developer.all", DeveloperQueries.get_all_developers()),
+        NamedQuery("developer.by_name", DeveloperQueries.get_developer_by_name(), {"name": ""}),
+        NamedQuery("relationship.develops", RelationshipQueries.developer_develops_game(),
+                   {"developer_name": "", "game_id": ""}, WRITE),
+        NamedQuery("relationship.owns", RelationshipQueries.player_owns_game(), ownership, WRITE),
+        NamedQuery("relationship.purchase", RelationshipQueries.purchase_game(), ownership, WRITE),
+        NamedQuery("relationship.purchase_cart", RelationshipQueries.purchase_games(),
+                   {"player_id": "", "game_ids": [], "purchase_date": "2000-01-01", "playtime": 0}, WRITE),
+        NamedQuery("relationship.rates", RelationshipQueries.player_rates_game(), rating, WRITE),
+        NamedQuery("relationship.friends", RelationshipQueries.players_are_friends(),
+                   {"player1_id": "", "player2_id": "", "since": "2000-01-01"}, WRITE),
+        NamedQuery("relationship.friend_suggestions", RelationshipQueries.get_friend_suggestions(),
+                   {"player_id": "", "degree_cap": 0, "candidate_limit": 0, "limit": 0}),
+        NamedQuery("relationship.develops_bulk", RelationshipQueries.developer_develops_game_bulk(), rows, WRITE),
+        NamedQuery("relationship.owns_bulk", RelationshipQueries.player_owns_game_bulk(), rows, WRITE),
+        NamedQuery("relationship.rates_bulk", RelationshipQueries.player_rates_game_bulk(), rows, WRITE),
+        NamedQuery("relationship.friends_bulk", RelationshipQueries.players_are_friends_bulk(), rows, WRITE),
+        NamedQuery(
+            "relationship.merge_owns_bulk", RelationshipQueries.merge_player_owns_game_bulk(), rows, WRITE
+        ),
+        NamedQuery(
+            "relationship.merge_rates_bulk", RelationshipQueries.merge_player_rates_game_bulk(), rows, WRITE
+        ),
+        NamedQuery(
+            "relationship.merge_friends_bulk", RelationshipQueries.merge_players_are_friends_bulk(), rows, WRITE
+        ),
+        NamedQuery("analytics.player_games", AnalyticsQueries.get_player_games(), {"player_id": ""}),
+        NamedQuery("analytics.game_stats", AnalyticsQueries.get_game_stats(), {"game_id": ""}),
+        NamedQuery("analytics.database_summary", AnalyticsQueries.get_database_summary()),
+        NamedQuery("analytics.relationship_summary", AnalyticsQueries.get_relationship_summary()),
+        NamedQuery("recommendation.interaction_counts", RecommendationQueries.get_interaction_counts(),
+                   {"like_threshold": 0.0}),
+        NamedQuery("recommendation.interaction_counts_for_games",
+                   RecommendationQueries.get_interaction_counts_for_games(), {"game_ids": [], "like_threshold": 0.0}),
+        NamedQuery("recommendation.co_occurring_games", RecommendationQueries.get_co_occurring_games(),
+                   {"game_ids": [], "like_threshold": 0.0, "candidate_limit": 0}),
+        NamedQuery("recommendation.store_games", RecommendationQueries.store_game_recommendations(), rows, WRITE),
+        NamedQuery("recommendation.refresh_players", RecommendationQueries.refresh_player_recommendations(),
+                   {"rows": [], "like_threshold": 0.0, "limit": 0}, WRITE),
+        NamedQuery("recommendation.stale_players", RecommendationQueries.get_stale_players()),
+        NamedQuery("recommendation.player_ids", RecommendationQueries.get_all_player_ids()),
+        NamedQuery("recommendation.games_of_players", RecommendationQueries.get_games_of_players(),
+                   {"player_ids": [], "like_threshold": 0.0}),
+        NamedQuery("recommendation.for_player", RecommendationQueries.get_player_recommendations(),
+                   {"player_id": "", "limit": 0}),
+        NamedQuery("recommendation.similar_games", RecommendationQueries.get_similar_games(),
+                   {"game_id": "", "player_id": "", "limit": 0}),
+        NamedQuery("projection.player_versions", ProjectionQueries.get_player_versions()),
+        NamedQuery("projection.game_ids", ProjectionQueries.get_game_ids()),
+        NamedQuery("projection.owns", ProjectionQueries.get_owns_edges()),
+        NamedQuery("projection.rated", ProjectionQueries.get_rated_edges()),
+        NamedQuery("projection.friendships", ProjectionQueries.get_friendship_edges()),
+        NamedQuery("projection.player_owns", ProjectionQueries.get_player_owns_edges(), {"player_ids": []}),
+        NamedQuery("projection.player_rated", ProjectionQueries.get_player_rated_edges(), {"player_ids": []}),
+        NamedQuery("projection.player_friendships", ProjectionQueries.get_player_friendship_edges(),
+                   {"player_ids": []}),
+        NamedQuery("leaderboard.game_top", LeaderboardQueries.get_game_top_players(), {"game_id": "", "limit": 0}),
+        NamedQuery("leaderboard.game_rank", LeaderboardQueries.get_game_player_rank(),
+                   {"player_id": "", "game_id": ""}),
+    ):
+        registry.register(query)
+
+    for metric in LeaderboardQueries.METRICS:
+        registry.register(NamedQuery(f"leaderboard.top.{metric}", LeaderboardQueries.get_top_players(metric),
+                                     {"limit": 0}))
+        registry.register(NamedQuery(f"leaderboard.rank.{metric}", LeaderboardQueries.get_player_rank(metric),
+                                     {"player_id": ""}))
+        registry.register(NamedQuery(f"leaderboard.scores.{metric}", LeaderboardQueries.get_scores(metric)))
+    return registry
+
+
+# Queries warmed up at connect time and named in the query timings
+QUERY_REGISTRY = _default_registry()
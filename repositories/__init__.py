@@ -2,13 +2,32 @@
 Repositories package
 """
 
-from .base_repository import BaseRepository
+from .base_repository import BaseRepository, BatchWriteReport
 from .game_repository import GameRepository
 from .player_repository import PlayerRepository
 from .developer_repository import DeveloperRepository
 from .relationship_repository import RelationshipRepository
+from .recommendation_repository import RecommendationRepository
+from .leaderboard_repository import LeaderboardRepository
+from .parallel_writer import ParallelBatchWriter, ParallelWriteReport
+from .pagination import Page
+from .row_mappers import RowFormat, RowMapper
+from .cache import EntityCache, entity_cache_stats, set_entity_cache
+from .existence_index import ExistenceIndex, existence_index_stats
+from .leaderboard import Leaderboard, leaderboard_stats
+from .async_base_repository import AsyncBaseRepository
+from .async_game_repository import AsyncGameRepository
+from .async_player_repository import AsyncPlayerRepository
+from .async_developer_repository import AsyncDeveloperRepository
+from .async_relationship_repository import AsyncRelationshipRepository
 
 __all__ = [
-    'BaseRepository', 'GameRepository', 'PlayerRepository',
-    'DeveloperRepository', 'RelationshipRepository'
-]
\ No newline at end of file
+    'BaseRepository', 'BatchWriteReport', 'GameRepository', 'PlayerRepository',
+    'DeveloperRepository', 'RelationshipRepository', 'RecommendationRepository', 'LeaderboardRepository',
+    'ParallelBatchWriter', 'ParallelWriteReport',
+    'Page', 'RowFormat', 'RowMapper',
+    'EntityCache', 'entity_cache_stats', 'set_entity_cache',
+    'ExistenceIndex', 'existence_index_stats', 'Leaderboard', 'leaderboard_stats',
+    'AsyncBaseRepository', 'AsyncGameRepository', 'AsyncPlayerRepository',
+    'AsyncDeveloperRepository', 'AsyncRelationshipRepository'
+]
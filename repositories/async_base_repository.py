@@ -0,0 +1,153 @@
+"""
+Async base repository with common database operations
+"""
+
+from database import AsyncNeo4jConnection
+from queries import AnalyticsQueries
+from repositories.cache import data_version_for
+from repositories.row_mappers import RowFormat, RowMapper
+from utils import setup_logger
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
+from neo4j import Record
+
+logger = setup_logger(__name__)
+
+
+class AsyncBaseRepository:
+    """Async counterpart of BaseRepository for the asyncio driver
+
+    Same semantics: bound to a transaction inside a unit of work, otherwise
+    each call opens its own session from the driver's connection pool.
+    """
+
+    def __init__(self, connection: AsyncNeo4jConnection, transaction=None, unit_of_work=None):
+        self.connection = connection
+        self.transaction = transaction
+        self.unit_of_work = unit_of_work
+        self.data_version = data_version_for(connection)
+
+    @asynccontextmanager
+    async def _runner(self, write: bool = False):
+        """Yield the bound transaction, or a fresh READ/WRITE session when unbound"""
+        if self.transaction is not None:
+            yield self.transaction
+        else:
+            session = self.connection.write_session() if write else self.connection.read_session()
+            async with session:
+                yield session
+
+    async def execute_query(self, query: str, parameters: Dict[str, Any] = None) -> List[Dict]:
+        """Execute a query and return results as list of dictionaries"""
+        with self.connection.query_monitor.timed(query):
+            async with self._runner() as runner:
+                result = await runner.run(query, parameters or {})
+                return [dict(record) async for record in result]
+
+    async def stream_query(self, query: str, parameters: Dict[str, Any] = None,
+                           fetch_size: Optional[int] = None) -> AsyncIterator[Dict]:
+        """Yield rows one at a time while the session stays open"""
+        async for record in self._stream_records(query, parameters, fetch_size):
+            yield dict(record)
+
+    async def _stream_records(self, query: str, parameters: Dict[str, Any] = None,
+                              fetch_size: Optional[int] = None) -> AsyncIterator[Record]:
+        """Yield the driver's records as they arrive (see stream_query)"""
+        if self.transaction is not None:
+            result = await self.transaction.run(query, parameters or {})
+            async for record in result:
+                yield record
+            return
+
+        fetch_size = fetch_size or self.connection.config.fetch_size
+        async with self.connection.read_session(fetch_size=fetch_size) as session:
+            result = await session.run(query, parameters or {})
+            async for record in result:
+                yield record
+
+    async def fetch_rows(self, query: str, mapper: RowMapper, row_format: Union[RowFormat, str] = RowFormat.DICT,
+                         parameters: Dict[str, Any] = None) -> List[Any]:
+        """Execute a query and map every record straight to a dict, tuple or entity"""
+        to_row = mapper.mapper(row_format)
+        with self.connection.query_monitor.timed(query):
+            async with self._runner() as runner:
+                result = await runner.run(query, parameters or {})
+                return [to_row(record) async for record in result]
+
+    async def stream_rows(self, query: str, mapper: RowMapper, row_format: Union[RowFormat, str] = RowFormat.DICT,
+                          parameters: Dict[str, Any] = None, fetch_size: Optional[int] = None) -> AsyncIterator[Any]:
+        """stream_query() yielding dicts, tuples or entities built by the mapper"""
+        to_row = mapper.mapper(row_format)
+        async for record in self._stream_records(query, parameters, fetch_size):
+            yield to_row(record)
+
+    async def stream_columns(self, label: str, properties: Sequence[str],
+                           batch_size: Optional[int] = None) -> AsyncIterator[Dict[str, List[Any]]]:
+        """Stream the given properties of a label as columnar batches (property -> list of values)"""
+        batch_size = batch_size or self.connection.config.fetch_size
+        batch: Dict[str, List[Any]] = {name: [] for name in properties}
+        size = 0
+        columns = [batch[name] for name in properties]
+        async for record in self._stream_records(AnalyticsQueries.project_properties(label, properties),
+                                                 fetch_size=batch_size):
+            for column, value in zip(columns, record.values()):
+                column.append(value)
+            size += 1
+            if size == batch_size:
+                yield batch
+                batch = {name: [] for name in properties}
+                columns = [batch[name] for name in properties]
+                size = 0
+        if size:
+            yield batch
+
+    async def execute_single_query(self, query: str, parameters: Dict[str, Any] = None) -> Optional[Dict]:
+        """Execute a query and return single result"""
+        with self.connection.query_monitor.timed(query):
+            async with self._runner() as runner:
+                result = await runner.run(query, parameters or {})
+                record = await result.single()
+                return dict(record) if record else None
+
+    async def execute_write_query(self, query: str, parameters: Dict[str, Any] = None) -> bool:
+        """Execute a write query and return success status"""
+        if self.transaction is not None:
+            with self.connection.query_monitor.timed(query):
+                result = await self.transaction.run(query, parameters or {})
+                await result.consume()
+            self._mark_written()
+            return True
+
+        try:
+            with self.connection.query_monitor.timed(query):
+                async with self.connection.write_session() as session:
+                    result = await session.run(query, parameters or {})
+                    await result.consume()
+            self._mark_written()
+            return True
+        except Exception as e:
+            logger.error(f"Write query failed: {e}")
+            return False
+
+    async def execute_counted_write(self, query: str, parameters: Dict[str, Any] = None) -> Tuple[List[Dict], Any]:
+        """Execute a write query and return its records with the summary counters"""
+        with self.connection.query_monitor.timed(query):
+            async with self._runner(write=True) as runner:
+                result = await runner.run(query, parameters or {})
+                records = [dict(record) async for record in result]
+                summary = await result.consume()
+        self._mark_written()
+        return records, summary.counters
+
+    def _mark_written(self) -> None:
+        """Advance the data version now, or when the unit of work commits"""
+        if self.unit_of_work is not None:
+            self.unit_of_work.after_commit(self.data_version.advance)
+        else:
+            self.data_version.advance()
+
+    async def count_nodes(self, label: str) -> int:
+        """Count nodes with specific label"""
+        query = f"MATCH (n:{label}) RETURN count(n) as count"
+        result = await self.execute_single_query(query)
+        return result['count'] if result else 0
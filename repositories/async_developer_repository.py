@@ -0,0 +1,37 @@
+"""
+Async repository for developer-related database operations
+"""
+
+from repositories.async_base_repository import AsyncBaseRepository
+from repositories.row_mappers import DEVELOPER_ROWS, RowFormat
+from repositories.developer_repository import developer_parameters
+from queries import DeveloperQueries
+from models import Developer
+from typing import Any, Dict, List, Optional, Union
+
+
+class AsyncDeveloperRepository(AsyncBaseRepository):
+    """Async repository for developer-related operations"""
+
+    async def create_developer(self, developer: Developer) -> bool:
+        """Create a new developer"""
+        return await self.execute_write_query(
+            DeveloperQueries.create_developer(), developer_parameters(developer)
+        )
+
+    async def get_all_developers(self, row_format: Union[RowFormat, str] = RowFormat.DICT) -> List[Any]:
+        """Get all developers, as dicts, tuples (field order of Developer) or Developer entities"""
+        return await self.fetch_rows(DeveloperQueries.get_all_developers(), DEVELOPER_ROWS, row_format)
+
+    async def get_developer_by_name(self, name: str) -> Optional[Dict]:
+        """Get developer by name"""
+        return await self.execute_single_query(DeveloperQueries.get_developer_by_name(), {"name": name})
+
+    async def developer_exists(self, name: str) -> bool:
+        """Check if a developer exists"""
+        developer = await self.get_developer_by_name(name)
+        return developer is not None
+
+    async def get_developers_count(self) -> int:
+        """Get total number of developers"""
+        return await self.count_nodes("Developer")
@@ -0,0 +1,83 @@
+"""
+Async repository for game-related database operations
+"""
+
+from repositories.async_base_repository import AsyncBaseRepository
+from repositories.row_mappers import GAME_ROWS, RowFormat
+from repositories.game_repository import game_parameters
+from repositories.pagination import Page, build_page, decode_page_token
+from utils.statistics import describe_from_record, percentile_parameters
+from queries import GameQueries, AnalyticsQueries
+from models import Game
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Union
+
+
+class AsyncGameRepository(AsyncBaseRepository):
+    """Async repository for game-related operations"""
+
+    async def create_game(self, game: Game) -> bool:
+        """Create a new game"""
+        return await self.execute_write_query(GameQueries.create_game(), game_parameters(game))
+
+    async def get_all_games(self, row_format: Union[RowFormat, str] = RowFormat.DICT) -> List[Any]:
+        """Get all games with basic information, as dicts, tuples (field order of Game) or Game entities"""
+        return await self.fetch_rows(GameQueries.get_all_games(), GAME_ROWS, row_format)
+
+    def iter_all_games(self, fetch_size: Optional[int] = None,
+                     row_format: Union[RowFormat, str] = RowFormat.DICT) -> AsyncIterator[Any]:
+        """Stream all games without holding them in memory"""
+        return self.stream_rows(GameQueries.get_all_games(), GAME_ROWS, row_format, fetch_size=fetch_size)
+
+    async def get_games_page(self, limit: int = 50, page_token: Optional[str] = None) -> Page:
+        """Get one page of games in title order; pass the returned next_token to continue"""
+        if limit <= 0:
+            raise ValueError("Page limit must be positive")
+
+        if page_token is None:
+            rows = await self.execute_query(GameQueries.get_games_first_page(), {"limit": limit + 1})
+        else:
+            after_title, after_id = decode_page_token(page_token)
+            rows = await self.execute_query(
+                GameQueries.get_games_page_after(),
+                {"after_title": after_title, "after_id": after_id, "limit": limit + 1}
+            )
+        return build_page(rows, limit, 'title')
+
+    async def get_game_by_id(self, game_id: str) -> Optional[Dict]:
+        """Get specific game by ID"""
+        return await self.execute_single_query(
+            GameQueries.get_game_by_id(),
+            {"game_id": game_id}
+        )
+
+    async def get_game_statistics(self, percentiles: Sequence[float] = ()) -> Dict:
+        """Aggregate rating and price statistics in one server-side query"""
+        record = await self.execute_single_query(
+            GameQueries.get_game_statistics(len(percentiles)),
+            percentile_parameters(percentiles)
+        )
+        return {
+            "count": record['count'],
+            "rating": describe_from_record(record, 'rating', percentiles),
+            "price": describe_from_record(record, 'price', percentiles)
+        }
+
+    async def get_top_rated_games(self, limit: int = 10) -> List[Dict]:
+        """Get top rated games"""
+        return await self.execute_query(
+            GameQueries.get_top_rated_games(),
+            {"limit": limit}
+        )
+
+    async def get_game_stats(self, game_id: str) -> Optional[Dict]:
+        """Owner and rating figures of one game, read from its maintained aggregates"""
+        return await self.execute_single_query(AnalyticsQueries.get_game_stats(), {"game_id": game_id})
+
+    async def game_exists(self, game_id: str) -> bool:
+        """Check if a game exists"""
+        game = await self.get_game_by_id(game_id)
+        return game is not None
+
+    async def get_games_count(self) -> int:
+        """Get total number of games"""
+        return await self.count_nodes("Game")
@@ -0,0 +1,81 @@
+"""
+Async repository for player-related database operations
+"""
+
+from repositories.async_base_repository import AsyncBaseRepository
+from repositories.row_mappers import PLAYER_ROWS, RowFormat
+from repositories.player_repository import player_parameters
+from repositories.pagination import Page, build_page, decode_page_token
+from utils.statistics import describe_from_record, percentile_parameters
+from queries import PlayerQueries, AnalyticsQueries
+from models import Player
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Union
+
+
+class AsyncPlayerRepository(AsyncBaseRepository):
+    """Async repository for player-related operations"""
+
+    async def create_player(self, player: Player) -> bool:
+        """Create a new player"""
+        return await self.execute_write_query(
+            PlayerQueries.create_player(), player_parameters(player)
+        )
+
+    async def get_all_players(self, row_format: Union[RowFormat, str] = RowFormat.DICT) -> List[Any]:
+        """Get all players, as dicts, tuples (field order of Player) or Player entities"""
+        return await self.fetch_rows(PlayerQueries.get_all_players(), PLAYER_ROWS, row_format)
+
+    def iter_all_players(self, fetch_size: Optional[int] = None,
+                     row_format: Union[RowFormat, str] = RowFormat.DICT) -> AsyncIterator[Any]:
+        """Stream all players without holding them in memory"""
+        return self.stream_rows(PlayerQueries.get_all_players(), PLAYER_ROWS, row_format, fetch_size=fetch_size)
+
+    async def get_players_page(self, limit: int = 50, page_token: Optional[str] = None) -> Page:
+        """Get one page of players in username order; pass the returned next_token to continue"""
+        if limit <= 0:
+            raise ValueError("Page limit must be positive")
+
+        if page_token is None:
+            rows = await self.execute_query(PlayerQueries.get_players_first_page(), {"limit": limit + 1})
+        else:
+            after_username, after_id = decode_page_token(page_token)
+            rows = await self.execute_query(
+                PlayerQueries.get_players_page_after(),
+                {"after_username": after_username, "after_id": after_id, "limit": limit + 1}
+            )
+        return build_page(rows, limit, 'username')
+
+    async def get_player_by_id(self, player_id: str) -> Optional[Dict]:
+        """Get player by ID"""
+        return await self.execute_single_query(
+            PlayerQueries.get_player_by_id(),
+            {"player_id": player_id}
+        )
+
+    async def get_player_statistics(self, percentiles: Sequence[float] = ()) -> Dict:
+        """Aggregate level and playtime statistics in one server-side query"""
+        record = await self.execute_single_query(
+            PlayerQueries.get_player_statistics(len(percentiles)),
+            percentile_parameters(percentiles)
+        )
+        return {
+            "count": record['count'],
+            "level": describe_from_record(record, 'level', percentiles),
+            "playtime": describe_from_record(record, 'playtime', percentiles)
+        }
+
+    async def get_player_games(self, player_id: str) -> List[Dict]:
+        """Get all games owned by a player"""
+        return await self.execute_query(
+            AnalyticsQueries.get_player_games(),
+            {"player_id": player_id}
+        )
+
+    async def player_exists(self, player_id: str) -> bool:
+        """Check if a player exists"""
+        player = await self.get_player_by_id(player_id)
+        return player is not None
+
+    async def get_players_count(self) -> int:
+        """Get total number of players"""
+        return await self.count_nodes("Player")
@@ -0,0 +1,51 @@
+"""
+Async repository for managing relationships between entities
+"""
+
+from repositories.async_base_repository import AsyncBaseRepository
+from repositories.relationship_repository import (
+    cart_parameters, cart_statuses, friendship_parameters, ownership_parameters, purchase_status, rating_parameters
+)
+from queries import RelationshipQueries
+from models import PlayerOwnsGame, PlayerRatesGame, PlayerFriendship, PurchaseStatus
+from typing import Dict, Iterable
+
+
+class AsyncRelationshipRepository(AsyncBaseRepository):
+    """Async repository for relationship operations"""
+
+    async def create_player_owns_game(self, player_id: str, game_id: str, ownership: PlayerOwnsGame) -> bool:
+        """Create OWNS relationship between player and game"""
+        parameters = ownership_parameters(player_id, game_id, ownership)
+        return await self.execute_write_query(RelationshipQueries.player_owns_game(), parameters)
+
+    async def purchase_game(self, player_id: str, game_id: str, ownership: PlayerOwnsGame) -> PurchaseStatus:
+        """MERGE the OWNS relationship in one statement and report what happened"""
+        parameters = ownership_parameters(player_id, game_id, ownership)
+        records, counters = await self.execute_counted_write(RelationshipQueries.purchase_game(), parameters)
+        return purchase_status(records[0], counters.relationships_created > 0)
+
+    async def purchase_games(self, player_id: str, game_ids: Iterable[str],
+                             ownership: PlayerOwnsGame) -> Dict[str, PurchaseStatus]:
+        """MERGE OWNS relationships for a whole checkout cart in one statement"""
+        parameters = cart_parameters(player_id, game_ids, ownership)
+        records, _ = await self.execute_counted_write(RelationshipQueries.purchase_games(), parameters)
+        return cart_statuses(records)
+
+    async def create_player_rates_game(self, player_id: str, game_id: str, rating: PlayerRatesGame) -> bool:
+        """Create RATED relationship between player and game"""
+        parameters = rating_parameters(player_id, game_id, rating)
+        return await self.execute_write_query(RelationshipQueries.player_rates_game(), parameters)
+
+    async def create_friendship(self, player1_id: str, player2_id: str, friendship: PlayerFriendship) -> bool:
+        """Create FRIENDS_WITH relationship between players"""
+        parameters = friendship_parameters(player1_id, player2_id, friendship)
+        return await self.execute_write_query(RelationshipQueries.players_are_friends(), parameters)
+
+    async def create_developer_game_relationship(self, developer_name: str, game_id: str) -> bool:
+        """Create DEVELOPED relationship between developer and game"""
+        parameters = {
+            "developer_name": developer_name,
+            "game_id": game_id
+        }
+        return await self.execute_write_query(RelationshipQueries.developer_develops_game(), parameters)
@@ -3,43 +3,335 @@ Base repository with common database operations
 """
 
 from database import Neo4jConnection
-from utils import setup_logger
-from typing import Dict, List, Optional, Any
+from queries import AnalyticsQueries
+from repositories.cache import data_version_for, entity_cache_for
+from repositories.existence_index import ExistenceIndex, existence_index_for
+from repositories.row_mappers import RowFormat, RowMapper
+from utils import setup_logger, chunked
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from neo4j import Record
+import threading
+import time
 
 logger = setup_logger(__name__)
 
 
+@dataclass
+class BatchWriteReport:
+    """Outcome of a batched UNWIND write"""
+    rows_written: int = 0
+    entities_created: int = 0
+    chunks_written: int = 0
+    failed_chunks: List[int] = field(default_factory=list)
+    failed_rows: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        """Throughput of the committed rows"""
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.rows_written / self.elapsed_seconds
+
+    @property
+    def success(self) -> bool:
+        """True when every chunk was committed"""
+        return not self.failed_chunks
+
+
 class BaseRepository:
-    """Base repository class with common operations"""
+    """Base repository class with common operations
+
+    When created with a transaction (see Neo4jConnection.unit_of_work) every
+    query runs inside it and write errors propagate so the whole unit of work
+    rolls back; otherwise each call opens its own session, in READ mode for
+    queries and WRITE mode for writes so a cluster can route reads to followers.
+    """
+
+    # Label whose entity cache and existence index this repository uses (None: neither)
+    cache_name: Optional[str] = None
+    # Unique property identifying a node of that label
+    key_property: str = "id"
 
-    def __init__(self, connection: Neo4jConnection):
+    def __init__(self, connection: Neo4jConnection, transaction=None, unit_of_work=None):
         self.connection = connection
+        self.transaction = transaction
+        self.unit_of_work = unit_of_work
+        self.cache = entity_cache_for(connection, self.cache_name) if self.cache_name else None
+        self.existence_index = existence_index_for(connection, self.cache_name) if self.cache_name else None
+        # Keys created in this repository's unit of work, not yet in the shared index
+        self._uncommitted_keys = set()
+        self.data_version = data_version_for(connection)
+
+    @contextmanager
+    def _runner(self, write: bool = False):
+        """Yield the bound transaction, or a fresh READ/WRITE session when unbound"""
+        if self.transaction is not None:
+            yield self.transaction
+        else:
+            session = self.connection.write_session() if write else self.connection.read_session()
+            with session:
+                yield session
 
     def execute_query(self, query: str, parameters: Dict[str, Any] = None) -> List[Dict]:
         """Execute a query and return results as list of dictionaries"""
-        with self.connection.get_session() as session:
-            result = session.run(query, parameters or {})
+        with self.connection.query_monitor.timed(query), self._runner() as runner:
+            result = runner.run(query, parameters or {})
             return [dict(record) for record in result]
 
+    def stream_query(self, query: str, parameters: Dict[str, Any] = None,
+                     fetch_size: Optional[int] = None) -> Iterator[Dict]:
+        """Yield rows one at a time while the session stays open.
+
+        Records are pulled from the server in batches of `fetch_size`, so memory
+        stays flat however many rows match. Close the generator (or exhaust it)
+        to release the session.
+        """
+        for record in self._stream_records(query, parameters, fetch_size):
+            yield dict(record)
+
+    def _stream_records(self, query: str, parameters: Dict[str, Any] = None,
+                        fetch_size: Optional[int] = None) -> Iterator[Record]:
+        """Yield the driver's records as they arrive (see stream_query)"""
+        if self.transaction is not None:
+            yield from self.transaction.run(query, parameters or {})
+            return
+
+        fetch_size = fetch_size or self.connection.config.fetch_size
+        with self.connection.read_session(fetch_size=fetch_size) as session:
+            yield from session.run(query, parameters or {})
+
+    def fetch_rows(self, query: str, mapper: RowMapper, row_format: Union[RowFormat, str] = RowFormat.DICT,
+                   parameters: Dict[str, Any] = None) -> List[Any]:
+        """Execute a query and map every record straight to a dict, tuple or entity"""
+        to_row = mapper.mapper(row_format)
+        with self.connection.query_monitor.timed(query), self._runner() as runner:
+            return [to_row(record) for record in runner.run(query, parameters or {})]
+
+    def stream_rows(self, query: str, mapper: RowMapper, row_format: Union[RowFormat, str] = RowFormat.DICT,
+                    parameters: Dict[str, Any] = None, fetch_size: Optional[int] = None) -> Iterator[Any]:
+        """stream_query() yielding dicts, tuples or entities built by the mapper"""
+        to_row = mapper.mapper(row_format)
+        for record in self._stream_records(query, parameters, fetch_size):
+            yield to_row(record)
+
+    def stream_columns(self, label: str, properties: Sequence[str],
+                     batch_size: Optional[int] = None) -> Iterator[Dict[str, List[Any]]]:
+        """Stream the given properties of a label as columnar batches (property -> list of values)"""
+        batch_size = batch_size or self.connection.config.fetch_size
+        batch: Dict[str, List[Any]] = {name: [] for name in properties}
+        size = 0
+        columns = [batch[name] for name in properties]
+        for record in self._stream_records(AnalyticsQueries.project_properties(label, properties),
+                                           fetch_size=batch_size):
+            for column, value in zip(columns, record.values()):
+                column.append(value)
+            size += 1
+            if size == batch_size:
+                yield batch
+                batch = {name: [] for name in properties}
+                columns = [batch[name] for name in properties]
+                size = 0
+        if size:
+            yield batch
+
     def execute_single_query(self, query: str, parameters: Dict[str, Any] = None) -> Optional[Dict]:
         """Execute a query and return single result"""
-        with self.connection.get_session() as session:
-            result = session.run(query, parameters or {})
+        with self.connection.query_monitor.timed(query), self._runner() as runner:
+            result = runner.run(query, parameters or {})
             record = result.single()
             return dict(record) if record else None
 
     def execute_write_query(self, query: str, parameters: Dict[str, Any] = None) -> bool:
         """Execute a write query and return success status"""
+        if self.transaction is not None:
+            with self.connection.query_monitor.timed(query):
+                self.transaction.run(query, parameters or {}).consume()
+            self._mark_written()
+            return True
+
         try:
-            with self.connection.get_session() as session:
-                session.run(query, parameters or {})
-                return True
+            with self.connection.query_monitor.timed(query), self.connection.write_session() as session:
+                session.run(query, parameters or {}).consume()
+            self._mark_written()
+            return True
         except Exception as e:
             logger.error(f"Write query failed: {e}")
             return False
 
+    def execute_counted_write(self, query: str, parameters: Dict[str, Any] = None) -> Tuple[List[Dict], Any]:
+        """Execute a write query and return its records with the summary counters"""
+        with self.connection.query_monitor.timed(query), self._runner(write=True) as runner:
+            result = runner.run(query, parameters or {})
+            records = [dict(record) for record in result]
+            counters = result.consume().counters
+        self._mark_written()
+        return records, counters
+
+    def execute_batched_write(self, query: str, rows: Iterable[Dict[str, Any]],
+                              batch_size: Optional[int] = None,
+                              parameters: Dict[str, Any] = None) -> BatchWriteReport:
+        """Stream rows into an UNWIND $rows query, one explicit transaction per chunk.
+
+        `parameters` are passed to every chunk alongside $rows.
+        """
+        batch_size = batch_size or self.connection.config.batch_size
+        report = BatchWriteReport()
+        started = time.perf_counter()
+
+        if self.transaction is not None:
+            # Inside a unit of work every chunk shares the caller's transaction
+            for chunk in chunked(rows, batch_size):
+                with self.connection.query_monitor.timed(query):
+                    counters = self.transaction.run(query, {**(parameters or {}), "rows": chunk}).consume().counters
+                report.rows_written += len(chunk)
+                report.entities_created += counters.nodes_created + counters.relationships_created
+                report.chunks_written += 1
+            report.elapsed_seconds = time.perf_counter() - started
+            self._mark_written()
+            return report
+
+        with self.connection.write_session() as session:
+            for index, chunk in enumerate(chunked(rows, batch_size)):
+                try:
+                    with self.connection.query_monitor.timed(query), session.begin_transaction() as tx:
+                        summary = tx.run(query, {**(parameters or {}), "rows": chunk}).consume()
+                        tx.commit()
+
+                    counters = summary.counters
+                    report.rows_written += len(chunk)
+                    report.entities_created += counters.nodes_created + counters.relationships_created
+                    report.chunks_written += 1
+                except Exception as e:
+                    logger.error(f"Batch {index} failed ({len(chunk)} rows): {e}")
+                    report.failed_chunks.append(index)
+                    report.failed_rows += len(chunk)
+
+        report.elapsed_seconds = time.perf_counter() - started
+        if report.chunks_written:
+            self._mark_written()
+        logger.info(
+            f"Batched write: {report.rows_written} rows in {report.chunks_written} chunks "
+            f"({report.rows_per_second:.0f} rows/s), {len(report.failed_chunks)} failed chunks"
+        )
+        return report
+
+    def _cached_lookup(self, key: Any, loader: Callable[[], Optional[Dict]]) -> Optional[Dict]:
+        """Read a single entity through the cache, remembering misses as well.
+
+        Repositories bound to a transaction read the cache but never fill it,
+        so uncommitted data cannot leak to other callers.
+        """
+        if self.cache is None:
+            return loader()
+
+        found, value = self.cache.lookup(key)
+        if not found:
+            value = loader()
+            if self.transaction is None:
+                self.cache.store(key, value)
+        return dict(value) if value is not None else None
+
+    def _invalidate_cached(self, *keys: Any, clear: bool = False) -> None:
+        """Drop written entities from the cache, again after the unit of work commits"""
+        if self.cache is None:
+            return
+
+        def invalidate():
+            if clear:
+                self.cache.clear()
+            for key in keys:
+                self.cache.invalidate(key)
+
+        invalidate()
+        self._after_commit(invalidate)
+
+    def _exists(self, key: Any, loader: Callable[[], Optional[Dict]]) -> bool:
+        """Existence check that skips the database when the index rules the key out.
+
+        The index is only consulted once loaded. Positives are confirmed with
+        loader() unless existence_index_trust_positive is set.
+        """
+        index = self.existence_index
+        if index is None or not index.loaded or key in self._uncommitted_keys:
+            return loader() is not None
+
+        self._reconcile_if_due(index)
+        if not index.might_contain(key):
+            return False
+        if self.connection.config.existence_index_trust_positive:
+            return True
+        return loader() is not None
+
+    def _index_written(self, *keys: Any) -> None:
+        """Add created keys to the existence index, once the unit of work commits"""
+        if self.existence_index is None:
+            return
+
+        if self.unit_of_work is None:
+            for key in keys:
+                self.existence_index.add(key)
+            return
+
+        self._uncommitted_keys.update(keys)
+
+        def publish():
+            for key in keys:
+                self.existence_index.add(key)
+
+        self._after_commit(publish)
+
+    def _tracking_keys(self, rows: Iterable[Dict[str, Any]], keys: List[Any]) -> Iterator[Dict[str, Any]]:
+        """Pass rows through while collecting their key property"""
+        for row in rows:
+            keys.append(row[self.key_property])
+            yield row
+
+    def load_existence_index(self) -> int:
+        """(Re)build the existence index by streaming every key of the label"""
+        index = self.existence_index
+        if index is None:
+            return 0
+
+        expected = self.count_nodes(self.cache_name)
+        keys = (key
+                for batch in self.stream_columns(self.cache_name, [self.key_property])
+                for key in batch[self.key_property])
+        loaded = index.rebuild(keys, expected)
+        logger.info(f"Existence index for {self.cache_name}: {loaded} keys loaded")
+        return loaded
+
+    def _reconcile_if_due(self, index: ExistenceIndex) -> None:
+        """Rebuild a stale index in a background thread (one rebuild at a time)"""
+        if not index.claim_reconciliation():
+            return
+
+        def reconcile():
+            try:
+                type(self)(self.connection).load_existence_index()
+            except Exception as e:
+                logger.error(f"Existence index reconciliation for {self.cache_name} failed: {e}")
+            finally:
+                index.reconciliation_done()
+
+        threading.Thread(target=reconcile, name=f"{self.cache_name}-existence-index", daemon=True).start()
+
+    def _mark_written(self) -> None:
+        """Advance the data version now, or when the unit of work commits"""
+        if self.unit_of_work is not None:
+            self._after_commit(self.data_version.advance)
+        else:
+            self.data_version.advance()
+
+    def _after_commit(self, callback: Callable[[], None]) -> None:
+        """Defer callback until the unit of work commits; nothing to wait for otherwise"""
+        if self.unit_of_work is not None:
+            self.unit_of_work.after_commit(callback)
+
     def count_nodes(self, label: str) -> int:
         """Count nodes with specific label"""
         query = f"MATCH (n:{label}) RETURN count(n) as count"
         result = self.execute_single_query(query)
-        return result['count'] if result else 0
\ No newline at end of file
+        return result['count'] if result else 0
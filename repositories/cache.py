@@ -0,0 +1,204 @@
+"""
+Read-through entity cache for repository lookups
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+import threading
+import time
+
+
+class EntityCache:
+    """Thread-safe LRU cache with TTL expiry and negative caching.
+
+    A lookup that found nothing is cached as None with its own (usually
+    shorter) TTL, so repeated checks for a missing id skip the database too.
+
+    Any object with the same lookup/store/invalidate/clear/stats methods can
+    be plugged in instead (see set_entity_cache).
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 30.0, negative_ttl: float = 5.0,
+                 clock: Callable[[], float] = time.monotonic):
+        if max_size <= 0:
+            raise ValueError("Cache size must be positive")
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Any, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def lookup(self, key: Any) -> Tuple[bool, Optional[Any]]:
+        """Return (found, value); value is None for a cached miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+
+            value, expires_at = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return False, None
+
+            self._entries.move_to_end(key)
+            if value is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return True, value
+
+    def store(self, key: Any, value: Optional[Any]) -> None:
+        """Cache a loaded value, or None to remember that the key does not exist"""
+        ttl = self.negative_ttl if value is None else self.ttl
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (value, self._clock() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Any) -> None:
+        """Drop a key after it was written"""
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for sizing the cache"""
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "hit_ratio": round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
+
+
+class FriendSuggestionCache(EntityCache):
+    """EntityCache of friend suggestions per player that knows whom a new friendship affects.
+
+    Each player's entry is also indexed under each of their friends, so a
+    friendship between a and b drops the suggestions of a, b and every cached
+    player who is friends with either of them.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._players_by_friend: Dict[Any, set] = {}
+
+    def store_suggestions(self, player_id: Any, suggestions: Any, friend_ids) -> None:
+        """Cache a player's suggestions along with the friends they were computed from"""
+        with self._lock:
+            # Entries evicted or expired leave stale index entries behind; start over when they pile up
+            if len(self._players_by_friend) > 10 * self.max_size:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+                self._players_by_friend.clear()
+            for friend_id in friend_ids:
+                self._players_by_friend.setdefault(friend_id, set()).add(player_id)
+        self.store(player_id, suggestions)
+
+    def invalidate_friendship(self, *player_ids: Any) -> None:
+        """Drop the suggestions a friendship between player_ids changes"""
+        with self._lock:
+            affected = set(player_ids)
+            for player_id in player_ids:
+                affected |= self._players_by_friend.pop(player_id, set())
+        for player_id in affected:
+            self.invalidate(player_id)
+
+    def clear(self) -> None:
+        """Drop every entry and the friend index"""
+        with self._lock:
+            self._players_by_friend.clear()
+        super().clear()
+
+
+def friend_suggestion_cache_for(connection) -> Optional[FriendSuggestionCache]:
+    """Get the friend suggestion cache of this connection (None when disabled); listed with the entity caches"""
+    caches = connection.shared.setdefault('entity_caches', {})
+    if 'FriendSuggestions' not in caches:
+        config = connection.config
+        enabled = config.entity_cache_size > 0 and config.friend_suggestion_cache_ttl > 0
+        caches['FriendSuggestions'] = FriendSuggestionCache(
+            max_size=config.entity_cache_size,
+            ttl=config.friend_suggestion_cache_ttl
+        ) if enabled else None
+    return caches['FriendSuggestions']
+
+
+def entity_cache_for(connection, name: str):
+    """Get the cache shared by every repository of `name` on this connection (None when disabled)"""
+    caches = connection.shared.setdefault('entity_caches', {})
+    if name not in caches:
+        config = connection.config
+        caches[name] = EntityCache(
+            max_size=config.entity_cache_size,
+            ttl=config.entity_cache_ttl,
+            negative_ttl=config.entity_cache_negative_ttl
+        ) if config.entity_cache_size > 0 else None
+    return caches[name]
+
+
+def set_entity_cache(connection, name: str, cache) -> None:
+    """Plug a custom cache (or None to disable caching) for `name` on this connection"""
+    connection.shared.setdefault('entity_caches', {})[name] = cache
+
+
+def entity_cache_stats(connection) -> Dict[str, Dict[str, Any]]:
+    """Stats of every entity cache created on this connection"""
+    caches = connection.shared.get('entity_caches', {})
+    return {name: cache.stats() for name, cache in caches.items() if cache is not None}
+
+
+class DataVersion:
+    """Counter advanced by every write made through the repositories.
+
+    Derived results (snapshots, reports) remember the version they were built
+    at and are stale once it moves.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0
+
+    @property
+    def current(self) -> int:
+        """The current data version"""
+        return self._value
+
+    def advance(self) -> int:
+        """Record a write and return the new version"""
+        with self._lock:
+            self._value += 1
+            return self._value
+
+
+def data_version_for(connection) -> DataVersion:
+    """Get the data version shared by every repository on this connection"""
+    return connection.shared.setdefault('data_version', DataVersion())
@@ -2,42 +2,71 @@
 Repository for developer-related database operations
 """
 
-from repositories.base_repository import BaseRepository
+from repositories.base_repository import BaseRepository, BatchWriteReport
+from repositories.row_mappers import DEVELOPER_ROWS, RowFormat
 from queries import DeveloperQueries
 from models import Developer
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+
+def developer_parameters(developer: Developer) -> Dict:
+    """Map a Developer entity to query parameters"""
+    return {
+        "name": developer.name,
+        "founded_year": developer.founded_year,
+        "country": developer.country,
+        "employees": developer.employees
+    }
 
 
 class DeveloperRepository(BaseRepository):
     """Repository for developer-related operations"""
 
+    cache_name = "Developer"
+    key_property = "name"
+
     def create_developer(self, developer: Developer) -> bool:
         """Create a new developer"""
-        parameters = {
-            "name": developer.name,
-            "founded_year": developer.founded_year,
-            "country": developer.country,
-            "employees": developer.employees
-        }
-        return self.execute_write_query(DeveloperQueries.create_developer(), parameters)
-
-    def get_all_developers(self) -> List[Dict]:
-        """Get all developers"""
-        return self.execute_query(DeveloperQueries.get_all_developers())
+        created = self.execute_write_query(DeveloperQueries.create_developer(), developer_parameters(developer))
+        self._invalidate_cached(developer.name)
+        if created:
+            self._index_written(developer.name)
+        return created
+
+    def create_developers_bulk(self, developers: Iterable[Developer],
+                               batch_size: Optional[int] = None) -> BatchWriteReport:
+        """Create developers in UNWIND batches"""
+        return self._write_developers_bulk(DeveloperQueries.create_developers_bulk(), developers, batch_size)
+
+    def merge_developers_bulk(self, developers: Iterable[Developer],
+                              batch_size: Optional[int] = None) -> BatchWriteReport:
+        """Create the developers whose name does not exist yet in UNWIND batches; rewriting a batch is a no-op"""
+        return self._write_developers_bulk(DeveloperQueries.merge_developers_bulk(), developers, batch_size)
+
+    def _write_developers_bulk(self, query: str, developers: Iterable[Developer],
+                               batch_size: Optional[int]) -> BatchWriteReport:
+        """Write developers with a bulk query and refresh the cache and existence index"""
+        rows = (developer_parameters(developer) for developer in developers)
+        keys: List = []
+        report = self.execute_batched_write(query, self._tracking_keys(rows, keys), batch_size)
+        self._invalidate_cached(clear=True)
+        # Keys of failed chunks are indexed too; a false positive only costs a lookup
+        self._index_written(*keys)
+        return report
+
+    def get_all_developers(self, row_format: Union[RowFormat, str] = RowFormat.DICT) -> List[Any]:
+        """Get all developers, as dicts, tuples (field order of Developer) or Developer entities"""
+        return self.fetch_rows(DeveloperQueries.get_all_developers(), DEVELOPER_ROWS, row_format)
 
     def get_developer_by_name(self, name: str) -> Optional[Dict]:
         """Get developer by name"""
-        query = """
-        MATCH (d:Developer {name: $name})
-        RETURN d.name as name, d.founded_year as founded_year,
-               d.country as country, d.employees as employees
-        """
-        return self.execute_single_query(query, {"name": name})
+        return self._cached_lookup(name, lambda: self.execute_single_query(
+            DeveloperQueries.get_developer_by_name(), {"name": name}
+        ))
 
     def developer_exists(self, name: str) -> bool:
-        """Check if a developer exists"""
-        developer = self.get_developer_by_name(name)
-        return developer is not None
+        """Check if a developer exists, answering misses from the existence index"""
+        return self._exists(name, lambda: self.get_developer_by_name(name))
 
     def get_developers_count(self) -> int:
         """Get total number of developers"""
@@ -0,0 +1,176 @@
+"""
+In-memory existence index (Bloom filter) for repository *_exists checks
+"""
+
+from typing import Any, Dict, Iterable, Optional
+import hashlib
+import math
+import threading
+import time
+
+# Upper bound on hash functions per key; more only costs CPU once the budget is ample
+MAX_HASHES = 12
+
+
+class ExistenceIndex:
+    """Thread-safe Bloom filter over the keys of one label.
+
+    A negative answer is definitive, so callers can skip the database; a
+    positive answer may be a false positive (at roughly `false_positive_rate`)
+    and is normally confirmed with a lookup. The bit array never grows beyond
+    `memory_bytes`, whatever the number of keys.
+
+    Bloom filters cannot forget keys, so nodes deleted outside the repositories
+    only disappear on the next rebuild (see reconcile_interval).
+    """
+
+    def __init__(self, memory_bytes: int, reconcile_interval: float = 0.0,
+                 clock=time.monotonic):
+        if memory_bytes <= 0:
+            raise ValueError("Existence index memory budget must be positive")
+        self.memory_bytes = memory_bytes
+        self.reconcile_interval = reconcile_interval
+        self._clock = clock
+        self._bits = bytearray(memory_bytes)
+        self._bit_count = memory_bytes * 8
+        self._hash_count = 1
+        self._key_count = 0
+        self._lock = threading.Lock()
+        # Keys written while a rebuild streams ids; merged into the new filter
+        self._pending: Optional[set] = None
+        self._reconciling = False
+        self._reconcile_due_at = 0.0
+        self.loaded = False
+        self.loaded_at: Optional[float] = None
+        self.negatives = 0
+        self.positives = 0
+        self.rebuilds = 0
+
+    def _positions(self, key: Any, hash_count: int, bit_count: int):
+        """Bit positions of a key (double hashing over one 128-bit digest)"""
+        digest = hashlib.blake2b(str(key).encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % bit_count for i in range(hash_count)]
+
+    @staticmethod
+    def _set(bits: bytearray, positions) -> None:
+        """Set the bits at the given positions"""
+        for position in positions:
+            bits[position >> 3] |= 1 << (position & 7)
+
+    def might_contain(self, key: Any) -> bool:
+        """False means the key certainly does not exist"""
+        with self._lock:
+            bits = self._bits
+            present = all(bits[position >> 3] & (1 << (position & 7))
+                          for position in self._positions(key, self._hash_count, self._bit_count))
+            if present:
+                self.positives += 1
+            else:
+                self.negatives += 1
+            return present
+
+    def add(self, key: Any) -> None:
+        """Record a key written through a repository"""
+        with self._lock:
+            self._set(self._bits, self._positions(key, self._hash_count, self._bit_count))
+            self._key_count += 1
+            if self._pending is not None:
+                self._pending.add(key)
+
+    def rebuild(self, keys: Iterable[Any], expected_count: int) -> int:
+        """Replace the filter with one built from keys streamed from the database.
+
+        The hash count is tuned for `expected_count` keys in the memory budget.
+        Keys added while the stream runs are carried over to the new filter.
+        """
+        with self._lock:
+            self._pending = set()
+
+        hash_count = self._optimal_hash_count(expected_count)
+        bits = bytearray(self.memory_bytes)
+        count = 0
+        try:
+            for key in keys:
+                self._set(bits, self._positions(key, hash_count, self._bit_count))
+                count += 1
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+
+        with self._lock:
+            for key in self._pending:
+                self._set(bits, self._positions(key, hash_count, self._bit_count))
+            count += len(self._pending)
+            self._pending = None
+            self._bits = bits
+            self._hash_count = hash_count
+            self._key_count = count
+            self.loaded = True
+            self.loaded_at = self._clock()
+            self._reconcile_due_at = self.loaded_at + self.reconcile_interval
+            self.rebuilds += 1
+        return count
+
+    def _optimal_hash_count(self, expected_count: int) -> int:
+        """k = m/n * ln 2, with headroom for keys added after the load"""
+        expected = max(int(expected_count * 1.25), 1)
+        return max(1, min(MAX_HASHES, round(self._bit_count / expected * math.log(2))))
+
+    def claim_reconciliation(self) -> bool:
+        """True (once) when the filter is due for a rebuild; the caller must then rebuild"""
+        if not self.reconcile_interval or not self.loaded:
+            return False
+        with self._lock:
+            now = self._clock()
+            if self._reconciling or now < self._reconcile_due_at:
+                return False
+            # A failed rebuild is retried after another interval, not on every check
+            self._reconciling = True
+            self._reconcile_due_at = now + self.reconcile_interval
+            return True
+
+    def reconciliation_done(self) -> None:
+        """Release the claim taken by claim_reconciliation"""
+        with self._lock:
+            self._reconciling = False
+
+    @property
+    def false_positive_rate(self) -> float:
+        """Estimated false-positive probability at the current fill"""
+        k, n, m = self._hash_count, self._key_count, self._bit_count
+        return (1 - math.exp(-k * n / m)) ** k
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for sizing the memory budget"""
+        with self._lock:
+            return {
+                "loaded": self.loaded,
+                "keys": self._key_count,
+                "memory_bytes": self.memory_bytes,
+                "hash_count": self._hash_count,
+                "false_positive_rate": round(self.false_positive_rate, 6),
+                "negatives": self.negatives,
+                "positives": self.positives,
+                "rebuilds": self.rebuilds
+            }
+
+
+def existence_index_for(connection, name: str) -> Optional[ExistenceIndex]:
+    """Get the existence index shared by every repository of `name` on this connection (None when disabled)"""
+    indexes = connection.shared.setdefault('existence_indexes', {})
+    if name not in indexes:
+        config = connection.config
+        indexes[name] = ExistenceIndex(
+            memory_bytes=config.existence_index_memory,
+            reconcile_interval=config.existence_index_reconcile_interval
+        ) if config.existence_index_memory > 0 else None
+    return indexes[name]
+
+
+def existence_index_stats(connection) -> Dict[str, Dict[str, Any]]:
+    """Stats of every existence index created on this connection"""
+    indexes = connection.shared.get('existence_indexes', {})
+    return {name: index.stats() for name, index in indexes.items() if index is not None}
@@ -2,38 +2,101 @@
 Repository for game-related database operations
 """
 
-from repositories.base_repository import BaseRepository
-from queries import GameQueries
+from repositories.base_repository import BaseRepository, BatchWriteReport
+from repositories.pagination import Page, build_page, decode_page_token
+from repositories.row_mappers import GAME_ROWS, RowFormat
+from utils.statistics import describe_from_record, percentile_parameters
+from queries import GameQueries, AnalyticsQueries
 from models import Game
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
 from datetime import date
 
 
+def game_parameters(game: Game) -> Dict:
+    """Map a Game entity to query parameters"""
+    return {
+        "id": game.id,
+        "title": game.title,
+        "release_date": game.release_date.isoformat(),
+        "rating": game.rating,
+        "price": game.price,
+        "description": game.description
+    }
+
+
 class GameRepository(BaseRepository):
     """Repository for game-related operations"""
 
+    cache_name = "Game"
+
     def create_game(self, game: Game) -> bool:
         """Create a new game"""
-        parameters = {
-            "id": game.id,
-            "title": game.title,
-            "release_date": game.release_date.isoformat(),
-            "rating": game.rating,
-            "price": game.price,
-            "description": game.description
-        }
-        return self.execute_write_query(GameQueries.create_game(), parameters)
+        created = self.execute_write_query(GameQueries.create_game(), game_parameters(game))
+        self._invalidate_cached(game.id)
+        if created:
+            self._index_written(game.id)
+        return created
+
+    def create_games_bulk(self, games: Iterable[Game], batch_size: Optional[int] = None) -> BatchWriteReport:
+        """Create games in UNWIND batches"""
+        return self._write_games_bulk(GameQueries.create_games_bulk(), games, batch_size)
+
+    def merge_games_bulk(self, games: Iterable[Game], batch_size: Optional[int] = None) -> BatchWriteReport:
+        """Create the games whose id does not exist yet in UNWIND batches; rewriting a batch is a no-op"""
+        return self._write_games_bulk(GameQueries.merge_games_bulk(), games, batch_size)
+
+    def _write_games_bulk(self, query: str, games: Iterable[Game], batch_size: Optional[int]) -> BatchWriteReport:
+        """Write games with a bulk query and refresh the cache and existence index"""
+        rows = (game_parameters(game) for game in games)
+        keys: List = []
+        report = self.execute_batched_write(query, self._tracking_keys(rows, keys), batch_size)
+        self._invalidate_cached(clear=True)
+        # Keys of failed chunks are indexed too; a false positive only costs a lookup
+        self._index_written(*keys)
+        return report
+
+    def get_all_games(self, row_format: Union[RowFormat, str] = RowFormat.DICT) -> List[Any]:
+        """Get all games with basic information, as dicts, tuples (field order of Game) or Game entities"""
+        return self.fetch_rows(GameQueries.get_all_games(), GAME_ROWS, row_format)
 
-    def get_all_games(self) -> List[Dict]:
-        """Get all games with basic information"""
-        return self.execute_query(GameQueries.get_all_games())
+    def iter_all_games(self, fetch_size: Optional[int] = None,
+                     row_format: Union[RowFormat, str] = RowFormat.DICT) -> Iterator[Any]:
+        """Stream all games without holding them in memory"""
+        return self.stream_rows(GameQueries.get_all_games(), GAME_ROWS, row_format, fetch_size=fetch_size)
+
+    def get_games_page(self, limit: int = 50, page_token: Optional[str] = None) -> Page:
+        """Get one page of games in title order; pass the returned next_token to continue"""
+        if limit <= 0:
+            raise ValueError("Page limit must be positive")
+
+        if page_token is None:
+            rows = self.execute_query(GameQueries.get_games_first_page(), {"limit": limit + 1})
+        else:
+            after_title, after_id = decode_page_token(page_token)
+            rows = self.execute_query(
+                GameQueries.get_games_page_after(),
+                {"after_title": after_title, "after_id": after_id, "limit": limit + 1}
+            )
+        return build_page(rows, limit, 'title')
 
     def get_game_by_id(self, game_id: str) -> Optional[Dict]:
         """Get specific game by ID"""
-        return self.execute_single_query(
+        return self._cached_lookup(game_id, lambda: self.execute_single_query(
             GameQueries.get_game_by_id(),
             {"game_id": game_id}
+        ))
+
+    def get_game_statistics(self, percentiles: Sequence[float] = ()) -> Dict:
+        """Aggregate rating and price statistics in one server-side query"""
+        record = self.execute_single_query(
+            GameQueries.get_game_statistics(len(percentiles)),
+            percentile_parameters(percentiles)
         )
+        return {
+            "count": record['count'],
+            "rating": describe_from_record(record, 'rating', percentiles),
+            "price": describe_from_record(record, 'price', percentiles)
+        }
 
     def get_top_rated_games(self, limit: int = 10) -> List[Dict]:
         """Get top rated games"""
@@ -42,10 +105,24 @@ class GameRepository(BaseRepository):
             {"limit": limit}
         )
 
+    def get_game_stats(self, game_id: str) -> Optional[Dict]:
+        """Owner and rating figures of one game, read from its maintained aggregates"""
+        return self.execute_single_query(AnalyticsQueries.get_game_stats(), {"game_id": game_id})
+
+    def repair_game_aggregates(self, batch_size: Optional[int] = None) -> BatchWriteReport:
+        """Recompute owner_count, rating_count, rating_sum and avg_user_rating of every game in batches.
+
+        Backfills games created before the aggregates existed and repairs drift
+        from relationships written outside RelationshipRepository.
+        """
+        rows = ({"id": game_id}
+                for batch in self.stream_columns("Game", ["id"], batch_size)
+                for game_id in batch["id"])
+        return self.execute_batched_write(GameQueries.repair_game_aggregates(), rows, batch_size)
+
     def game_exists(self, game_id: str) -> bool:
-        """Check if a game exists"""
-        game = self.get_game_by_id(game_id)
-        return game is not None
+        """Check if a game exists, answering misses from the existence index"""
+        return self._exists(game_id, lambda: self.get_game_by_id(game_id))
 
     def get_games_count(self) -> int:
         """Get total number of games"""
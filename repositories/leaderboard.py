@@ -0,0 +1,185 @@
+"""
+In-memory sorted leaderboards for player rank lookups
+"""
+
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import threading
+import time
+
+# Marks a member removed while a reload streams scores
+_REMOVED = object()
+
+
+class Leaderboard:
+    """Thread-safe scores of one metric kept sorted best first.
+
+    rank() is a binary search over the sorted scores, so "what rank am I"
+    never scans every player. Ranks are competition ranks (1 + the number of
+    strictly higher scores), the same as LeaderboardQueries computes.
+
+    Writes through the repositories keep a loaded board current; writes made
+    elsewhere only show up after the next reload (see reload_interval).
+    """
+
+    def __init__(self, reload_interval: float = 0.0, clock=time.monotonic):
+        self.reload_interval = reload_interval
+        self._clock = clock
+        # (-score, member), ascending: best score first, ties by member
+        self._order: List[Tuple[Any, Any]] = []
+        self._scores: Dict[Any, Any] = {}
+        self._lock = threading.Lock()
+        # Scores written while a load streams (None when no load runs); applied on top of the new board
+        self._pending: Optional[Dict[Any, Any]] = None
+        # Bumped by invalidate() so a load that started earlier is discarded
+        self._generation = 0
+        self._reloading = False
+        self._reload_due_at = 0.0
+        self.loaded = False
+        self.loaded_at: Optional[float] = None
+        self.lookups = 0
+        self.updates = 0
+        self.reloads = 0
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def load(self, entries: Iterable[Tuple[Any, Any]]) -> Optional[int]:
+        """Replace the board with (member, score) pairs streamed from the database.
+
+        Scores written while the stream runs are carried over to the new board.
+        Only one load runs at a time: a concurrent call returns None without
+        reading entries, as does a load overtaken by invalidate().
+        """
+        with self._lock:
+            if self._pending is not None:
+                return None
+            self._pending = {}
+            generation = self._generation
+
+        try:
+            scores = {member: score for member, score in entries if score is not None}
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+
+        with self._lock:
+            pending, self._pending = self._pending, None
+            if generation != self._generation:
+                return None
+            for member, score in pending.items():
+                if score is _REMOVED:
+                    scores.pop(member, None)
+                else:
+                    scores[member] = score
+            self._scores = scores
+            self._order = sorted((-score, member) for member, score in scores.items())
+            self.loaded = True
+            self.loaded_at = self._clock()
+            self._reload_due_at = self.loaded_at + self.reload_interval
+            self.reloads += 1
+            return len(scores)
+
+    def update(self, member: Any, score: Any) -> None:
+        """Set a member's score (None removes the member)"""
+        with self._lock:
+            self._set(member, score)
+
+    def update_many(self, entries: Iterable[Tuple[Any, Any]]) -> None:
+        """Set the scores of several members"""
+        with self._lock:
+            for member, score in entries:
+                self._set(member, score)
+
+    def _set(self, member: Any, score: Any) -> None:
+        """Move a member to its new position; the lock must be held"""
+        if self._pending is not None:
+            self._pending[member] = _REMOVED if score is None else score
+        elif not self.loaded:
+            return
+        previous = self._scores.pop(member, None)
+        if previous is not None:
+            position = bisect_left(self._order, (-previous, member))
+            del self._order[position]
+        if score is not None:
+            self._scores[member] = score
+            insort(self._order, (-score, member))
+        self.updates += 1
+
+    def invalidate(self) -> None:
+        """Forget every score; the board is reloaded on next use"""
+        with self._lock:
+            self._order, self._scores = [], {}
+            self.loaded = False
+            self._generation += 1
+
+    def score(self, member: Any) -> Optional[Any]:
+        """A member's score, None when the member is not on the board"""
+        with self._lock:
+            return self._scores.get(member)
+
+    def rank(self, member: Any) -> Optional[Tuple[Any, int]]:
+        """(score, rank) of a member, None when the member is not on the board"""
+        with self._lock:
+            self.lookups += 1
+            score = self._scores.get(member)
+            if score is None:
+                return None
+            return score, bisect_left(self._order, (-score,)) + 1
+
+    def top(self, limit: int) -> List[Tuple[Any, Any, int]]:
+        """(member, score, rank) of the best `limit` members"""
+        with self._lock:
+            self.lookups += 1
+            entries = []
+            for position, (negated, member) in enumerate(self._order[:max(limit, 0)]):
+                same_as_previous = entries and entries[-1][1] == -negated
+                entries.append((member, -negated, entries[-1][2] if same_as_previous else position + 1))
+            return entries
+
+    def claim_reload(self) -> bool:
+        """True (once) when the board is due for a reload; the caller must then reload"""
+        if not self.reload_interval or not self.loaded:
+            return False
+        with self._lock:
+            now = self._clock()
+            if self._reloading or now < self._reload_due_at:
+                return False
+            # A failed reload is retried after another interval, not on every lookup
+            self._reloading = True
+            self._reload_due_at = now + self.reload_interval
+            return True
+
+    def reload_done(self) -> None:
+        """Release the claim taken by claim_reload"""
+        with self._lock:
+            self._reloading = False
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for sizing and monitoring"""
+        with self._lock:
+            return {
+                "loaded": self.loaded,
+                "members": len(self._scores),
+                "lookups": self.lookups,
+                "updates": self.updates,
+                "reloads": self.reloads
+            }
+
+
+def leaderboard_for(connection, metric: str) -> Optional[Leaderboard]:
+    """Get the leaderboard of a metric shared by every repository on this connection (None when disabled)"""
+    boards = connection.shared.setdefault('leaderboards', {})
+    if metric not in boards:
+        config = connection.config
+        boards[metric] = Leaderboard(
+            reload_interval=config.leaderboard_reload_interval
+        ) if config.leaderboard_in_memory else None
+    return boards[metric]
+
+
+def leaderboard_stats(connection) -> Dict[str, Dict[str, Any]]:
+    """Stats of every leaderboard created on this connection"""
+    boards = connection.shared.get('leaderboards', {})
+    return {metric: board.stats() for metric, board in boards.items() if board is not None}
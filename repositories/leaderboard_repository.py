@@ -0,0 +1,113 @@
+"""
+Repository for player leaderboards
+"""
+
+from repositories.base_repository import BaseRepository
+from repositories.leaderboard import Leaderboard, leaderboard_for
+from queries import LeaderboardQueries
+from utils import setup_logger
+from typing import Dict, List, Optional
+import threading
+
+logger = setup_logger(__name__)
+
+
+class LeaderboardRepository(BaseRepository):
+    """Top-N and rank-of-player lookups by level, total playtime and per-game playtime.
+
+    Top-N lists are index-backed ORDER BY ... LIMIT queries. Global ranks
+    come from the in-memory Leaderboard of the metric, loaded on first use
+    and kept warm by PlayerRepository writes; without one (or inside a unit
+    of work before it is loaded) they are counted by the database.
+    """
+
+    @staticmethod
+    def _require_metric(metric: str) -> None:
+        """Reject properties that have no leaderboard"""
+        if metric not in LeaderboardQueries.METRICS:
+            raise ValueError(f"Unknown leaderboard metric {metric!r}; expected one of {LeaderboardQueries.METRICS}")
+
+    @staticmethod
+    def _ranked(rows: List[Dict]) -> List[Dict]:
+        """Add competition ranks to rows sorted best first"""
+        for position, row in enumerate(rows):
+            tied = position and rows[position - 1]['score'] == row['score']
+            row['rank'] = rows[position - 1]['rank'] if tied else position + 1
+        return rows
+
+    def get_top_players(self, metric: str, limit: int) -> List[Dict]:
+        """Best `limit` players by a metric: id, username, score and rank"""
+        self._require_metric(metric)
+        return self._ranked(self.execute_query(LeaderboardQueries.get_top_players(metric), {"limit": limit}))
+
+    def get_game_top_players(self, game_id: str, limit: int) -> List[Dict]:
+        """Best `limit` owners of a game by playtime: id, username, score and rank"""
+        parameters = {"game_id": game_id, "limit": limit}
+        return self._ranked(self.execute_query(LeaderboardQueries.get_game_top_players(), parameters))
+
+    def get_player_rank(self, player_id: str, metric: str) -> Optional[Dict]:
+        """{score, rank} of a player by a metric, None when the player has no score"""
+        self._require_metric(metric)
+        board = self._loaded_board(metric)
+        if board is None:
+            return self.execute_single_query(LeaderboardQueries.get_player_rank(metric), {"player_id": player_id})
+
+        ranked = board.rank(player_id)
+        if ranked is None:
+            return None
+        score, rank = ranked
+        return {"score": score, "rank": rank}
+
+    def get_game_player_rank(self, player_id: str, game_id: str) -> Optional[Dict]:
+        """{score, rank} of a player among the owners of a game, None when they do not own it"""
+        parameters = {"player_id": player_id, "game_id": game_id}
+        return self.execute_single_query(LeaderboardQueries.get_game_player_rank(), parameters)
+
+    def load_leaderboard(self, metric: str) -> int:
+        """(Re)load the in-memory leaderboard of a metric by streaming every score.
+
+        Returns 0 when another load of the board is already running.
+        """
+        self._require_metric(metric)
+        board = leaderboard_for(self.connection, metric)
+        if board is None:
+            return 0
+
+        rows = self.stream_query(LeaderboardQueries.get_scores(metric))
+        loaded = board.load((row['id'], row['score']) for row in rows)
+        if loaded is None:
+            logger.debug(f"Leaderboard for {metric} is already loading or was invalidated meanwhile")
+            return 0
+        logger.info(f"Leaderboard for {metric}: {loaded} players loaded")
+        return loaded
+
+    def _loaded_board(self, metric: str) -> Optional[Leaderboard]:
+        """The metric's board, loading it on first use; None to ask the database instead"""
+        board = leaderboard_for(self.connection, metric)
+        if board is None:
+            return None
+        if not board.loaded:
+            # Like the entity caches, a unit of work reads the board but never fills it
+            if self.transaction is not None:
+                return None
+            self.load_leaderboard(metric)
+            # Another request is loading it: count in the database rather than wait
+            if not board.loaded:
+                return None
+        self._reload_if_due(board, metric)
+        return board
+
+    def _reload_if_due(self, board: Leaderboard, metric: str) -> None:
+        """Reload a stale board in a background thread (one reload at a time)"""
+        if not board.claim_reload():
+            return
+
+        def reload():
+            try:
+                LeaderboardRepository(self.connection).load_leaderboard(metric)
+            except Exception as e:
+                logger.error(f"Leaderboard reload for {metric} failed: {e}")
+            finally:
+                board.reload_done()
+
+        threading.Thread(target=reload, name=f"{metric}-leaderboard", daemon=True).start()
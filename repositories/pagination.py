@@ -0,0 +1,46 @@
+"""
+Keyset (cursor-based) pagination helpers
+"""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+
+@dataclass
+class Page:
+    """One page of results plus the token that continues after it"""
+    items: List[Dict] = field(default_factory=list)
+    next_token: Optional[str] = None
+
+    @property
+    def has_more(self) -> bool:
+        """True when another page follows this one"""
+        return self.next_token is not None
+
+
+def encode_page_token(sort_value: Any, node_id: str) -> str:
+    """Encode the last (sort key, id) seen into an opaque continuation token"""
+    payload = json.dumps([sort_value, node_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_page_token(token: str) -> Tuple[Any, str]:
+    """Decode a continuation token back into its (sort key, id) pair"""
+    try:
+        sort_value, node_id = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+    except (binascii.Error, UnicodeError, ValueError, TypeError) as e:
+        raise ValueError(f"Invalid page token: {token!r}") from e
+    return sort_value, node_id
+
+
+def build_page(rows: List[Dict], limit: int, sort_key: str) -> Page:
+    """Turn limit + 1 fetched rows into a Page, using the extra row to detect a next page"""
+    if len(rows) <= limit:
+        return Page(items=rows)
+
+    items = rows[:limit]
+    last = items[-1]
+    return Page(items=items, next_token=encode_page_token(last[sort_key], last['id']))
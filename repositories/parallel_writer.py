@@ -0,0 +1,218 @@
+"""
+Parallel UNWIND writer that partitions rows by their contended endpoint
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+from neo4j.exceptions import TransientError
+import queue
+import random
+import threading
+import time
+
+from utils import setup_logger
+
+logger = setup_logger(__name__)
+
+DEADLOCK_CODE = "Neo.TransientError.Transaction.DeadlockDetected"
+# Longest single backoff between retries of a chunk
+MAX_BACKOFF_SECONDS = 5.0
+# Chunks buffered per worker before the producer blocks
+QUEUE_DEPTH = 2
+
+
+@dataclass
+class ParallelWriteReport:
+    """Outcome and contention metrics of a parallel batched write"""
+    rows_written: int = 0
+    entities_created: int = 0
+    chunks_written: int = 0
+    failed_chunks: List[int] = field(default_factory=list)
+    failed_rows: int = 0
+    elapsed_seconds: float = 0.0
+    workers: int = 0
+    # Retries by cause, and the time spent sleeping before them
+    retries: int = 0
+    deadlocks: int = 0
+    transient_errors: int = 0
+    backoff_seconds: float = 0.0
+    # Time the producer waited for a busy partition: high values mean one hot endpoint dominates
+    producer_wait_seconds: float = 0.0
+    worker_rows: List[int] = field(default_factory=list)
+    hottest_key: Optional[Any] = None
+    hottest_key_rows: int = 0
+
+    @classmethod
+    def from_batched(cls, batched) -> "ParallelWriteReport":
+        """The report of a write that ran serially through execute_batched_write() (one worker, no retries)"""
+        return cls(
+            rows_written=batched.rows_written,
+            entities_created=batched.entities_created,
+            chunks_written=batched.chunks_written,
+            failed_chunks=list(batched.failed_chunks),
+            failed_rows=batched.failed_rows,
+            elapsed_seconds=batched.elapsed_seconds,
+            workers=1,
+            worker_rows=[batched.rows_written]
+        )
+
+    @property
+    def rows_per_second(self) -> float:
+        """Throughput of the committed rows"""
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.rows_written / self.elapsed_seconds
+
+    @property
+    def success(self) -> bool:
+        """True when every chunk was committed"""
+        return not self.failed_chunks
+
+    @property
+    def partition_skew(self) -> float:
+        """Rows of the busiest worker over the mean (1.0 is perfectly balanced)"""
+        if not self.worker_rows or not sum(self.worker_rows):
+            return 1.0
+        return max(self.worker_rows) / (sum(self.worker_rows) / len(self.worker_rows))
+
+
+class ParallelBatchWriter:
+    """Runs an UNWIND $rows write on a pool of threads, one session each.
+
+    Every row is routed to a worker by its partition key (the Game id for
+    OWNS and RATED), so all the rows touching one Game are written by the
+    same worker, one transaction after another, and no two concurrent
+    transactions ever lock the same hot node. Rows within a chunk are sorted
+    by their other endpoint so transactions that share Players take those
+    locks in the same order. Deadlocks and other transient errors that still
+    happen are retried with jittered exponential backoff.
+    """
+
+    def __init__(self, repository, workers: Optional[int] = None, max_retries: Optional[int] = None,
+                 backoff: Optional[float] = None):
+        config = repository.connection.config
+        self.repository = repository
+        self.connection = repository.connection
+        # Each worker holds a pooled connection for the whole write
+        self.workers = max(1, min(workers or config.parallel_write_workers, config.max_connection_pool_size))
+        self.max_retries = config.write_retry_attempts if max_retries is None else max_retries
+        self.backoff = config.write_retry_backoff if backoff is None else backoff
+
+    def write(self, query: str, rows: Iterable[Dict[str, Any]], partition_key: str,
+              order_key: Optional[str] = None, batch_size: Optional[int] = None) -> ParallelWriteReport:
+        """Stream rows into the query; memory is bounded by workers x batch_size x QUEUE_DEPTH"""
+        batch_size = batch_size or self.connection.config.batch_size
+        report = ParallelWriteReport(workers=self.workers, worker_rows=[0] * self.workers)
+        lock = threading.Lock()
+        queues = [queue.Queue(maxsize=QUEUE_DEPTH) for _ in range(self.workers)]
+        threads = [
+            threading.Thread(target=self._work, args=(index, queues[index], query, order_key, report, lock),
+                             name=f"parallel-writer-{index}", daemon=True)
+            for index in range(self.workers)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+
+        buffers: List[List[Dict[str, Any]]] = [[] for _ in range(self.workers)]
+        key_rows = Counter()
+        sequence = 0
+        try:
+            for row in rows:
+                key = row[partition_key]
+                key_rows[key] += 1
+                partition = hash(key) % self.workers
+                buffers[partition].append(row)
+                if len(buffers[partition]) >= batch_size:
+                    self._submit(queues[partition], (sequence, buffers[partition]), report)
+                    buffers[partition] = []
+                    sequence += 1
+
+            for partition, buffer in enumerate(buffers):
+                if buffer:
+                    self._submit(queues[partition], (sequence, buffer), report)
+                    sequence += 1
+        finally:
+            for worker_queue in queues:
+                worker_queue.put(None)
+            for thread in threads:
+                thread.join()
+
+        report.elapsed_seconds = time.perf_counter() - started
+        if key_rows:
+            report.hottest_key, report.hottest_key_rows = key_rows.most_common(1)[0]
+        if report.chunks_written:
+            self.repository._mark_written()
+        logger.info(
+            f"Parallel write: {report.rows_written} rows in {report.chunks_written} chunks on {self.workers} workers "
+            f"({report.rows_per_second:.0f} rows/s), {report.deadlocks} deadlocks, {report.retries} retries, "
+            f"{len(report.failed_chunks)} failed chunks, skew {report.partition_skew:.2f}"
+        )
+        return report
+
+    @staticmethod
+    def _submit(worker_queue: queue.Queue, item, report: ParallelWriteReport) -> None:
+        """Hand a chunk to its worker, recording how long a full queue held the producer"""
+        started = time.perf_counter()
+        worker_queue.put(item)
+        report.producer_wait_seconds += time.perf_counter() - started
+
+    def _work(self, index: int, worker_queue: queue.Queue, query: str, order_key: Optional[str],
+              report: ParallelWriteReport, lock: threading.Lock) -> None:
+        """Write the chunks of one partition in order until the producer is done"""
+        try:
+            session = self.connection.write_session()
+        except Exception as e:
+            logger.error(f"Parallel writer {index} could not open a session: {e}")
+            session = None
+
+        try:
+            for sequence, chunk in iter(worker_queue.get, None):
+                # A chunk that cannot be written fails alone; the worker keeps draining its queue
+                try:
+                    if order_key:
+                        chunk.sort(key=lambda row: row[order_key])
+                    counters = self._write_chunk(session, query, chunk, report, lock) if session else None
+                except Exception as e:
+                    logger.error(f"Parallel writer {index} failed on a chunk of {len(chunk)} rows: {e}")
+                    counters = None
+                with lock:
+                    if counters is None:
+                        report.failed_chunks.append(sequence)
+                        report.failed_rows += len(chunk)
+                        continue
+                    report.rows_written += len(chunk)
+                    report.entities_created += counters.nodes_created + counters.relationships_created
+                    report.chunks_written += 1
+                    report.worker_rows[index] += len(chunk)
+        finally:
+            if session is not None:
+                session.close()
+
+    def _write_chunk(self, session, query: str, chunk: List[Dict[str, Any]],
+                     report: ParallelWriteReport, lock: threading.Lock):
+        """Commit one chunk, retrying transient errors; the counters, or None once it gives up"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self.connection.query_monitor.timed(query), session.begin_transaction() as tx:
+                    summary = tx.run(query, {"rows": chunk}).consume()
+                    tx.commit()
+                return summary.counters
+            except TransientError as e:
+                if attempt == self.max_retries:
+                    logger.error(f"Chunk of {len(chunk)} rows failed after {attempt} retries: {e}")
+                    return None
+                delay = min(MAX_BACKOFF_SECONDS, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.5)
+                with lock:
+                    report.retries += 1
+                    report.backoff_seconds += delay
+                    if e.code == DEADLOCK_CODE:
+                        report.deadlocks += 1
+                    else:
+                        report.transient_errors += 1
+                time.sleep(delay)
+            except Exception as e:
+                logger.error(f"Chunk of {len(chunk)} rows failed: {e}")
+                return None
+        return None
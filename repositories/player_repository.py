@@ -2,37 +2,138 @@
 Repository for player-related database operations
 """
 
-from repositories.base_repository import BaseRepository
-from queries import PlayerQueries, AnalyticsQueries
+from repositories.base_repository import BaseRepository, BatchWriteReport
+from repositories.leaderboard import leaderboard_for
+from repositories.pagination import Page, build_page, decode_page_token
+from repositories.row_mappers import PLAYER_ROWS, RowFormat
+from utils.statistics import describe_from_record, percentile_parameters
+from queries import PlayerQueries, AnalyticsQueries, LeaderboardQueries
 from models import Player
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+
+def player_parameters(player: Player) -> Dict:
+    """Map a Player entity to query parameters"""
+    return {
+        "id": player.id,
+        "username": player.username,
+        "email": player.email,
+        "join_date": player.join_date.isoformat(),
+        "level": player.level,
+        "total_playtime": player.total_playtime
+    }
 
 
 class PlayerRepository(BaseRepository):
     """Repository for player-related operations"""
 
+    cache_name = "Player"
+
     def create_player(self, player: Player) -> bool:
         """Create a new player"""
-        parameters = {
-            "id": player.id,
-            "username": player.username,
-            "email": player.email,
-            "join_date": player.join_date.isoformat(),
-            "level": player.level,
-            "total_playtime": player.total_playtime
-        }
-        return self.execute_write_query(PlayerQueries.create_player(), parameters)
+        created = self.execute_write_query(PlayerQueries.create_player(), player_parameters(player))
+        self._invalidate_cached(player.id)
+        if created:
+            self._index_written(player.id)
+            self._update_leaderboards([player_parameters(player)])
+        return created
+
+    def create_players_bulk(self, players: Iterable[Player], batch_size: Optional[int] = None) -> BatchWriteReport:
+        """Create players in UNWIND batches"""
+        return self._write_players_bulk(PlayerQueries.create_players_bulk(), players, batch_size)
+
+    def merge_players_bulk(self, players: Iterable[Player], batch_size: Optional[int] = None) -> BatchWriteReport:
+        """Create the players whose id does not exist yet in UNWIND batches; rewriting a batch is a no-op"""
+        return self._write_players_bulk(PlayerQueries.merge_players_bulk(), players, batch_size)
+
+    def _write_players_bulk(self, query: str, players: Iterable[Player],
+                            batch_size: Optional[int]) -> BatchWriteReport:
+        """Write players with a bulk query and refresh the cache, existence index and leaderboards"""
+        batch_size = batch_size or self.connection.config.batch_size
+        rows = (player_parameters(player) for player in players)
+        keys: List = []
+        written: List[Dict] = []
+        report = self.execute_batched_write(
+            query, self._tracking_scores(self._tracking_keys(rows, keys), written, batch_size), batch_size
+        )
+        self._invalidate_cached(clear=True)
+        # Keys of failed chunks are indexed too; a false positive only costs a lookup
+        self._index_written(*keys)
+        # A wrong rank costs more: reload the leaderboards rather than guess which rows were written
+        # (failed chunks, players a merge left alone), and after writes of more than one chunk,
+        # whose scores were not kept
+        reload = report.entities_created < report.rows_written or len(written) > batch_size
+        self._update_leaderboards(written, reload=bool(report.failed_chunks) or reload)
+        return report
+
+    @staticmethod
+    def _tracking_scores(rows: Iterable[Dict], written: List[Dict], limit: int) -> Iterator[Dict]:
+        """Pass rows through while keeping the leaderboard scores of up to limit + 1 rows"""
+        for row in rows:
+            if len(written) <= limit:
+                written.append({"id": row["id"], **{metric: row[metric] for metric in LeaderboardQueries.METRICS}})
+            yield row
 
-    def get_all_players(self) -> List[Dict]:
-        """Get all players"""
-        return self.execute_query(PlayerQueries.get_all_players())
+    def _update_leaderboards(self, rows: List[Dict], reload: bool = False) -> None:
+        """Apply written players' scores to the loaded leaderboards, once the unit of work commits"""
+        boards = [(metric, leaderboard_for(self.connection, metric)) for metric in LeaderboardQueries.METRICS]
+
+        def publish():
+            for metric, board in boards:
+                if board is None:
+                    continue
+                if reload:
+                    board.invalidate()
+                else:
+                    board.update_many((row["id"], row[metric]) for row in rows)
+
+        if self.unit_of_work is None:
+            publish()
+        else:
+            self._after_commit(publish)
+
+    def get_all_players(self, row_format: Union[RowFormat, str] = RowFormat.DICT) -> List[Any]:
+        """Get all players, as dicts, tuples (field order of Player) or Player entities"""
+        return self.fetch_rows(PlayerQueries.get_all_players(), PLAYER_ROWS, row_format)
+
+    def iter_all_players(self, fetch_size: Optional[int] = None,
+                     row_format: Union[RowFormat, str] = RowFormat.DICT) -> Iterator[Any]:
+        """Stream all players without holding them in memory"""
+        return self.stream_rows(PlayerQueries.get_all_players(), PLAYER_ROWS, row_format, fetch_size=fetch_size)
+
+    def get_players_page(self, limit: int = 50, page_token: Optional[str] = None) -> Page:
+        """Get one page of players in username order; pass the returned next_token to continue"""
+        if limit <= 0:
+            raise ValueError("Page limit must be positive")
+
+        if page_token is None:
+            rows = self.execute_query(PlayerQueries.get_players_first_page(), {"limit": limit + 1})
+        else:
+            after_username, after_id = decode_page_token(page_token)
+            rows = self.execute_query(
+                PlayerQueries.get_players_page_after(),
+                {"after_username": after_username, "after_id": after_id, "limit": limit + 1}
+            )
+        return build_page(rows, limit, 'username')
 
     def get_player_by_id(self, player_id: str) -> Optional[Dict]:
         """Get player by ID"""
-        return self.execute_single_query(
+        return self._cached_lookup(player_id, lambda: self.execute_single_query(
             PlayerQueries.get_player_by_id(),
             {"player_id": player_id}
+        ))
+
+    def get_player_statistics(self, percentiles: Sequence[float] = ()) -> Dict:
+        """Aggregate level and playtime statistics in one server-side query"""
+        record = self.execute_single_query(
+            PlayerQueries.get_player_statistics(len(percentiles)),
+            percentile_parameters(percentiles)
         )
+        return {
+            "count": record['count'],
+            "level": describe_from_record(record, 'level', percentiles),
+            "playtime": describe_from_record(record, 'playtime', percentiles)
+        }
 
     def get_player_games(self, player_id: str) -> List[Dict]:
         """Get all games owned by a player"""
@@ -42,9 +143,8 @@ class PlayerRepository(BaseRepository):
         )
 
     def player_exists(self, player_id: str) -> bool:
-        """Check if a player exists"""
-        player = self.get_player_by_id(player_id)
-        return player is not None
+        """Check if a player exists, answering misses from the existence index"""
+        return self._exists(player_id, lambda: self.get_player_by_id(player_id))
 
     def get_players_count(self) -> int:
         """Get total number of players"""
@@ -0,0 +1,74 @@
+"""
+Repository for precomputed game recommendations
+"""
+
+from repositories.base_repository import BaseRepository, BatchWriteReport
+from queries import RecommendationQueries
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class RecommendationRepository(BaseRepository):
+    """Repository for RECOMMENDED relationships and the co-occurrence data they are built from"""
+
+    def get_interaction_counts(self, like_threshold: float) -> Dict[str, int]:
+        """Distinct interacting players per game id"""
+        rows = self.stream_query(RecommendationQueries.get_interaction_counts(), {"like_threshold": like_threshold})
+        return {row['game_id']: row['players'] for row in rows}
+
+    def get_interaction_counts_for_games(self, game_ids: List[str], like_threshold: float) -> Dict[str, int]:
+        """Distinct interacting players of the given games, by game id"""
+        parameters = {"game_ids": game_ids, "like_threshold": like_threshold}
+        rows = self.execute_query(RecommendationQueries.get_interaction_counts_for_games(), parameters)
+        return {row['game_id']: row['players'] for row in rows}
+
+    def get_co_occurring_games(self, game_ids: List[str], like_threshold: float,
+                               candidate_limit: int) -> Dict[str, List[Tuple[str, int]]]:
+        """For each game, up to candidate_limit (other game id, shared players) pairs, most shared first"""
+        parameters = {
+            "game_ids": game_ids,
+            "like_threshold": like_threshold,
+            "candidate_limit": candidate_limit
+        }
+        return {
+            row['game_id']: [(game_id, together) for game_id, together in row['candidates']]
+            for row in self.execute_query(RecommendationQueries.get_co_occurring_games(), parameters)
+        }
+
+    def store_game_recommendations(self, rows: Iterable[Dict],
+                                   batch_size: Optional[int] = None) -> BatchWriteReport:
+        """Replace the RECOMMENDED games of games from {game_id, recommendations} rows"""
+        return self.execute_batched_write(RecommendationQueries.store_game_recommendations(), rows, batch_size)
+
+    def refresh_player_recommendations(self, player_ids: Iterable[str], like_threshold: float, limit: int,
+                                       batch_size: Optional[int] = None) -> BatchWriteReport:
+        """Recompute and replace the RECOMMENDED games of players, in UNWIND batches"""
+        rows = ({"player_id": player_id} for player_id in player_ids)
+        parameters = {"like_threshold": like_threshold, "limit": limit}
+        return self.execute_batched_write(
+            RecommendationQueries.refresh_player_recommendations(), rows, batch_size, parameters
+        )
+
+    def iter_stale_player_ids(self) -> Iterator[str]:
+        """Stream ids of players whose library changed since their last refresh"""
+        for row in self.stream_query(RecommendationQueries.get_stale_players()):
+            yield row['player_id']
+
+    def iter_player_ids(self) -> Iterator[str]:
+        """Stream every player id"""
+        for row in self.stream_query(RecommendationQueries.get_all_player_ids()):
+            yield row['player_id']
+
+    def get_games_of_players(self, player_ids: List[str], like_threshold: float) -> List[str]:
+        """Distinct ids of the games the players interact with"""
+        parameters = {"player_ids": player_ids, "like_threshold": like_threshold}
+        return [row['game_id'] for row in self.execute_query(RecommendationQueries.get_games_of_players(), parameters)]
+
+    def get_player_recommendations(self, player_id: str, limit: int) -> List[Dict]:
+        """Stored top games for a player, best first, without games they own"""
+        parameters = {"player_id": player_id, "limit": limit}
+        return self.execute_query(RecommendationQueries.get_player_recommendations(), parameters)
+
+    def get_similar_games(self, game_id: str, limit: int, player_id: Optional[str] = None) -> List[Dict]:
+        """Stored top games for a game, best first, optionally without games player_id owns"""
+        parameters = {"game_id": game_id, "player_id": player_id, "limit": limit}
+        return self.execute_query(RecommendationQueries.get_similar_games(), parameters)
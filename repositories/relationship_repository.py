@@ -2,44 +2,147 @@
 Repository for managing relationships between entities
 """
 
-from repositories.base_repository import BaseRepository
+from repositories.base_repository import BaseRepository, BatchWriteReport
+from repositories.cache import friend_suggestion_cache_for
+from repositories.parallel_writer import ParallelBatchWriter, ParallelWriteReport
 from queries import RelationshipQueries
-from models import PlayerOwnsGame, PlayerRatesGame, PlayerFriendship
-from typing import Dict, List, Optional
+from models import PlayerOwnsGame, PlayerRatesGame, PlayerFriendship, PurchaseStatus
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Suggestions computed (and cached) per player; callers get a prefix
+MAX_FRIEND_SUGGESTIONS = 50
+# Friends of friends with the most mutual friends that are checked for shared games
+FRIEND_SUGGESTION_CANDIDATES = 200
+
+
+def ownership_parameters(player_id: str, game_id: str, ownership: PlayerOwnsGame) -> Dict:
+    """Map an OWNS relationship to query parameters"""
+    return {
+        "player_id": player_id,
+        "game_id": game_id,
+        "purchase_date": ownership.purchase_date.isoformat(),
+        "playtime": ownership.playtime
+    }
+
+
+def rating_parameters(player_id: str, game_id: str, rating: PlayerRatesGame) -> Dict:
+    """Map a RATED relationship to query parameters"""
+    return {
+        "player_id": player_id,
+        "game_id": game_id,
+        "rating": rating.rating,
+        "review_date": rating.review_date.isoformat(),
+        "review_text": rating.review_text
+    }
+
+
+def friendship_parameters(player1_id: str, player2_id: str, friendship: PlayerFriendship) -> Dict:
+    """Map a FRIENDS_WITH relationship to query parameters"""
+    return {
+        "player1_id": player1_id,
+        "player2_id": player2_id,
+        "since": friendship.since.isoformat()
+    }
+
+
+def purchase_status(found: Dict, relationship_created: bool) -> PurchaseStatus:
+    """Derive a PurchaseStatus from the endpoint flags returned by a purchase query"""
+    if not found['player_found']:
+        return PurchaseStatus.MISSING_PLAYER
+    if not found['game_found']:
+        return PurchaseStatus.MISSING_GAME
+    if relationship_created:
+        return PurchaseStatus.CREATED
+    return PurchaseStatus.ALREADY_OWNED
+
+
+def cart_parameters(player_id: str, game_ids: Iterable[str], ownership: PlayerOwnsGame) -> Dict:
+    """Map a checkout cart to query parameters, dropping duplicate games"""
+    return {
+        "player_id": player_id,
+        "game_ids": list(dict.fromkeys(game_ids)),
+        "purchase_date": ownership.purchase_date.isoformat(),
+        "playtime": ownership.playtime
+    }
+
+
+def cart_statuses(records: List[Dict]) -> Dict[str, PurchaseStatus]:
+    """Map each game of a cart to its PurchaseStatus"""
+    return {
+        record['game_id']: purchase_status(record, not record['already_owned'])
+        for record in records
+    }
 
 
 class RelationshipRepository(BaseRepository):
     """Repository for relationship operations"""
 
+    def __init__(self, connection, transaction=None, unit_of_work=None):
+        super().__init__(connection, transaction, unit_of_work)
+        self.friend_suggestions = friend_suggestion_cache_for(connection)
+
     def create_player_owns_game(self, player_id: str, game_id: str, ownership: PlayerOwnsGame) -> bool:
         """Create OWNS relationship between player and game"""
-        parameters = {
-            "player_id": player_id,
-            "game_id": game_id,
-            "purchase_date": ownership.purchase_date.isoformat(),
-            "playtime": ownership.playtime
-        }
+        parameters = ownership_parameters(player_id, game_id, ownership)
         return self.execute_write_query(RelationshipQueries.player_owns_game(), parameters)
 
+    def purchase_game(self, player_id: str, game_id: str, ownership: PlayerOwnsGame) -> PurchaseStatus:
+        """MERGE the OWNS relationship in one statement and report what happened"""
+        parameters = ownership_parameters(player_id, game_id, ownership)
+        records, counters = self.execute_counted_write(RelationshipQueries.purchase_game(), parameters)
+        return purchase_status(records[0], counters.relationships_created > 0)
+
+    def purchase_games(self, player_id: str, game_ids: Iterable[str],
+                       ownership: PlayerOwnsGame) -> Dict[str, PurchaseStatus]:
+        """MERGE OWNS relationships for a whole checkout cart in one statement"""
+        parameters = cart_parameters(player_id, game_ids, ownership)
+        records, _ = self.execute_counted_write(RelationshipQueries.purchase_games(), parameters)
+        return cart_statuses(records)
+
     def create_player_rates_game(self, player_id: str, game_id: str, rating: PlayerRatesGame) -> bool:
         """Create RATED relationship between player and game"""
-        parameters = {
-            "player_id": player_id,
-            "game_id": game_id,
-            "rating": rating.rating,
-            "review_date": rating.review_date.isoformat(),
-            "review_text": rating.review_text
-        }
+        parameters = rating_parameters(player_id, game_id, rating)
         return self.execute_write_query(RelationshipQueries.player_rates_game(), parameters)
 
     def create_friendship(self, player1_id: str, player2_id: str, friendship: PlayerFriendship) -> bool:
         """Create FRIENDS_WITH relationship between players"""
-        parameters = {
-            "player1_id": player1_id,
-            "player2_id": player2_id,
-            "since": friendship.since.isoformat()
-        }
-        return self.execute_write_query(RelationshipQueries.players_are_friends(), parameters)
+        parameters = friendship_parameters(player1_id, player2_id, friendship)
+        created = self.execute_write_query(RelationshipQueries.players_are_friends(), parameters)
+        self._invalidate_friend_suggestions(player1_id, player2_id)
+        return created
+
+    def get_friend_suggestions(self, player_id: str, limit: int = 10) -> List[Dict]:
+        """Friends of friends ranked by mutual friends, then shared owned games, cached per player"""
+        cache = self.friend_suggestions
+        found, suggestions = cache.lookup(player_id) if cache is not None else (False, None)
+        if not found:
+            parameters = {
+                "player_id": player_id,
+                "degree_cap": self.connection.config.friend_suggestion_degree_cap,
+                "candidate_limit": FRIEND_SUGGESTION_CANDIDATES,
+                "limit": MAX_FRIEND_SUGGESTIONS
+            }
+            result = self.execute_single_query(RelationshipQueries.get_friend_suggestions(), parameters)
+            suggestions = result['suggestions'] if result else []
+            # Like the entity caches, a unit of work reads the cache but never fills it
+            if cache is not None and self.transaction is None:
+                cache.store_suggestions(player_id, suggestions, result['friend_ids'] if result else [])
+        return [dict(suggestion) for suggestion in suggestions[:limit]]
+
+    def _invalidate_friend_suggestions(self, *player_ids: str, clear: bool = False) -> None:
+        """Drop suggestions a new friendship changes, again after the unit of work commits"""
+        cache = self.friend_suggestions
+        if cache is None:
+            return
+
+        def invalidate():
+            if clear:
+                cache.clear()
+            else:
+                cache.invalidate_friendship(*player_ids)
+
+        invalidate()
+        self._after_commit(invalidate)
 
     def create_developer_game_relationship(self, developer_name: str, game_id: str) -> bool:
         """Create DEVELOPED relationship between developer and game"""
@@ -47,4 +150,84 @@ class RelationshipRepository(BaseRepository):
             "developer_name": developer_name,
             "game_id": game_id
         }
-        return self.execute_write_query(RelationshipQueries.developer_develops_game(), parameters)
\ No newline at end of file
+        return self.execute_write_query(RelationshipQueries.developer_develops_game(), parameters)
+
+    def create_player_owns_game_bulk(self, ownerships: Iterable[Tuple[str, str, PlayerOwnsGame]],
+                                     batch_size: Optional[int] = None) -> BatchWriteReport:
+        """Create OWNS relationships from (player_id, game_id, ownership) tuples in UNWIND batches"""
+        rows = (ownership_parameters(player_id, game_id, ownership)
+                for player_id, game_id, ownership in ownerships)
+        return self.execute_batched_write(RelationshipQueries.player_owns_game_bulk(), rows, batch_size)
+
+    def create_player_rates_game_bulk(self, ratings: Iterable[Tuple[str, str, PlayerRatesGame]],
+                                      batch_size: Optional[int] = None) -> BatchWriteReport:
+        """Create RATED relationships from (player_id, game_id, rating) tuples in UNWIND batches"""
+        rows = (rating_parameters(player_id, game_id, rating)
+                for player_id, game_id, rating in ratings)
+        return self.execute_batched_write(RelationshipQueries.player_rates_game_bulk(), rows, batch_size)
+
+    def merge_player_owns_game_bulk(self, ownerships: Iterable[Tuple[str, str, PlayerOwnsGame]],
+                                    batch_size: Optional[int] = None) -> BatchWriteReport:
+        """create_player_owns_game_bulk() that skips pairs already connected; rewriting a batch is a no-op"""
+        rows = (ownership_parameters(player_id, game_id, ownership)
+                for player_id, game_id, ownership in ownerships)
+        return self.execute_batched_write(RelationshipQueries.merge_player_owns_game_bulk(), rows, batch_size)
+
+    def merge_player_rates_game_bulk(self, ratings: Iterable[Tuple[str, str, PlayerRatesGame]],
+                                     batch_size: Optional[int] = None) -> BatchWriteReport:
+        """create_player_rates_game_bulk() keeping one rating per player and game; rewriting a batch is a no-op"""
+        rows = (rating_parameters(player_id, game_id, rating)
+                for player_id, game_id, rating in ratings)
+        return self.execute_batched_write(RelationshipQueries.merge_player_rates_game_bulk(), rows, batch_size)
+
+    def create_player_owns_game_parallel(self, ownerships: Iterable[Tuple[str, str, PlayerOwnsGame]],
+                                         batch_size: Optional[int] = None,
+                                         workers: Optional[int] = None) -> ParallelWriteReport:
+        """create_player_owns_game_bulk() on a pool of sessions, partitioned by game"""
+        rows = (ownership_parameters(player_id, game_id, ownership)
+                for player_id, game_id, ownership in ownerships)
+        return self._write_parallel(RelationshipQueries.player_owns_game_bulk(), rows, batch_size, workers)
+
+    def create_player_rates_game_parallel(self, ratings: Iterable[Tuple[str, str, PlayerRatesGame]],
+                                          batch_size: Optional[int] = None,
+                                          workers: Optional[int] = None) -> ParallelWriteReport:
+        """create_player_rates_game_bulk() on a pool of sessions, partitioned by game"""
+        rows = (rating_parameters(player_id, game_id, rating)
+                for player_id, game_id, rating in ratings)
+        return self._write_parallel(RelationshipQueries.player_rates_game_bulk(), rows, batch_size, workers)
+
+    def _write_parallel(self, query: str, rows: Iterable[Dict], batch_size: Optional[int],
+                        workers: Optional[int]) -> ParallelWriteReport:
+        """Partition player-game rows by game across parallel writers.
+
+        Inside a unit of work there is a single transaction to write to, so the
+        rows go through execute_batched_write() instead.
+        """
+        if self.transaction is not None:
+            return ParallelWriteReport.from_batched(self.execute_batched_write(query, rows, batch_size))
+        writer = ParallelBatchWriter(self, workers)
+        return writer.write(query, rows, partition_key="game_id", order_key="player_id", batch_size=batch_size)
+
+    def create_friendships_bulk(self, friendships: Iterable[Tuple[str, str, PlayerFriendship]],
+                                batch_size: Optional[int] = None) -> BatchWriteReport:
+        """Create FRIENDS_WITH relationships from (player1_id, player2_id, friendship) tuples in UNWIND batches"""
+        rows = (friendship_parameters(player1_id, player2_id, friendship)
+                for player1_id, player2_id, friendship in friendships)
+        report = self.execute_batched_write(RelationshipQueries.players_are_friends_bulk(), rows, batch_size)
+        self._invalidate_friend_suggestions(clear=True)
+        return report
+
+    def merge_friendships_bulk(self, friendships: Iterable[Tuple[str, str, PlayerFriendship]],
+                               batch_size: Optional[int] = None) -> BatchWriteReport:
+        """create_friendships_bulk() that skips pairs already connected; rewriting a batch is a no-op"""
+        rows = (friendship_parameters(player1_id, player2_id, friendship)
+                for player1_id, player2_id, friendship in friendships)
+        report = self.execute_batched_write(RelationshipQueries.merge_players_are_friends_bulk(), rows, batch_size)
+        self._invalidate_friend_suggestions(clear=True)
+        return report
+
+    def create_developer_game_relationships_bulk(self, pairs: Iterable[Tuple[str, str]],
+                                                 batch_size: Optional[int] = None) -> BatchWriteReport:
+        """Create DEVELOPED relationships from (developer_name, game_id) pairs in UNWIND batches"""
+        rows = ({"developer_name": developer_name, "game_id": game_id} for developer_name, game_id in pairs)
+        return self.execute_batched_write(RelationshipQueries.developer_develops_game_bulk(), rows, batch_size)
@@ -0,0 +1,76 @@
+"""
+Typed row mappers: driver records to entities, tuples or dicts
+"""
+
+from dataclasses import fields
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Callable, Dict, List, Tuple, Type, Union
+from neo4j.time import Date, DateTime
+
+from models import Developer, Game, Player
+
+
+class RowFormat(Enum):
+    """Shape of the rows returned by the repositories"""
+    DICT = "dict"
+    TUPLE = "tuple"
+    ENTITY = "entity"
+
+
+def to_native(value: Any) -> Any:
+    """Convert a neo4j.time Date/DateTime to its datetime counterpart; other values pass through"""
+    if isinstance(value, (Date, DateTime)):
+        return value.to_native()
+    return value
+
+
+class RowMapper:
+    """Maps records with one column per field of an entity class.
+
+    Temporal fields (annotated date or datetime) are converted from the
+    driver's types once, while mapping. Tuples hold the values in field order
+    (see `fields`) and are the most compact shape; entities are slotted
+    dataclasses; dicts match what the repositories always returned.
+    """
+
+    def __init__(self, entity_class: Type):
+        self.entity_class = entity_class
+        entity_fields = fields(entity_class)
+        self.fields: Tuple[str, ...] = tuple(field.name for field in entity_fields)
+        self._temporal = tuple(
+            index for index, field in enumerate(entity_fields) if field.type in (date, datetime)
+        )
+
+    def values(self, record) -> List[Any]:
+        """Field values of a record (or dict) in field order, temporal values converted"""
+        values = [record[name] for name in self.fields]
+        for index in self._temporal:
+            values[index] = to_native(values[index])
+        return values
+
+    def to_tuple(self, record) -> Tuple:
+        """Map a record to a tuple in field order"""
+        return tuple(self.values(record))
+
+    def to_entity(self, record):
+        """Map a record to an entity instance"""
+        return self.entity_class(*self.values(record))
+
+    def to_dict(self, record) -> Dict[str, Any]:
+        """Map a record to a dict keyed by field name"""
+        return dict(zip(self.fields, self.values(record)))
+
+    def mapper(self, row_format: Union[RowFormat, str]) -> Callable[[Any], Any]:
+        """The mapping function for a row format ("dict", "tuple" or "entity")"""
+        row_format = RowFormat(row_format)
+        if row_format is RowFormat.TUPLE:
+            return self.to_tuple
+        if row_format is RowFormat.ENTITY:
+            return self.to_entity
+        return self.to_dict
+
+
+GAME_ROWS = RowMapper(Game)
+PLAYER_ROWS = RowMapper(Player)
+DEVELOPER_ROWS = RowMapper(Developer)
@@ -5,5 +5,22 @@ Services package
 from .game_service import GameService
 from .player_service import PlayerService
 from .analytics_service import AnalyticsService
+from .async_game_service import AsyncGameService
+from .async_player_service import AsyncPlayerService
+from .async_analytics_service import AsyncAnalyticsService
+from .insights import InsightAccumulator, InsightEngine
+from .snapshot_cache import SnapshotCache
+from .import_service import ImportReport, ImportService
+from .export_service import ExportService
+from .recommendation_service import RecommendationService
+from .graph_projection import GraphProjection
+from .similarity_index import GameSimilarityIndex
+from .leaderboard_service import LeaderboardService
 
-__all__ = ['GameService', 'PlayerService', 'AnalyticsService']
\ No newline at end of file
+__all__ = [
+    'GameService', 'PlayerService', 'AnalyticsService',
+    'AsyncGameService', 'AsyncPlayerService', 'AsyncAnalyticsService',
+    'InsightAccumulator', 'InsightEngine', 'SnapshotCache',
+    'ImportReport', 'ImportService', 'ExportService',
+    'RecommendationService', 'GraphProjection', 'GameSimilarityIndex', 'LeaderboardService'
+]
@@ -4,8 +4,13 @@ Analytics and insights service
 """
 
 from repositories import GameRepository, PlayerRepository, DeveloperRepository
+from services.insights import DEFAULT_INSIGHTS, InsightAccumulator, InsightEngine
+from services.snapshot_cache import snapshot_cache_for
+from services import columnar_analytics
+from utils.buckets import PLAYER_LEVEL_EDGES, PLAYER_LEVEL_LABELS, PRICE_RANGE_EDGES, PRICE_RANGE_LABELS
+from utils.statistics import DEFAULT_PERCENTILES, merge_percentiles
 from utils import setup_logger
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence, Type
 
 logger = setup_logger(__name__)
 
@@ -17,96 +22,121 @@ class AnalyticsService:
         self.game_repo = GameRepository(connection)
         self.player_repo = PlayerRepository(connection)
         self.developer_repo = DeveloperRepository(connection)
+        self.snapshots = snapshot_cache_for(connection)
+        self.insight_engine = InsightEngine(self.game_repo)
+        for insight in DEFAULT_INSIGHTS:
+            self.insight_engine.register(insight)
 
     def get_database_overview(self) -> Dict:
-        """Get comprehensive database overview"""
+        """Get comprehensive database overview from a snapshot refreshed after writes"""
         try:
-            overview = {
-                "games": {
-                    "total": self.game_repo.get_games_count(),
-                    "top_rated": self.game_repo.get_top_rated_games(3)
-                },
-                "players": {
-                    "total": self.player_repo.get_players_count(),
-                    "sample": self.player_repo.get_all_players()[:3]
-                },
-                "developers": {
-                    "total": self.developer_repo.get_developers_count(),
-                    "all": self.developer_repo.get_all_developers()
-                }
+            return self.snapshots.get('database_overview', self._build_database_overview)
+
+        except Exception as e:
+            logger.error(f"Error generating database overview: {e}")
+            return {}
+
+    def _build_database_overview(self) -> Dict:
+        """Query the database overview"""
+        overview = {
+            "games": {
+                "total": self.game_repo.get_games_count(),
+                "top_rated": self.game_repo.get_top_rated_games(3)
+            },
+            "players": {
+                "total": self.player_repo.get_players_count(),
+                "sample": self.player_repo.get_players_page(3).items
+            },
+            "developers": {
+                "total": self.developer_repo.get_developers_count(),
+                "all": self.developer_repo.get_all_developers()
             }
+        }
 
-            logger.info("Generated database overview")
-            return overview
+        logger.info("Generated database overview")
+        return overview
+
+    def get_game_metrics(self, price_edges: Sequence[float] = PRICE_RANGE_EDGES,
+                         rating_edges: Sequence[float] = (5, 6, 7, 8, 9),
+                         extra_percentiles: Optional[Sequence[float]] = None) -> Dict:
+        """Price/rating histograms, percentiles, correlation and rating by price range (requires NumPy)"""
+        try:
+            percentiles = tuple(merge_percentiles(DEFAULT_PERCENTILES, extra_percentiles))
+            key = ('game_metrics', tuple(price_edges), tuple(rating_edges), percentiles)
+            return self.snapshots.get(key, lambda: self._build_game_metrics(price_edges, rating_edges, percentiles))
 
         except Exception as e:
-            logger.error(f"Error generating database overview: {e}")
+            logger.error(f"Error generating game metrics: {e}")
             return {}
 
-    def get_insights(self) -> Dict:
-        """Generate business insights"""
+    def _build_game_metrics(self, price_edges: Sequence[float], rating_edges: Sequence[float],
+                            percentiles: Sequence[float]) -> Dict:
+        """Compute get_game_metrics() on columnar arrays"""
+        arrays = columnar_analytics.fetch_arrays(self.game_repo, "Game", ("price", "rating"))
+        price, rating = arrays["price"], arrays["rating"]
+        price_labels = PRICE_RANGE_LABELS if tuple(price_edges) == PRICE_RANGE_EDGES else None
+        metrics = {
+            "games": len(price),
+            "price_histogram": columnar_analytics.histogram(price, price_edges, price_labels),
+            "rating_histogram": columnar_analytics.histogram(rating, rating_edges),
+            "price_percentiles": columnar_analytics.percentiles_of(price, percentiles),
+            "rating_percentiles": columnar_analytics.percentiles_of(rating, percentiles),
+            "price_rating_correlation": columnar_analytics.correlation(price, rating),
+            "rating_by_price_range": columnar_analytics.group_by(rating, price_edges, price, price_labels)
+        }
+
+        logger.info("Generated columnar game metrics")
+        return metrics
+
+    def get_player_metrics(self, level_edges: Sequence[float] = PLAYER_LEVEL_EDGES,
+                           playtime_edges: Sequence[float] = (500, 1000, 2000, 5000),
+                           extra_percentiles: Optional[Sequence[float]] = None) -> Dict:
+        """Level/playtime histograms, percentiles, correlation and playtime by level band (requires NumPy)"""
         try:
-            insights = {
-                "most_common_price_range": self._analyze_price_distribution(),
-                "player_engagement": self._analyze_player_engagement(),
-                "game_quality": self._analyze_game_quality()
-            }
+            percentiles = tuple(merge_percentiles(DEFAULT_PERCENTILES, extra_percentiles))
+            key = ('player_metrics', tuple(level_edges), tuple(playtime_edges), percentiles)
+            return self.snapshots.get(key, lambda: self._build_player_metrics(level_edges, playtime_edges, percentiles))
+
+        except Exception as e:
+            logger.error(f"Error generating player metrics: {e}")
+            return {}
 
-            logger.info("Generated business insights")
-            return insights
+    def _build_player_metrics(self, level_edges: Sequence[float], playtime_edges: Sequence[float],
+                              percentiles: Sequence[float]) -> Dict:
+        """Compute get_player_metrics() on columnar arrays"""
+        arrays = columnar_analytics.fetch_arrays(self.player_repo, "Player", ("level", "total_playtime"))
+        level, playtime = arrays["level"], arrays["total_playtime"]
+        level_labels = PLAYER_LEVEL_LABELS if tuple(level_edges) == PLAYER_LEVEL_EDGES else None
+        metrics = {
+            "players": len(level),
+            "level_histogram": columnar_analytics.histogram(level, level_edges, level_labels),
+            "playtime_histogram": columnar_analytics.histogram(playtime, playtime_edges),
+            "level_percentiles": columnar_analytics.percentiles_of(level, percentiles),
+            "playtime_percentiles": columnar_analytics.percentiles_of(playtime, percentiles),
+            "level_playtime_correlation": columnar_analytics.correlation(level, playtime),
+            "playtime_by_level": columnar_analytics.group_by(playtime, level_edges, level, level_labels)
+        }
+
+        logger.info("Generated columnar player metrics")
+        return metrics
+
+    def register_insight(self, insight: Type[InsightAccumulator]) -> None:
+        """Add an insight to get_insights() without adding another scan of its label"""
+        self.insight_engine.register(insight)
+
+    def get_insights(self) -> Dict:
+        """Generate business insights in a single pass per label, served from a snapshot"""
+        try:
+            key = ('insights',) + tuple(insight.key for insight in self.insight_engine.insights)
+            return self.snapshots.get(key, self._build_insights)
 
         except Exception as e:
             logger.error(f"Error generating insights: {e}")
             return {}
 
-    def _analyze_price_distribution(self) -> str:
-        """Analyze game price distribution"""
-        games = self.game_repo.get_all_games()
-        if not games:
-            return "No data available"
-
-        price_ranges = {"Budget": 0, "Mid-range": 0, "Premium": 0, "AAA": 0}
-        for game in games:
-            price = game['price']
-            if price < 20:
-                price_ranges["Budget"] += 1
-            elif price < 40:
-                price_ranges["Mid-range"] += 1
-            elif price < 60:
-                price_ranges["Premium"] += 1
-            else:
-                price_ranges["AAA"] += 1
-
-        most_common = max(price_ranges, key=price_ranges.get)
-        return most_common
-
-    def _analyze_player_engagement(self) -> str:
-        """Analyze player engagement levels"""
-        players = self.player_repo.get_all_players()
-        if not players:
-            return "No data available"
-
-        total_playtime = sum(player['total_playtime'] for player in players)
-        avg_playtime = total_playtime / len(players)
-
-        if avg_playtime > 2000:
-            return "High engagement"
-        elif avg_playtime > 1000:
-            return "Medium engagement"
-        else:
-            return "Low engagement"
-
-    def _analyze_game_quality(self) -> str:
-        """Analyze overall game quality"""
-        games = self.game_repo.get_all_games()
-        if not games:
-            return "No data available"
-
-        avg_rating = sum(game['rating'] for game in games) / len(games)
-
-        if avg_rating >= 8.5:
-            return "Excellent quality games"
-        elif avg_rating >= 7.0:
-            return "Good quality games"
-        else:
-            return "Mixed quality games"
\ No newline at end of file
+    def _build_insights(self) -> Dict:
+        """Run the insight engine"""
+        insights = self.insight_engine.run()
+
+        logger.info("Generated business insights")
+        return insights
@@ -0,0 +1,76 @@
+"""
+Async analytics and insights service
+"""
+
+from repositories import AsyncGameRepository, AsyncPlayerRepository, AsyncDeveloperRepository
+from services.insights import DEFAULT_INSIGHTS, InsightAccumulator, InsightEngine
+from services.snapshot_cache import snapshot_cache_for
+from utils import setup_logger
+from typing import Dict, Type
+import asyncio
+
+logger = setup_logger(__name__)
+
+
+class AsyncAnalyticsService:
+    """Async counterpart of AnalyticsService with the same semantics"""
+
+    def __init__(self, connection):
+        self.game_repo = AsyncGameRepository(connection)
+        self.player_repo = AsyncPlayerRepository(connection)
+        self.developer_repo = AsyncDeveloperRepository(connection)
+        self.snapshots = snapshot_cache_for(connection)
+        self.insight_engine = InsightEngine(self.game_repo)
+        for insight in DEFAULT_INSIGHTS:
+            self.insight_engine.register(insight)
+
+    async def get_database_overview(self) -> Dict:
+        """Get comprehensive database overview from a snapshot refreshed after writes"""
+        try:
+            return await self.snapshots.get_async('database_overview', self._build_database_overview)
+
+        except Exception as e:
+            logger.error(f"Error generating database overview: {e}")
+            return {}
+
+    async def _build_database_overview(self) -> Dict:
+        """Query the database overview, running the independent queries concurrently"""
+        (games_total, top_rated, players_total, players_page,
+         developers_total, developers) = await asyncio.gather(
+            self.game_repo.get_games_count(),
+            self.game_repo.get_top_rated_games(3),
+            self.player_repo.get_players_count(),
+            self.player_repo.get_players_page(3),
+            self.developer_repo.get_developers_count(),
+            self.developer_repo.get_all_developers()
+        )
+
+        overview = {
+            "games": {"total": games_total, "top_rated": top_rated},
+            "players": {"total": players_total, "sample": players_page.items},
+            "developers": {"total": developers_total, "all": developers}
+        }
+
+        logger.info("Generated database overview")
+        return overview
+
+    def register_insight(self, insight: Type[InsightAccumulator]) -> None:
+        """Add an insight to get_insights() without adding another scan of its label"""
+        self.insight_engine.register(insight)
+
+    async def get_insights(self) -> Dict:
+        """Generate business insights in a single pass per label, served from a snapshot"""
+        try:
+            key = ('insights',) + tuple(insight.key for insight in self.insight_engine.insights)
+            return await self.snapshots.get_async(key, self._build_insights)
+
+        except Exception as e:
+            logger.error(f"Error generating insights: {e}")
+            return {}
+
+    async def _build_insights(self) -> Dict:
+        """Run the insight engine"""
+        insights = await self.insight_engine.run_async()
+
+        logger.info("Generated business insights")
+        return insights
@@ -0,0 +1,98 @@
+"""
+Async game business logic service
+"""
+
+from database import UnitOfWork
+from repositories import AsyncGameRepository, AsyncDeveloperRepository, AsyncRelationshipRepository
+from services.game_service import calculate_age, categorize_price, format_game_statistics
+from models import Game
+from utils import setup_logger
+from utils.statistics import DEFAULT_PERCENTILES, merge_percentiles
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+
+logger = setup_logger(__name__)
+
+
+class AsyncGameService:
+    """Async counterpart of GameService with the same semantics"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.game_repo = AsyncGameRepository(connection)
+        self.developer_repo = AsyncDeveloperRepository(connection)
+        self.relationship_repo = AsyncRelationshipRepository(connection)
+
+    async def create_game_with_developer(self, game_data: Dict, developer_name: str) -> bool:
+        """Create a game and associate it with a developer in a single transaction"""
+        try:
+            game = Game(
+                id=game_data['id'],
+                title=game_data['title'],
+                release_date=game_data['release_date'],
+                rating=game_data['rating'],
+                price=game_data['price'],
+                description=game_data['description']
+            )
+
+            created = await self.connection.run_unit_of_work(
+                lambda uow: self._create_game_with_developer(uow, game, developer_name)
+            )
+            if created:
+                logger.info(f"Game '{game.title}' created successfully with developer '{developer_name}'")
+            return created
+
+        except Exception as e:
+            logger.error(f"Error creating game: {e}")
+            return False
+
+    async def _create_game_with_developer(self, uow: UnitOfWork, game: Game, developer_name: str) -> bool:
+        """Validate and write the game and its DEVELOPED relationship inside one unit of work"""
+        if not await uow.repository(AsyncDeveloperRepository).developer_exists(developer_name):
+            logger.error(f"Developer '{developer_name}' does not exist")
+            return False
+
+        game_repo = uow.repository(AsyncGameRepository)
+        if await game_repo.game_exists(game.id):
+            logger.error(f"Game with ID '{game.id}' already exists")
+            return False
+
+        # Write errors raise and roll back the whole unit of work
+        await game_repo.create_game(game)
+        await uow.repository(AsyncRelationshipRepository).create_developer_game_relationship(
+            developer_name, game.id
+        )
+        return True
+
+    async def get_all_games_with_details(self) -> List[Dict]:
+        """Get all games with enhanced information"""
+        games = [game async for game in self.iter_all_games_with_details()]
+        logger.info(f"Retrieved {len(games)} games with details")
+        return games
+
+    async def iter_all_games_with_details(self) -> AsyncIterator[Dict]:
+        """Stream all games with enhanced information, one row at a time"""
+        async for game in self.game_repo.iter_all_games():
+            game['price_category'] = categorize_price(game['price'])
+            game['age_years'] = calculate_age(game['release_date'])
+            yield game
+
+    async def get_top_rated_games(self, limit: int = 10) -> List[Dict]:
+        """Get top rated games with validation"""
+        if limit <= 0:
+            limit = 10
+        elif limit > 50:
+            limit = 50
+            logger.warning("Limit capped at 50 games")
+
+        games = await self.game_repo.get_top_rated_games(limit)
+        logger.info(f"Retrieved top {len(games)} rated games")
+        return games
+
+    async def get_game_statistics(self, extra_percentiles: Optional[Sequence[float]] = None) -> Dict:
+        """Get comprehensive game statistics, aggregated by the database in one query"""
+        percentiles = merge_percentiles(DEFAULT_PERCENTILES, extra_percentiles)
+        aggregates = await self.game_repo.get_game_statistics(percentiles)
+        stats = format_game_statistics(aggregates)
+
+        logger.info("Generated game statistics")
+        return stats
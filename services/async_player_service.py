@@ -0,0 +1,164 @@
+"""
+Async player business logic service
+"""
+
+from database import UnitOfWork
+from repositories import AsyncPlayerRepository, AsyncGameRepository, AsyncRelationshipRepository
+from services.player_service import categorize_player_level, format_player_statistics, log_purchase
+from models import Player, PlayerOwnsGame, PlayerRatesGame, PurchaseStatus
+from utils import setup_logger
+from utils.statistics import DEFAULT_PERCENTILES, merge_percentiles
+from typing import Dict, List, Optional, Sequence
+from datetime import date
+
+logger = setup_logger(__name__)
+
+
+class AsyncPlayerService:
+    """Async counterpart of PlayerService with the same semantics"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.player_repo = AsyncPlayerRepository(connection)
+        self.game_repo = AsyncGameRepository(connection)
+        self.relationship_repo = AsyncRelationshipRepository(connection)
+
+    async def create_player(self, player_data: Dict) -> bool:
+        """Create a new player with validation"""
+        try:
+            if await self.player_repo.player_exists(player_data['id']):
+                logger.error(f"Player with ID '{player_data['id']}' already exists")
+                return False
+
+            if '@' not in player_data['email']:
+                logger.error("Invalid email format")
+                return False
+
+            player = Player(
+                id=player_data['id'],
+                username=player_data['username'],
+                email=player_data['email'],
+                join_date=player_data['join_date'],
+                level=player_data['level'],
+                total_playtime=player_data['total_playtime']
+            )
+
+            if await self.player_repo.create_player(player):
+                logger.info(f"Player '{player.username}' created successfully")
+                return True
+            else:
+                logger.error("Failed to create player")
+                return False
+
+        except Exception as e:
+            logger.error(f"Error creating player: {e}")
+            return False
+
+    async def purchase_game(self, player_id: str, game_id: str, purchase_date: date = None) -> bool:
+        """Handle game purchase logic; repeat purchases are idempotent"""
+        try:
+            ownership = PlayerOwnsGame(
+                purchase_date=purchase_date or date.today(),
+                playtime=0
+            )
+
+            status = await self.relationship_repo.purchase_game(player_id, game_id, ownership)
+            log_purchase(player_id, game_id, status)
+            return status.owned
+
+        except Exception as e:
+            logger.error(f"Error processing game purchase: {e}")
+            return False
+
+    async def checkout_cart(self, player_id: str, game_ids: List[str],
+                            purchase_date: date = None) -> Dict[str, PurchaseStatus]:
+        """Purchase every game of a storefront cart in one statement"""
+        try:
+            ownership = PlayerOwnsGame(
+                purchase_date=purchase_date or date.today(),
+                playtime=0
+            )
+
+            statuses = await self.relationship_repo.purchase_games(player_id, game_ids, ownership)
+            for game_id, status in statuses.items():
+                log_purchase(player_id, game_id, status)
+            return statuses
+
+        except Exception as e:
+            logger.error(f"Error processing checkout: {e}")
+            return {}
+
+    async def rate_game(self, player_id: str, game_id: str, rating: float, review_text: str = None) -> bool:
+        """Handle game rating logic in a single transaction"""
+        try:
+            if not (1 <= rating <= 10):
+                logger.error("Rating must be between 1 and 10")
+                return False
+
+            player_rating = PlayerRatesGame(
+                rating=rating,
+                review_date=date.today(),
+                review_text=review_text
+            )
+
+            rated = await self.connection.run_unit_of_work(
+                lambda uow: self._rate_game(uow, player_id, game_id, player_rating)
+            )
+            if rated:
+                logger.info(f"Player '{player_id}' rated game '{game_id}' with {rating}/10")
+            return rated
+
+        except Exception as e:
+            logger.error(f"Error processing game rating: {e}")
+            return False
+
+    async def _rate_game(self, uow: UnitOfWork, player_id: str, game_id: str, rating: PlayerRatesGame) -> bool:
+        """Validate both endpoints and write the RATED relationship inside one unit of work"""
+        if not await uow.repository(AsyncPlayerRepository).player_exists(player_id):
+            logger.error(f"Player '{player_id}' does not exist")
+            return False
+
+        if not await uow.repository(AsyncGameRepository).game_exists(game_id):
+            logger.error(f"Game '{game_id}' does not exist")
+            return False
+
+        await uow.repository(AsyncRelationshipRepository).create_player_rates_game(player_id, game_id, rating)
+        return True
+
+    async def get_player_profile(self, player_id: str) -> Optional[Dict]:
+        """Get comprehensive player profile"""
+        try:
+            player = await self.player_repo.get_player_by_id(player_id)
+            if not player:
+                logger.warning(f"Player '{player_id}' not found")
+                return None
+
+            player_games = await self.player_repo.get_player_games(player_id)
+
+            total_games = len(player_games)
+            total_playtime = sum(game.get('playtime', 0) for game in player_games)
+
+            profile = dict(player)
+            profile.update({
+                'games_owned': total_games,
+                'total_playtime_hours': total_playtime,
+                'average_playtime_per_game': round(total_playtime / total_games, 1) if total_games > 0 else 0,
+                'player_level_category': categorize_player_level(player['level']),
+                'games': player_games
+            })
+
+            logger.info(f"Generated profile for player '{player['username']}'")
+            return profile
+
+        except Exception as e:
+            logger.error(f"Error getting player profile: {e}")
+            return None
+
+    async def get_player_statistics(self, extra_percentiles: Optional[Sequence[float]] = None) -> Dict:
+        """Get overall player statistics, aggregated by the database in one query"""
+        percentiles = merge_percentiles(DEFAULT_PERCENTILES, extra_percentiles)
+        aggregates = await self.player_repo.get_player_statistics(percentiles)
+        stats = format_player_statistics(aggregates)
+
+        logger.info("Generated player statistics")
+        return stats
@@ -0,0 +1,138 @@
+"""
+Columnar analytics on NumPy arrays
+
+Numeric properties are streamed from the database in columnar batches and
+concatenated into one float64 array per property (missing values become
+NaN), so the statistics below run vectorized instead of folding Python
+lists row by row. NumPy is an optional dependency (see requirements.txt);
+without it every function here raises ImportError.
+"""
+
+from typing import Any, Dict, Optional, Sequence
+from utils.statistics import percentile_key
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+
+def numpy_available() -> bool:
+    """True when NumPy is installed"""
+    return np is not None
+
+
+def _require_numpy() -> None:
+    """Fail with an actionable message when NumPy is missing"""
+    if np is None:
+        raise ImportError("Columnar analytics requires NumPy: pip install numpy")
+
+
+def fetch_arrays(repository, label: str, properties: Sequence[str],
+                 batch_size: Optional[int] = None) -> Dict[str, Any]:
+    """Stream numeric properties of a label into one float64 array per property"""
+    _require_numpy()
+    chunks = {name: [] for name in properties}
+    for batch in repository.stream_columns(label, properties, batch_size):
+        for name in properties:
+            chunks[name].append(np.array(batch[name], dtype=np.float64))
+    return {name: np.concatenate(parts) if parts else np.empty(0) for name, parts in chunks.items()}
+
+
+async def fetch_arrays_async(repository, label: str, properties: Sequence[str],
+                             batch_size: Optional[int] = None) -> Dict[str, Any]:
+    """fetch_arrays() for the async repositories"""
+    _require_numpy()
+    chunks = {name: [] for name in properties}
+    async for batch in repository.stream_columns(label, properties, batch_size):
+        for name in properties:
+            chunks[name].append(np.array(batch[name], dtype=np.float64))
+    return {name: np.concatenate(parts) if parts else np.empty(0) for name, parts in chunks.items()}
+
+
+def _present(values):
+    """The non-NaN values of an array"""
+    return values[~np.isnan(values)]
+
+
+def describe(values, percentiles: Sequence[float]) -> Dict[str, Any]:
+    """Vectorized utils.statistics.describe(): same shape and semantics as the Cypher aggregates"""
+    _require_numpy()
+    present = _present(values)
+    if not present.size:
+        return {"sum": 0, "avg": None, "min": None, "max": None, "stdev": None, "percentiles": {}}
+
+    return {
+        "sum": float(present.sum()),
+        "avg": float(present.mean()),
+        "min": float(present.min()),
+        "max": float(present.max()),
+        "stdev": float(present.std(ddof=1)) if present.size > 1 else 0.0,
+        "percentiles": percentiles_of(present, percentiles)
+    }
+
+
+def percentiles_of(values, percentiles: Sequence[float]) -> Dict[str, Optional[float]]:
+    """Linear-interpolated percentiles (as percentileCont), keyed 'p50' etc."""
+    _require_numpy()
+    present = _present(values)
+    if not present.size or not percentiles:
+        return {percentile_key(percentile): None for percentile in percentiles}
+    results = np.percentile(present, [percentile * 100 for percentile in percentiles])
+    return {percentile_key(percentile): float(result) for percentile, result in zip(percentiles, results)}
+
+
+def bucketize(values, edges: Sequence[float]):
+    """Bucket index of each value: 0 below edges[0], i for edges[i-1] <= value < edges[i], len(edges) above"""
+    _require_numpy()
+    return np.searchsorted(np.asarray(edges, dtype=np.float64), values, side='right')
+
+
+def histogram(values, edges: Sequence[float], labels: Optional[Sequence[str]] = None) -> Dict[str, int]:
+    """Count values per bucket (see bucketize); buckets are open-ended below and above the edges"""
+    _require_numpy()
+    if list(edges) != sorted(edges):
+        raise ValueError("Histogram edges must be sorted")
+    labels = labels or _bucket_labels(edges)
+    if len(labels) != len(edges) + 1:
+        raise ValueError("A histogram needs one label more than it has edges")
+
+    counts = np.bincount(bucketize(_present(values), edges), minlength=len(edges) + 1)
+    return {label: int(count) for label, count in zip(labels, counts)}
+
+
+def _bucket_labels(edges: Sequence[float]):
+    """Default bucket labels: '<20', '20-40', ..., '>=60'"""
+    labels = [f"<{edges[0]:g}"] if edges else ["all"]
+    labels += [f"{low:g}-{high:g}" for low, high in zip(edges, edges[1:])]
+    if edges:
+        labels.append(f">={edges[-1]:g}")
+    return labels
+
+
+def correlation(x, y) -> Optional[float]:
+    """Pearson correlation over the rows where both values are present (None if undefined)"""
+    _require_numpy()
+    mask = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[mask], y[mask]
+    if x.size < 2 or x.std() == 0 or y.std() == 0:
+        return None
+    return float(np.corrcoef(x, y)[0, 1])
+
+
+def group_by(values, edges: Sequence[float], keys, labels: Optional[Sequence[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """Count, sum and mean of `values` grouped by the bucket of `keys` (rows missing either are skipped)"""
+    _require_numpy()
+    labels = labels or _bucket_labels(edges)
+    mask = ~(np.isnan(values) | np.isnan(keys))
+    groups = bucketize(keys[mask], edges)
+    counts = np.bincount(groups, minlength=len(edges) + 1)
+    sums = np.bincount(groups, weights=values[mask], minlength=len(edges) + 1)
+    return {
+        label: {
+            "count": int(count),
+            "sum": float(total),
+            "mean": float(total / count) if count else None
+        }
+        for label, count, total in zip(labels, counts, sums)
+    }
@@ -0,0 +1,271 @@
+"""
+Streaming export of the graph to chunked JSONL or Parquet files
+
+Every node label and relationship type reported by the database summary is
+streamed into its own directory of part files (nodes/<Label>/part-00000.jsonl,
+relationships/<TYPE>/part-00000.parquet, ...). A manifest.json next to them
+records the row count, size and SHA-256 of every file, so offline analytics
+and backfills can verify and read the export (see verify_export and
+read_export) instead of querying the production database. Parquet output
+requires pyarrow, an optional dependency (see requirements.txt).
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+import hashlib
+import json
+import os
+import time
+
+from queries import AnalyticsQueries
+from repositories import BaseRepository, DeveloperRepository, GameRepository, PlayerRepository
+from repositories.row_mappers import to_native
+from utils import setup_logger, chunked
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency
+    pa = pq = None
+
+logger = setup_logger(__name__)
+
+EXPORT_FORMATS = ("jsonl", "parquet")
+MANIFEST_NAME = "manifest.json"
+# Rows per part file; also the most rows held in memory per exported set
+DEFAULT_ROWS_PER_FILE = 100000
+# Key property of each label, used to identify relationship endpoints (others use id)
+KEY_PROPERTIES = {
+    repository.cache_name: repository.key_property
+    for repository in (GameRepository, PlayerRepository, DeveloperRepository)
+}
+
+
+@dataclass
+class ExportedFile:
+    """One part file of an exported set"""
+    path: str
+    rows: int
+    bytes: int
+    sha256: str
+
+
+@dataclass
+class ExportedSet:
+    """All part files of one label or relationship type"""
+    name: str
+    expected_rows: int
+    rows: int = 0
+    elapsed_seconds: float = 0.0
+    files: List[ExportedFile] = field(default_factory=list)
+
+
+def pyarrow_available() -> bool:
+    """True when pyarrow is installed"""
+    return pa is not None
+
+
+def _require_format(file_format: str) -> None:
+    """Reject unknown formats, and Parquet without pyarrow"""
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {file_format!r}; expected one of {EXPORT_FORMATS}")
+    if file_format == "parquet" and pa is None:
+        raise ImportError("Parquet export requires pyarrow: pip install pyarrow")
+
+
+def _file_digest(path: str) -> str:
+    """SHA-256 of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_jsonl(path: str, rows: List[Dict[str, Any]]) -> str:
+    """Write rows as JSON lines (dates as ISO strings) and return the SHA-256 of what was written"""
+    digest = hashlib.sha256()
+    with open(path, "wb") as handle:
+        for row in rows:
+            line = (json.dumps(row, default=str, ensure_ascii=False) + "\n").encode("utf-8")
+            digest.update(line)
+            handle.write(line)
+    return digest.hexdigest()
+
+
+def _write_parquet(path: str, rows: List[Dict[str, Any]]) -> str:
+    """Write rows as one Parquet file and return its SHA-256"""
+    # Properties vary between nodes: take the union of the columns, missing values become null
+    columns = list(dict.fromkeys(name for row in rows for name in row))
+    pq.write_table(pa.Table.from_pydict({name: [row.get(name) for row in rows] for name in columns}), path)
+    return _file_digest(path)
+
+
+def _node_row(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten an exported node: _element_id, _labels and its properties"""
+    row = {"_element_id": record["element_id"], "_labels": record["labels"]}
+    row.update((name, to_native(value)) for name, value in record["properties"].items())
+    return row
+
+
+def _relationship_row(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten an exported relationship: its endpoints' labels and keys, then its properties"""
+    row = {
+        "_element_id": record["element_id"],
+        "_start_label": record["start_label"],
+        "_start_key": record["start_key"],
+        "_end_label": record["end_label"],
+        "_end_key": record["end_key"]
+    }
+    row.update((name, to_native(value)) for name, value in record["properties"].items())
+    return row
+
+
+class ExportService:
+    """Exports every label and relationship type to chunked files with a manifest.
+
+    Each set is streamed from its own read session, so memory is bounded by
+    rows_per_file per set being exported, and up to `workers` sets are
+    exported at once. Sets are read one query each, not in one transaction:
+    writes running during an export may show up in some sets and not others.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.repository = BaseRepository(connection)
+
+    def export(self, directory: str, file_format: str = "jsonl", rows_per_file: int = DEFAULT_ROWS_PER_FILE,
+               workers: int = 1, labels: Optional[Sequence[str]] = None,
+               relationship_types: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Export the selected labels and types (default: all) and return the manifest written"""
+        _require_format(file_format)
+        if rows_per_file <= 0:
+            raise ValueError("rows_per_file must be positive")
+
+        node_counts = {
+            row['label']: row['total_count']
+            for row in self.repository.execute_query(AnalyticsQueries.get_database_summary())
+            if labels is None or row['label'] in labels
+        }
+        relationship_counts = {
+            row['type']: row['total_count']
+            for row in self.repository.execute_query(AnalyticsQueries.get_relationship_summary())
+            if relationship_types is None or row['type'] in relationship_types
+        }
+        tasks = [("nodes", label, count) for label, count in node_counts.items()]
+        tasks += [("relationships", rel_type, count) for rel_type, count in relationship_counts.items()]
+
+        started = time.perf_counter()
+        os.makedirs(directory, exist_ok=True)
+
+        def run(task):
+            kind, name, count = task
+            return kind, self._export_set(directory, kind, name, count, file_format, rows_per_file)
+
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="export") as executor:
+                results = list(executor.map(run, tasks))
+        else:
+            results = [run(task) for task in tasks]
+
+        manifest = {
+            "format": file_format,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "elapsed_seconds": round(time.perf_counter() - started, 3),
+            "key_properties": KEY_PROPERTIES,
+            "nodes": {},
+            "relationships": {}
+        }
+        for kind, exported in results:
+            manifest[kind][exported.name] = asdict(exported)
+
+        temporary = os.path.join(directory, MANIFEST_NAME + ".tmp")
+        with open(temporary, "w", encoding="utf-8") as handle:
+            json.dump(manifest, handle, indent=2)
+        os.replace(temporary, os.path.join(directory, MANIFEST_NAME))
+
+        total = sum(exported.rows for _, exported in results)
+        logger.info(f"Exported {total} rows in {len(results)} sets to {directory} ({manifest['elapsed_seconds']}s)")
+        return manifest
+
+    def _export_set(self, directory: str, kind: str, name: str, expected_rows: int,
+                    file_format: str, rows_per_file: int) -> ExportedSet:
+        """Stream one label or relationship type into part files"""
+        started = time.perf_counter()
+        relative_directory = os.path.join(kind, name)
+        set_directory = os.path.join(directory, relative_directory)
+        os.makedirs(set_directory, exist_ok=True)
+        for stale in os.listdir(set_directory):
+            if stale.startswith("part-"):
+                os.remove(os.path.join(set_directory, stale))
+
+        if kind == "nodes":
+            records = self.repository.stream_query(AnalyticsQueries.export_nodes(name))
+            to_row = _node_row
+        else:
+            records = self.repository.stream_query(AnalyticsQueries.export_relationships(name),
+                                                   {"key_properties": KEY_PROPERTIES})
+            to_row = _relationship_row
+        write = _write_parquet if file_format == "parquet" else _write_jsonl
+
+        exported = ExportedSet(name, expected_rows)
+        for part, chunk in enumerate(chunked((to_row(record) for record in records), rows_per_file)):
+            relative_path = os.path.join(relative_directory, f"part-{part:05d}.{file_format}")
+            path = os.path.join(directory, relative_path)
+            checksum = write(path, chunk)
+            exported.files.append(ExportedFile(relative_path, len(chunk), os.path.getsize(path), checksum))
+            exported.rows += len(chunk)
+
+        exported.elapsed_seconds = round(time.perf_counter() - started, 3)
+        if exported.rows != expected_rows:
+            logger.warning(f"{kind}/{name}: exported {exported.rows} rows, summary counted {expected_rows}")
+        logger.info(f"   {kind}/{name}: {exported.rows} rows in {len(exported.files)} files")
+        return exported
+
+
+def load_manifest(directory: str) -> Dict[str, Any]:
+    """Read the manifest of an export directory"""
+    with open(os.path.join(directory, MANIFEST_NAME), encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def verify_export(directory: str) -> List[str]:
+    """Check every file listed in the manifest exists with its recorded size and checksum; returns the problems"""
+    problems = []
+    manifest = load_manifest(directory)
+    for kind in ("nodes", "relationships"):
+        for name, exported in manifest[kind].items():
+            for exported_file in exported["files"]:
+                path = os.path.join(directory, exported_file["path"])
+                if not os.path.exists(path):
+                    problems.append(f"{kind}/{name}: missing {exported_file['path']}")
+                elif os.path.getsize(path) != exported_file["bytes"] or _file_digest(path) != exported_file["sha256"]:
+                    problems.append(f"{kind}/{name}: checksum mismatch for {exported_file['path']}")
+    return problems
+
+
+def read_export(directory: str, name: str, kind: str = "nodes") -> Iterator[Dict[str, Any]]:
+    """Yield the rows of an exported label or relationship type, one part file at a time"""
+    manifest = load_manifest(directory)
+    if name not in manifest[kind]:
+        raise KeyError(f"{kind}/{name} is not in the export at {directory}")
+    if manifest["format"] == "parquet":
+        _require_format("parquet")
+
+    for exported_file in manifest[kind][name]["files"]:
+        path = os.path.join(directory, exported_file["path"])
+        if manifest["format"] == "parquet":
+            for batch in pq.ParquetFile(path).iter_batches():
+                yield from batch.to_pylist()
+        else:
+            with open(path, encoding="utf-8") as handle:
+                yield from _json_lines(handle)
+
+
+def _json_lines(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Parse non-empty JSON lines"""
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
@@ -2,37 +2,72 @@
 Game business logic service
 """
 
+from database import UnitOfWork
 from repositories import GameRepository, DeveloperRepository, RelationshipRepository
 from models import Game
 from utils import setup_logger
-from typing import Dict, List, Optional
+from utils.buckets import PRICE_RANGE_EDGES, PRICE_RANGE_LABELS, bucket_label
+from utils.statistics import DEFAULT_PERCENTILES, describe, merge_percentiles
+from services import columnar_analytics
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
 from datetime import date
 
 logger = setup_logger(__name__)
 
 
+def format_game_statistics(aggregates: Dict) -> Dict:
+    """Shape rating and price summaries into the game statistics report"""
+    if not aggregates['count']:
+        return {"total_games": 0}
+
+    rating, price = aggregates['rating'], aggregates['price']
+    return {
+        "total_games": aggregates['count'],
+        "average_rating": round(rating['avg'], 2),
+        "highest_rating": rating['max'],
+        "lowest_rating": rating['min'],
+        "rating_stdev": round(rating['stdev'], 2),
+        "rating_percentiles": rating['percentiles'],
+        "average_price": round(price['avg'], 2),
+        "most_expensive": price['max'],
+        "cheapest": price['min'],
+        "price_stdev": round(price['stdev'], 2),
+        "price_percentiles": price['percentiles']
+    }
+
+
+def categorize_price(price: float) -> str:
+    """Categorize game price"""
+    return bucket_label(price, PRICE_RANGE_EDGES, PRICE_RANGE_LABELS)
+
+
+def calculate_age(release_date) -> int:
+    """Calculate game age in years"""
+    if isinstance(release_date, date):
+        pass  # Rows from the repositories carry native dates
+    elif isinstance(release_date, str):
+        release_date = date.fromisoformat(release_date)
+    elif hasattr(release_date, 'year'):
+        pass  # A neo4j Date from a raw query
+    else:
+        return 0
+
+    today = date.today()
+    return today.year - release_date.year
+
+
 class GameService:
     """Service for game-related business logic"""
 
     def __init__(self, connection):
+        self.connection = connection
         self.game_repo = GameRepository(connection)
         self.developer_repo = DeveloperRepository(connection)
         self.relationship_repo = RelationshipRepository(connection)
 
     def create_game_with_developer(self, game_data: Dict, developer_name: str) -> bool:
-        """Create a game and associate it with a developer"""
+        """Create a game and associate it with a developer in a single transaction"""
         try:
-            # Validate developer exists
-            if not self.developer_repo.developer_exists(developer_name):
-                logger.error(f"Developer '{developer_name}' does not exist")
-                return False
-
-            # Validate game doesn't already exist
-            if self.game_repo.game_exists(game_data['id']):
-                logger.error(f"Game with ID '{game_data['id']}' already exists")
-                return False
-
-            # Create game
             game = Game(
                 id=game_data['id'],
                 title=game_data['title'],
@@ -42,34 +77,52 @@ class GameService:
                 description=game_data['description']
             )
 
-            if not self.game_repo.create_game(game):
-                logger.error("Failed to create game")
-                return False
-
-            # Create developer-game relationship
-            if not self.relationship_repo.create_developer_game_relationship(developer_name, game_data['id']):
-                logger.error("Failed to create developer-game relationship")
-                return False
-
-            logger.info(f"Game '{game.title}' created successfully with developer '{developer_name}'")
-            return True
+            created = self.connection.run_unit_of_work(
+                lambda uow: self._create_game_with_developer(uow, game, developer_name)
+            )
+            if created:
+                logger.info(f"Game '{game.title}' created successfully with developer '{developer_name}'")
+            return created
 
         except Exception as e:
             logger.error(f"Error creating game: {e}")
             return False
 
-    def get_all_games_with_details(self) -> List[Dict]:
-        """Get all games with enhanced information"""
-        games = self.game_repo.get_all_games()
+    def _create_game_with_developer(self, uow: UnitOfWork, game: Game, developer_name: str) -> bool:
+        """Validate and write the game and its DEVELOPED relationship inside one unit of work"""
+        developer_repo = uow.repository(DeveloperRepository)
+        game_repo = uow.repository(GameRepository)
+        relationship_repo = uow.repository(RelationshipRepository)
 
-        # Add computed fields
-        for game in games:
-            game['price_category'] = self._categorize_price(game['price'])
-            game['age_years'] = self._calculate_age(game['release_date'])
+        # Validate developer exists
+        if not developer_repo.developer_exists(developer_name):
+            logger.error(f"Developer '{developer_name}' does not exist")
+            return False
+
+        # Validate game doesn't already exist
+        if game_repo.game_exists(game.id):
+            logger.error(f"Game with ID '{game.id}' already exists")
+            return False
+
+        # Write errors raise and roll back the whole unit of work
+        game_repo.create_game(game)
+        relationship_repo.create_developer_game_relationship(developer_name, game.id)
+        return True
 
+    def get_all_games_with_details(self) -> List[Dict]:
+        """Get all games with enhanced information"""
+        games = list(self.iter_all_games_with_details())
         logger.info(f"Retrieved {len(games)} games with details")
         return games
 
+    def iter_all_games_with_details(self) -> Iterator[Dict]:
+        """Stream all games with enhanced information, one row at a time"""
+        for game in self.game_repo.iter_all_games():
+            # Add computed fields
+            game['price_category'] = categorize_price(game['price'])
+            game['age_years'] = calculate_age(game['release_date'])
+            yield game
+
     def get_top_rated_games(self, limit: int = 10) -> List[Dict]:
         """Get top rated games with validation"""
         if limit <= 0:
@@ -82,49 +135,39 @@ class GameService:
         logger.info(f"Retrieved top {len(games)} rated games")
         return games
 
-    def get_game_statistics(self) -> Dict:
-        """Get comprehensive game statistics"""
-        total_games = self.game_repo.get_games_count()
-        all_games = self.game_repo.get_all_games()
-
-        if not all_games:
-            return {"total_games": 0}
-
-        ratings = [game['rating'] for game in all_games]
-        prices = [game['price'] for game in all_games]
-
-        stats = {
-            "total_games": total_games,
-            "average_rating": round(sum(ratings) / len(ratings), 2),
-            "highest_rating": max(ratings),
-            "lowest_rating": min(ratings),
-            "average_price": round(sum(prices) / len(prices), 2),
-            "most_expensive": max(prices),
-            "cheapest": min(prices)
-        }
+    def get_game_statistics(self, extra_percentiles: Optional[Sequence[float]] = None,
+                            columnar: bool = False) -> Dict:
+        """Get comprehensive game statistics, aggregated by the database in one query.
+
+        With columnar=True the ratings and prices are streamed into NumPy
+        arrays and summarized in-process instead (requires NumPy).
+        """
+        percentiles = merge_percentiles(DEFAULT_PERCENTILES, extra_percentiles)
+        if columnar:
+            arrays = columnar_analytics.fetch_arrays(self.game_repo, "Game", ("rating", "price"))
+            aggregates = {
+                "count": len(arrays["rating"]),
+                "rating": columnar_analytics.describe(arrays["rating"], percentiles),
+                "price": columnar_analytics.describe(arrays["price"], percentiles)
+            }
+        else:
+            aggregates = self.game_repo.get_game_statistics(percentiles)
+        stats = format_game_statistics(aggregates)
 
         logger.info("Generated game statistics")
         return stats
 
-    def _categorize_price(self, price: float) -> str:
-        """Categorize game price"""
-        if price < 20:
-            return "Budget"
-        elif price < 40:
-            return "Mid-range"
-        elif price < 60:
-            return "Premium"
-        else:
-            return "AAA"
-
-    def _calculate_age(self, release_date) -> int:
-        """Calculate game age in years"""
-        if isinstance(release_date, str):
-            release_date = date.fromisoformat(release_date)
-        elif hasattr(release_date, 'year'):
-            pass  # Already a date object
-        else:
-            return 0
-
-        today = date.today()
-        return today.year - release_date.year
\ No newline at end of file
+    @staticmethod
+    def summarize_games(games: Iterable[Dict], extra_percentiles: Optional[Sequence[float]] = None) -> Dict:
+        """Offline fallback: compute get_game_statistics() from game rows already at hand"""
+        percentiles = merge_percentiles(DEFAULT_PERCENTILES, extra_percentiles)
+        ratings, prices = [], []
+        for game in games:
+            ratings.append(game['rating'])
+            prices.append(game['price'])
+
+        return format_game_statistics({
+            "count": len(ratings),
+            "rating": describe(ratings, percentiles),
+            "price": describe(prices, percentiles)
+        })
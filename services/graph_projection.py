@@ -0,0 +1,446 @@
+"""
+In-process CSR projection of the player/game graph
+
+Players and games are mapped to dense integer indices and OWNS (weighted by
+playtime), RATED (weighted by rating) and FRIENDS_WITH (symmetric, weight 1)
+are held as NumPy CSR arrays: the neighbours of row i are
+indices[indptr[i]:indptr[i + 1]]. Traversals and graph algorithms then run
+over contiguous arrays in-process instead of Cypher round trips.
+
+A projection refreshes incrementally from the players' library and friends
+versions (bumped by every OWNS/RATED and FRIENDS_WITH write), and saves to a
+directory of .npy files that load memory-mapped, so worker processes on one
+host share a single copy through the page cache. NumPy is an optional
+dependency (see requirements.txt).
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import json
+import os
+import shutil
+import time
+
+from queries import ProjectionQueries
+from repositories import BaseRepository
+from utils import setup_logger, chunked
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+logger = setup_logger(__name__)
+
+# File naming the saved version a projection directory currently points to
+CURRENT_NAME = "CURRENT"
+# Version recorded for a player whose edges could not all be resolved: refreshed again next time
+STALE_VERSION = -1
+
+
+def require_numpy() -> None:
+    """Fail with an actionable message when NumPy is missing"""
+    if np is None:
+        raise ImportError("Graph projections require NumPy: pip install numpy")
+
+
+class IdMap:
+    """Dense integer indices for string ids.
+
+    Indices follow insertion order and never change; new ids are appended.
+    Lookups binary-search a sorted copy of the ids, so a memory-mapped map
+    needs no per-process dict.
+    """
+
+    def __init__(self, ids, sorted_ids, order):
+        self.ids = ids
+        self.sorted_ids = sorted_ids
+        self.order = order
+
+    @classmethod
+    def build(cls, ids: Iterable[str]) -> "IdMap":
+        """Map ids to 0..n-1 in the order given"""
+        require_numpy()
+        ids = np.asarray(list(ids), dtype=str)
+        if not ids.size:
+            ids = np.empty(0, dtype="U1")
+        order = np.argsort(ids, kind="stable")
+        return cls(ids, ids[order], order)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def indices_of(self, keys: Sequence[str]):
+        """Index of each key, -1 where the key is unknown"""
+        keys = np.asarray(keys, dtype=str)
+        if not len(self.ids) or not keys.size:
+            return np.full(keys.shape, -1, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self.sorted_ids, keys), len(self.ids) - 1)
+        return np.where(self.sorted_ids[positions] == keys, self.order[positions], -1).astype(np.int64)
+
+    def index_of(self, key: str) -> int:
+        """Index of one key, -1 when unknown"""
+        return int(self.indices_of([key])[0])
+
+    def id_of(self, index: int) -> str:
+        """The id at an index"""
+        return str(self.ids[index])
+
+    def extended(self, ids: Iterable[str]) -> "IdMap":
+        """A map with the unknown ids appended (existing indices unchanged)"""
+        ids = np.asarray(list(ids), dtype=str)
+        new_ids = ids[self.indices_of(ids) < 0] if ids.size else ids
+        if not new_ids.size:
+            return self
+        # Keep the first occurrence of each new id, in the order given
+        _, first = np.unique(new_ids, return_index=True)
+        return IdMap.build(np.concatenate([self.ids, new_ids[np.sort(first)]]))
+
+
+@dataclass
+class CsrAdjacency:
+    """Compressed sparse rows: row i's columns are indices[indptr[i]:indptr[i + 1]], sorted"""
+    indptr: Any
+    indices: Any
+    weights: Any
+
+    @classmethod
+    def from_edges(cls, rows, columns, weights, n_rows: int) -> "CsrAdjacency":
+        """Build from parallel edge arrays (any order)"""
+        order = np.lexsort((columns, rows))
+        indptr = np.zeros(n_rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+        return cls(indptr, columns[order].astype(np.int32), weights[order].astype(np.float32))
+
+    @classmethod
+    def empty(cls, n_rows: int) -> "CsrAdjacency":
+        """No edges"""
+        return cls(np.zeros(n_rows + 1, dtype=np.int64), np.empty(0, dtype=np.int32),
+                   np.empty(0, dtype=np.float32))
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.indices)
+
+    def neighbors(self, row: int):
+        """Column indices of a row"""
+        return self.indices[self.indptr[row]:self.indptr[row + 1]]
+
+    def edge_weights(self, row: int):
+        """Weights of a row's edges, aligned with neighbors(row)"""
+        return self.weights[self.indptr[row]:self.indptr[row + 1]]
+
+    def degrees(self):
+        """Edge count of every row"""
+        return np.diff(self.indptr)
+
+    def edge_rows(self):
+        """Row index of every edge"""
+        return np.repeat(np.arange(self.n_rows, dtype=np.int64), self.degrees())
+
+    def transpose(self, n_columns: int) -> "CsrAdjacency":
+        """Columns as rows, e.g. game -> owning players from player -> owned games"""
+        return CsrAdjacency.from_edges(self.indices.astype(np.int64), self.edge_rows(), self.weights, n_columns)
+
+    def with_rows_replaced(self, rows, new_rows, new_columns, new_weights, n_rows: int) -> "CsrAdjacency":
+        """A copy where `rows` hold exactly the new edges, grown to n_rows"""
+        edge_rows = self.edge_rows()
+        keep = ~np.isin(edge_rows, rows)
+        return CsrAdjacency.from_edges(
+            np.concatenate([edge_rows[keep], new_rows]),
+            np.concatenate([self.indices[keep].astype(np.int64), new_columns]),
+            np.concatenate([self.weights[keep], new_weights]),
+            n_rows
+        )
+
+
+@dataclass
+class _Edges:
+    """Edges streamed from the database, resolved to indices"""
+    rows: Any
+    columns: Any
+    weights: Any
+    # Rows with an edge to a node the id maps do not know yet
+    dangling: Set[int]
+
+
+class GraphProjection:
+    """Players, games and their OWNS, RATED and FRIENDS_WITH adjacency as NumPy arrays.
+
+    Build one with from_database() or load() a saved one. refresh() is
+    meant for a single owner; readers in other threads may see a mix of old
+    and new adjacencies while it runs. Arrays are never modified in place,
+    so memory-mapped (read-only) projections refresh too.
+    """
+
+    def __init__(self, players: IdMap, games: IdMap, owns: CsrAdjacency, rated: CsrAdjacency,
+                 friends: CsrAdjacency, library_versions, friends_versions):
+        self.players = players
+        self.games = games
+        self.owns = owns
+        self.rated = rated
+        self.friends = friends
+        self.library_versions = library_versions
+        self.friends_versions = friends_versions
+        self._owners: Optional[CsrAdjacency] = None
+
+    @classmethod
+    def from_database(cls, connection, batch_size: Optional[int] = None) -> "GraphProjection":
+        """Stream the whole graph into a new projection"""
+        require_numpy()
+        started = time.perf_counter()
+        projection = cls(IdMap.build([]), IdMap.build([]), CsrAdjacency.empty(0), CsrAdjacency.empty(0),
+                         CsrAdjacency.empty(0), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+        projection.refresh(connection, batch_size)
+        logger.info(f"Projected {projection.stats()} in {time.perf_counter() - started:.2f}s")
+        return projection
+
+    def refresh(self, connection, batch_size: Optional[int] = None) -> Dict[str, int]:
+        """Add new players and games and re-read the edges of players whose versions moved.
+
+        Versions are read before edges, so a write racing the refresh leaves
+        its player stale for the next refresh rather than half-applied.
+        """
+        require_numpy()
+        repository = BaseRepository(connection)
+        batch_size = batch_size or connection.config.batch_size
+        full = not len(self.players)
+
+        player_ids, library_versions, friends_versions = [], [], []
+        for row in repository.stream_query(ProjectionQueries.get_player_versions()):
+            player_ids.append(row['id'])
+            library_versions.append(row['library_version'])
+            friends_versions.append(row['friends_version'])
+        game_ids = [row['id'] for row in repository.stream_query(ProjectionQueries.get_game_ids())]
+
+        known_players, known_games = len(self.players), len(self.games)
+        players = self.players.extended(player_ids)
+        games = self.games.extended(game_ids)
+        n_players = len(players)
+        indices = players.indices_of(player_ids)
+
+        stored_library = self._grown(self.library_versions, n_players)
+        stored_friends = self._grown(self.friends_versions, n_players)
+        fetched_library = self._grown(np.empty(0, dtype=np.int64), n_players)
+        fetched_friends = self._grown(np.empty(0, dtype=np.int64), n_players)
+        fetched_library[indices] = library_versions
+        fetched_friends[indices] = friends_versions
+        library_changed = np.flatnonzero(fetched_library != stored_library)
+        friends_changed = np.flatnonzero(fetched_friends != stored_friends)
+
+        self.players, self.games = players, games
+        if full:
+            owns = self._fetch_edges(repository, ProjectionQueries.get_owns_edges(), None,
+                                     players, games, batch_size)
+            rated = self._fetch_edges(repository, ProjectionQueries.get_rated_edges(), None,
+                                      players, games, batch_size)
+            friendships = self._fetch_edges(repository, ProjectionQueries.get_friendship_edges(), None,
+                                            players, players, batch_size)
+            friendships = self._symmetric(friendships, n_players)
+            self.owns = CsrAdjacency.from_edges(owns.rows, owns.columns, owns.weights, n_players)
+            self.rated = CsrAdjacency.from_edges(rated.rows, rated.columns, rated.weights, n_players)
+            self.friends = CsrAdjacency.from_edges(friendships.rows, friendships.columns,
+                                                   friendships.weights, n_players)
+        else:
+            changed_ids = [players.id_of(index) for index in library_changed]
+            owns = self._fetch_edges(repository, ProjectionQueries.get_player_owns_edges(), changed_ids,
+                                     players, games, batch_size)
+            rated = self._fetch_edges(repository, ProjectionQueries.get_player_rated_edges(), changed_ids,
+                                      players, games, batch_size)
+            friend_ids = [players.id_of(index) for index in friends_changed]
+            friendships = self._fetch_edges(repository, ProjectionQueries.get_player_friendship_edges(),
+                                            friend_ids, players, players, batch_size)
+            self.owns = self.owns.with_rows_replaced(library_changed, owns.rows, owns.columns, owns.weights,
+                                                     n_players)
+            self.rated = self.rated.with_rows_replaced(library_changed, rated.rows, rated.columns, rated.weights,
+                                                       n_players)
+            self.friends = self.friends.with_rows_replaced(friends_changed, friendships.rows, friendships.columns,
+                                                           friendships.weights, n_players)
+
+        # Players with edges to nodes created after the id scan are refreshed again next time
+        for dangling in (owns.dangling | rated.dangling):
+            fetched_library[dangling] = STALE_VERSION
+        for dangling in friendships.dangling:
+            fetched_friends[dangling] = STALE_VERSION
+        self.library_versions, self.friends_versions = fetched_library, fetched_friends
+        self._owners = None
+
+        changes = {
+            "new_players": n_players - known_players,
+            "new_games": len(games) - known_games,
+            "library_changed": int(library_changed.size),
+            "friends_changed": int(friends_changed.size)
+        }
+        if not full:
+            logger.info(f"Refreshed graph projection: {changes}")
+        return changes
+
+    @staticmethod
+    def _grown(versions, size: int):
+        """Versions padded with STALE_VERSION up to size"""
+        grown = np.full(size, STALE_VERSION, dtype=np.int64)
+        grown[:len(versions)] = versions
+        return grown
+
+    @staticmethod
+    def _fetch_edges(repository, query: str, player_ids: Optional[List[str]], sources: IdMap,
+                     targets: IdMap, batch_size: int) -> _Edges:
+        """Stream (source, target, weight) rows into index arrays, batch by batch.
+
+        With player_ids the per-player query runs once per batch of players.
+        """
+        if player_ids is None:
+            batches = [repository.stream_query(query)]
+        else:
+            batches = (repository.stream_query(query, {"player_ids": chunk})
+                       for chunk in chunked(player_ids, batch_size))
+
+        rows, columns, weights, dangling = [], [], [], set()
+        for records in batches:
+            for batch in chunked(records, batch_size):
+                source = sources.indices_of([record['source'] for record in batch])
+                target = targets.indices_of([record['target'] for record in batch])
+                weight = np.array([record['weight'] or 0.0 for record in batch], dtype=np.float32)
+                known = (source >= 0) & (target >= 0)
+                dangling.update(source[(source >= 0) & (target < 0)].tolist())
+                rows.append(source[known])
+                columns.append(target[known])
+                weights.append(weight[known])
+
+        if not rows:
+            return _Edges(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64),
+                          np.empty(0, dtype=np.float32), dangling)
+        return _Edges(np.concatenate(rows), np.concatenate(columns), np.concatenate(weights), dangling)
+
+    @staticmethod
+    def _symmetric(edges: _Edges, n_players: int) -> _Edges:
+        """Both directions of every friendship, once each"""
+        rows = np.concatenate([edges.rows, edges.columns])
+        columns = np.concatenate([edges.columns, edges.rows])
+        _, unique = np.unique(rows * n_players + columns, return_index=True)
+        dangling = set(edges.dangling)
+        return _Edges(rows[unique], columns[unique], np.ones(unique.size, dtype=np.float32), dangling)
+
+    def games_of(self, player_id: str) -> List[Tuple[str, float]]:
+        """(game id, playtime) of every game a player owns"""
+        index = self.players.index_of(player_id)
+        if index < 0:
+            return []
+        return [(self.games.id_of(game), float(weight))
+                for game, weight in zip(self.owns.neighbors(index), self.owns.edge_weights(index))]
+
+    def owners_of(self, game_id: str) -> List[str]:
+        """Ids of the players owning a game"""
+        index = self.games.index_of(game_id)
+        if index < 0:
+            return []
+        if self._owners is None:
+            self._owners = self.owns.transpose(len(self.games))
+        return [self.players.id_of(player) for player in self._owners.neighbors(index)]
+
+    def friends_of(self, player_id: str) -> List[str]:
+        """Ids of a player's friends"""
+        index = self.players.index_of(player_id)
+        if index < 0:
+            return []
+        return [self.players.id_of(friend) for friend in self.friends.neighbors(index)]
+
+    def stats(self) -> Dict[str, int]:
+        """Node and edge counts"""
+        return {
+            "players": len(self.players),
+            "games": len(self.games),
+            "owns": self.owns.n_edges,
+            "rated": self.rated.n_edges,
+            "friendships": self.friends.n_edges // 2
+        }
+
+    def _arrays(self) -> Dict[str, Any]:
+        """Every array of the projection by file name"""
+        arrays = {"library_versions": self.library_versions, "friends_versions": self.friends_versions}
+        for name, id_map in (("players", self.players), ("games", self.games)):
+            arrays.update({f"{name}_ids": id_map.ids, f"{name}_sorted_ids": id_map.sorted_ids,
+                           f"{name}_order": id_map.order})
+        for name, adjacency in (("owns", self.owns), ("rated", self.rated), ("friends", self.friends)):
+            arrays.update({f"{name}_indptr": adjacency.indptr, f"{name}_indices": adjacency.indices,
+                           f"{name}_weights": adjacency.weights})
+        return arrays
+
+    def save(self, directory: str) -> str:
+        """Write a new version under directory and point CURRENT at it; returns the version's path.
+
+        Processes that loaded the previous version keep reading it; older
+        versions are removed.
+        """
+        return save_versioned_arrays(directory, self._arrays(), self.stats())
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "GraphProjection":
+        """Load the current saved version, memory-mapped read-only unless mmap=False"""
+        array, _ = load_versioned_arrays(directory, mmap)
+
+        def id_map(name):
+            return IdMap(array(f"{name}_ids"), array(f"{name}_sorted_ids"), array(f"{name}_order"))
+
+        def adjacency(name):
+            return CsrAdjacency(array(f"{name}_indptr"), array(f"{name}_indices"), array(f"{name}_weights"))
+
+        return cls(id_map("players"), id_map("games"), adjacency("owns"), adjacency("rated"),
+                   adjacency("friends"), array("library_versions"), array("friends_versions"))
+
+
+def save_versioned_arrays(directory: str, arrays: Dict[str, Any], meta: Dict[str, Any]) -> str:
+    """Save arrays as .npy files in a new version directory, then atomically repoint CURRENT.
+
+    The previous version is kept for processes still reading it; older ones are removed.
+    """
+    require_numpy()
+    os.makedirs(directory, exist_ok=True)
+    version = f"v{time.time_ns()}"
+    path = os.path.join(directory, version)
+    os.makedirs(path)
+    for name, array in arrays.items():
+        np.save(os.path.join(path, f"{name}.npy"), np.ascontiguousarray(array))
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as handle:
+        json.dump({"created_at": datetime.now(timezone.utc).isoformat(), **meta}, handle)
+
+    previous = _current_version(directory)
+    temporary = os.path.join(directory, CURRENT_NAME + ".tmp")
+    with open(temporary, "w", encoding="utf-8") as handle:
+        handle.write(version)
+    os.replace(temporary, os.path.join(directory, CURRENT_NAME))
+
+    for entry in os.listdir(directory):
+        if entry.startswith("v") and entry not in (version, previous):
+            shutil.rmtree(os.path.join(directory, entry), ignore_errors=True)
+    return path
+
+
+def load_versioned_arrays(directory: str, mmap: bool = True):
+    """(array(name) loader, meta) of the version CURRENT points to; arrays are read-only memory maps if mmap"""
+    require_numpy()
+    version = _current_version(directory)
+    if version is None:
+        raise FileNotFoundError(f"Nothing saved in {directory}")
+    path = os.path.join(directory, version)
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as handle:
+        meta = json.load(handle)
+
+    def array(name):
+        return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None)
+
+    return array, meta
+
+
+def _current_version(directory: str) -> Optional[str]:
+    """Name of the version CURRENT points to, None if nothing was saved"""
+    try:
+        with open(os.path.join(directory, CURRENT_NAME), encoding="utf-8") as handle:
+            return handle.read().strip() or None
+    except FileNotFoundError:
+        return None
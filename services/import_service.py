@@ -0,0 +1,300 @@
+"""
+Chunked, resumable bulk import of CSV and JSONL files
+"""
+
+from dataclasses import dataclass, field, fields
+from datetime import date
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union, get_args, get_origin
+import csv
+import json
+import os
+import time
+
+from models import Developer, Game, Player, PlayerFriendship, PlayerOwnsGame, PlayerRatesGame
+from repositories import (
+    BatchWriteReport, DeveloperRepository, GameRepository, PlayerRepository, RelationshipRepository
+)
+from utils import setup_logger
+
+logger = setup_logger(__name__)
+
+# Invalid rows logged in full per file; the rest are only counted (and written to the rejects file)
+MAX_LOGGED_REJECTS = 20
+
+
+@dataclass(frozen=True)
+class ImportKind:
+    """What a file holds: the entity model, the endpoint id columns and the bulk writer"""
+    name: str
+    model: type
+    endpoints: Tuple[str, ...]
+    write: Callable[[Any, List[Any], int], BatchWriteReport]
+
+
+# Rows of node files are entities; rows of relationship files are (endpoint ids..., relationship)
+IMPORT_KINDS: Dict[str, ImportKind] = {
+    kind.name: kind for kind in (
+        ImportKind("developers", Developer, (),
+                   lambda service, rows, size: service.developer_repo.merge_developers_bulk(rows, size)),
+        ImportKind("games", Game, (),
+                   lambda service, rows, size: service.game_repo.merge_games_bulk(rows, size)),
+        ImportKind("players", Player, (),
+                   lambda service, rows, size: service.player_repo.merge_players_bulk(rows, size)),
+        ImportKind("owns", PlayerOwnsGame, ("player_id", "game_id"),
+                   lambda service, rows, size: service.relationship_repo.merge_player_owns_game_bulk(rows, size)),
+        ImportKind("rates", PlayerRatesGame, ("player_id", "game_id"),
+                   lambda service, rows, size: service.relationship_repo.merge_player_rates_game_bulk(rows, size)),
+        ImportKind("friends", PlayerFriendship, ("player1_id", "player2_id"),
+                   lambda service, rows, size: service.relationship_repo.merge_friendships_bulk(rows, size)),
+    )
+}
+
+
+@dataclass
+class ImportReport:
+    """Outcome of importing one file"""
+    path: str
+    kind: str
+    resumed_from: int = 0
+    offset: int = 0
+    rows_imported: int = 0
+    # Valid rows that created nothing: already imported, or a relationship whose endpoint is missing
+    rows_skipped: int = 0
+    rows_rejected: int = 0
+    chunks_written: int = 0
+    elapsed_seconds: float = 0.0
+    completed: bool = False
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        """Throughput of the rows written (imported or skipped) in this run"""
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return (self.rows_imported + self.rows_skipped) / self.elapsed_seconds
+
+
+class RowError(ValueError):
+    """A row that does not match its model"""
+
+
+def _coerce(name: str, value: Any, annotation: Any) -> Any:
+    """Convert a CSV string or JSON value to the annotated field type"""
+    if get_origin(annotation) is Union:
+        if value is None or value == "":
+            return None
+        annotation = next(arg for arg in get_args(annotation) if arg is not type(None))
+    if value is None or value == "":
+        raise RowError(f"missing {name}")
+
+    try:
+        if annotation is date:
+            return value if isinstance(value, date) else date.fromisoformat(str(value))
+        if annotation is int:
+            number = float(value)
+            if not number.is_integer():
+                raise ValueError(value)
+            return int(number)
+        if annotation is float:
+            return float(value)
+        return str(value)
+    except ValueError:
+        raise RowError(f"invalid {annotation.__name__} for {name}: {value!r}")
+
+
+def parse_row(kind: ImportKind, row: Dict[str, Any]) -> Any:
+    """Validate a raw row against the kind's model and build the item its bulk writer takes"""
+    entity = kind.model(**{
+        model_field.name: _coerce(model_field.name, row.get(model_field.name), model_field.type)
+        for model_field in fields(kind.model)
+    })
+    if not kind.endpoints:
+        return entity
+    return tuple(_coerce(name, row.get(name), str) for name in kind.endpoints) + (entity,)
+
+
+def _read_lines(handle, position: List[int]) -> Iterator[str]:
+    """Decoded lines of a binary file, advancing position[0] past each line handed out"""
+    for raw in iter(handle.readline, b""):
+        position[0] += len(raw)
+        yield raw.decode("utf-8")
+
+
+def read_rows(path: str, file_format: str, offset: int = 0) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield (offset after the row, row) from `offset` on, one row in memory at a time.
+
+    CSV files need a header line; quoted fields may span lines.
+    """
+    with open(path, "rb") as handle:
+        position = [0]
+        if file_format == "csv":
+            header = next(csv.reader(_read_lines(handle, position)), None)
+            if header is None:
+                return
+            header[0] = header[0].lstrip("\ufeff")
+            if offset > position[0]:
+                handle.seek(offset)
+                position[0] = offset
+            for values in csv.reader(_read_lines(handle, position)):
+                if values:
+                    yield position[0], dict(zip(header, values))
+        else:
+            handle.seek(offset)
+            position[0] = offset
+            for line in _read_lines(handle, position):
+                if line.strip():
+                    try:
+                        row = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        row = {"__error__": f"invalid JSON: {e}"}
+                    if not isinstance(row, dict):
+                        row = {"__error__": "expected a JSON object"}
+                    yield position[0], row
+
+
+class Checkpoint:
+    """Byte offset of the last committed row of a file, kept next to the file or in a directory"""
+
+    def __init__(self, path: str, kind: str, directory: Optional[str] = None):
+        name = f"{os.path.basename(path)}.{kind}.checkpoint"
+        self.path = os.path.join(directory or os.path.dirname(os.path.abspath(path)), name)
+        self.source = os.path.abspath(path)
+
+    def load(self) -> Dict[str, Any]:
+        """The saved state, or an empty one; a checkpoint past the end of the file is ignored"""
+        try:
+            with open(self.path, encoding="utf-8") as handle:
+                state = json.load(handle)
+        except FileNotFoundError:
+            return {}
+        if state.get("source") != self.source or state.get("offset", 0) > os.path.getsize(self.source):
+            logger.warning(f"Ignoring checkpoint {self.path}: it does not match {self.source}")
+            return {}
+        return state
+
+    def save(self, offset: int, rows_imported: int, rows_skipped: int, rows_rejected: int) -> None:
+        """Atomically record progress"""
+        temporary = self.path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            json.dump({
+                "source": self.source,
+                "offset": offset,
+                "rows_imported": rows_imported,
+                "rows_skipped": rows_skipped,
+                "rows_rejected": rows_rejected
+            }, handle)
+        os.replace(temporary, self.path)
+
+    def clear(self) -> None:
+        """Forget the checkpoint"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class ImportService:
+    """Imports Developer, Game, Player, OWNS, RATED and FRIENDS_WITH files in UNWIND batches.
+
+    Rows are validated against models.entities and written one chunk per
+    transaction. After every committed chunk the file offset is checkpointed,
+    so an interrupted import resumes after the last committed row. Writes
+    MERGE on the node key or the relationship's endpoints, so a chunk that
+    committed before its checkpoint did is replayed as a no-op (and a player
+    rates a game at most once). Memory is bounded by the chunk size whatever
+    the file size.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.developer_repo = DeveloperRepository(connection)
+        self.game_repo = GameRepository(connection)
+        self.player_repo = PlayerRepository(connection)
+        self.relationship_repo = RelationshipRepository(connection)
+
+    def import_file(self, kind: str, path: str, file_format: Optional[str] = None,
+                    batch_size: Optional[int] = None, checkpoint_dir: Optional[str] = None,
+                    restart: bool = False, rejects_path: Optional[str] = None) -> ImportReport:
+        """Import one file; file_format defaults to the extension (.csv, otherwise JSONL)"""
+        if kind not in IMPORT_KINDS:
+            raise ValueError(f"Unknown import kind {kind!r}; expected one of {sorted(IMPORT_KINDS)}")
+        import_kind = IMPORT_KINDS[kind]
+        file_format = file_format or ("csv" if path.lower().endswith(".csv") else "jsonl")
+        batch_size = batch_size or self.connection.config.batch_size
+        size = os.path.getsize(path)
+
+        checkpoint = Checkpoint(path, kind, checkpoint_dir)
+        if restart:
+            checkpoint.clear()
+        state = checkpoint.load()
+        report = ImportReport(path, kind, resumed_from=state.get("offset", 0), offset=state.get("offset", 0))
+        previous = (state.get("rows_imported", 0), state.get("rows_skipped", 0), state.get("rows_rejected", 0))
+        if report.resumed_from:
+            logger.info(f"Resuming {path} at byte {report.resumed_from} ({previous[0]} rows already imported)")
+
+        started = time.perf_counter()
+        rejects = open(rejects_path, "a", encoding="utf-8") if rejects_path else None
+        try:
+            chunk: List[Any] = []
+            for offset, row in read_rows(path, file_format, report.offset):
+                try:
+                    if "__error__" in row:
+                        raise RowError(row["__error__"])
+                    chunk.append(parse_row(import_kind, row))
+                except (RowError, TypeError) as e:
+                    self._reject(report, offset, row, e, rejects)
+
+                if len(chunk) >= batch_size:
+                    if not self._write_chunk(import_kind, chunk, report):
+                        return report
+                    chunk = []
+                    report.offset = offset
+                    self._checkpoint(checkpoint, report, previous, size, started)
+
+            if chunk and not self._write_chunk(import_kind, chunk, report):
+                return report
+            report.offset = size
+            report.completed = True
+            checkpoint.clear()
+        finally:
+            if rejects:
+                rejects.close()
+            report.elapsed_seconds = time.perf_counter() - started
+
+        logger.info(
+            f"Imported {report.rows_imported} {kind} from {path} in {report.chunks_written} chunks "
+            f"({report.rows_per_second:.0f} rows/s), {report.rows_skipped} rows skipped, "
+            f"{report.rows_rejected} rows rejected"
+        )
+        return report
+
+    def _write_chunk(self, kind: ImportKind, chunk: List[Any], report: ImportReport) -> bool:
+        """Write one chunk in one transaction; False stops the import at the last checkpoint"""
+        result = kind.write(self, chunk, len(chunk))
+        if not result.success:
+            report.errors.append(f"chunk of {len(chunk)} rows after byte {report.offset} failed")
+            logger.error(f"Import of {report.path} stopped at byte {report.offset}; rerun to resume")
+            return False
+        report.rows_imported += result.entities_created
+        report.rows_skipped += result.rows_written - result.entities_created
+        report.chunks_written += 1
+        return True
+
+    @staticmethod
+    def _reject(report: ImportReport, offset: int, row: Dict[str, Any], error: Exception, rejects) -> None:
+        """Count an invalid row, log the first few and append it to the rejects file"""
+        report.rows_rejected += 1
+        if report.rows_rejected <= MAX_LOGGED_REJECTS:
+            logger.warning(f"Rejected row ending at byte {offset} of {report.path}: {error}")
+        if rejects:
+            rejects.write(json.dumps({"offset": offset, "error": str(error), "row": row}, default=str) + "\n")
+
+    @staticmethod
+    def _checkpoint(checkpoint: Checkpoint, report: ImportReport, previous: Tuple[int, int, int],
+                    size: int, started: float) -> None:
+        """Save the offset of the last committed row and log progress"""
+        imported, skipped, rejected = previous
+        checkpoint.save(report.offset, imported + report.rows_imported, skipped + report.rows_skipped,
+                        rejected + report.rows_rejected)
+        elapsed = time.perf_counter() - started
+        rate = (report.rows_imported + report.rows_skipped) / elapsed if elapsed > 0 else 0.0
+        percent = report.offset / size * 100 if size else 100.0
+        logger.info(f"   {report.path}: {percent:.1f}% ({report.rows_imported} rows, {rate:.0f} rows/s)")
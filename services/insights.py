@@ -0,0 +1,171 @@
+"""
+Single-pass insight engine
+
+Each insight is a small accumulator class that declares the node label and
+the properties it needs; a fresh instance is created for every run. The
+engine scans every label once, projecting only the union of requested
+properties into columnar batches, and feeds each batch to all accumulators
+of that label. Adding an insight adds no extra scan.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Tuple, Type
+
+from utils.buckets import PRICE_RANGE_EDGES, PRICE_RANGE_LABELS, bucket_label
+
+
+class InsightAccumulator(ABC):
+    """Base class for insights computed in one pass over a label's columns"""
+
+    key: str = ""
+    label: str = ""
+    columns: Tuple[str, ...] = ()
+
+    @abstractmethod
+    def update(self, batch: Dict[str, List[Any]]) -> None:
+        """Fold one columnar batch (property name -> list of values)"""
+
+    @abstractmethod
+    def result(self) -> Any:
+        """Final value reported under `key`"""
+
+
+class PriceRangeInsight(InsightAccumulator):
+    """Most common game price range"""
+
+    key = "most_common_price_range"
+    label = "Game"
+    columns = ("price",)
+
+    def __init__(self):
+        self.counts = dict.fromkeys(PRICE_RANGE_LABELS, 0)
+
+    def update(self, batch: Dict[str, List[Any]]) -> None:
+        for price in batch["price"]:
+            if price is not None:
+                self.counts[bucket_label(price, PRICE_RANGE_EDGES, PRICE_RANGE_LABELS)] += 1
+
+    def result(self) -> str:
+        if not any(self.counts.values()):
+            return "No data available"
+        return max(self.counts, key=self.counts.get)
+
+
+class GameQualityInsight(InsightAccumulator):
+    """Overall game quality from the average rating"""
+
+    key = "game_quality"
+    label = "Game"
+    columns = ("rating",)
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+
+    def update(self, batch: Dict[str, List[Any]]) -> None:
+        for rating in batch["rating"]:
+            if rating is not None:
+                self.count += 1
+                self.total += rating
+
+    def result(self) -> str:
+        if not self.count:
+            return "No data available"
+        return quality_level(self.total / self.count)
+
+
+class PlayerEngagementInsight(InsightAccumulator):
+    """Player engagement from the average total playtime"""
+
+    key = "player_engagement"
+    label = "Player"
+    columns = ("total_playtime",)
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+
+    def update(self, batch: Dict[str, List[Any]]) -> None:
+        for playtime in batch["total_playtime"]:
+            if playtime is not None:
+                self.count += 1
+                self.total += playtime
+
+    def result(self) -> str:
+        if not self.count:
+            return "No data available"
+        return engagement_level(self.total / self.count)
+
+
+# The insights reported by AnalyticsService out of the box
+DEFAULT_INSIGHTS = (PriceRangeInsight, PlayerEngagementInsight, GameQualityInsight)
+
+
+class InsightEngine:
+    """Runs registered insights with one projection scan per label"""
+
+    def __init__(self, repository, batch_size: int = None):
+        self.repository = repository
+        self.batch_size = batch_size
+        self.insights: List[Type[InsightAccumulator]] = []
+
+    def register(self, insight: Type[InsightAccumulator]) -> None:
+        """Add an insight accumulator class; keys must be unique"""
+        if any(existing.key == insight.key for existing in self.insights):
+            raise ValueError(f"Insight '{insight.key}' is already registered")
+        self.insights.append(insight)
+
+    def _plan(self) -> Dict[str, Tuple[List[str], List[InsightAccumulator]]]:
+        """Instantiate the accumulators and group them by label with the union of their columns"""
+        plan: Dict[str, Tuple[List[str], List[InsightAccumulator]]] = {}
+        for insight in self.insights:
+            columns, accumulators = plan.setdefault(insight.label, ([], []))
+            accumulators.append(insight())
+            columns.extend(column for column in insight.columns if column not in columns)
+        return plan
+
+    @staticmethod
+    def _results(plan: Dict[str, Tuple[List[str], List[InsightAccumulator]]]) -> Dict[str, Any]:
+        return {
+            accumulator.key: accumulator.result()
+            for _, accumulators in plan.values()
+            for accumulator in accumulators
+        }
+
+    def run(self) -> Dict[str, Any]:
+        """Scan each label once and return every insight"""
+        plan = self._plan()
+        for label, (columns, accumulators) in plan.items():
+            for batch in self.repository.stream_columns(label, columns, self.batch_size):
+                for accumulator in accumulators:
+                    accumulator.update(batch)
+        return self._results(plan)
+
+    async def run_async(self) -> Dict[str, Any]:
+        """Same as run() over an async repository"""
+        plan = self._plan()
+        for label, (columns, accumulators) in plan.items():
+            async for batch in self.repository.stream_columns(label, columns, self.batch_size):
+                for accumulator in accumulators:
+                    accumulator.update(batch)
+        return self._results(plan)
+
+
+def engagement_level(avg_playtime: float) -> str:
+    """Label the average playtime per player"""
+    if avg_playtime > 2000:
+        return "High engagement"
+    elif avg_playtime > 1000:
+        return "Medium engagement"
+    else:
+        return "Low engagement"
+
+
+def quality_level(avg_rating: float) -> str:
+    """Label the average game rating"""
+    if avg_rating >= 8.5:
+        return "Excellent quality games"
+    elif avg_rating >= 7.0:
+        return "Good quality games"
+    else:
+        return "Mixed quality games"
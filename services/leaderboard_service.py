@@ -0,0 +1,57 @@
+"""
+Player leaderboards by level, total playtime and per-game playtime
+"""
+
+from repositories.leaderboard_repository import LeaderboardRepository
+from queries import LeaderboardQueries
+from utils import setup_logger
+from typing import Dict, List, Optional
+
+logger = setup_logger(__name__)
+
+# Entries returned per leaderboard when no limit is given, and at most
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 100
+
+
+class LeaderboardService:
+    """Global and per-game player rankings.
+
+    Global ranks are answered from in-memory leaderboards (see
+    LeaderboardRepository); per-game ranks count the game's owners with a
+    higher playtime in the database.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.leaderboard_repo = LeaderboardRepository(connection)
+
+    def top_players(self, metric: str = "level", limit: int = DEFAULT_LIMIT) -> List[Dict]:
+        """Best players by level or total_playtime, with their ranks"""
+        return self.leaderboard_repo.get_top_players(metric, self._limit(limit))
+
+    def top_players_for_game(self, game_id: str, limit: int = DEFAULT_LIMIT) -> List[Dict]:
+        """Owners of a game with the most playtime, with their ranks"""
+        return self.leaderboard_repo.get_game_top_players(game_id, self._limit(limit))
+
+    def player_rank(self, player_id: str, metric: str = "level") -> Optional[Dict]:
+        """{score, rank} of a player by level or total_playtime, None when unranked"""
+        return self.leaderboard_repo.get_player_rank(player_id, metric)
+
+    def player_rank_for_game(self, player_id: str, game_id: str) -> Optional[Dict]:
+        """{score, rank} of a player among a game's owners by playtime, None when they do not own it"""
+        return self.leaderboard_repo.get_game_player_rank(player_id, game_id)
+
+    def warm_up(self) -> Dict[str, int]:
+        """Load every in-memory leaderboard now instead of on the first rank lookup"""
+        return {metric: self.leaderboard_repo.load_leaderboard(metric) for metric in LeaderboardQueries.METRICS}
+
+    @staticmethod
+    def _limit(limit: int) -> int:
+        """Clamp a requested list length"""
+        if limit <= 0:
+            return DEFAULT_LIMIT
+        if limit > MAX_LIMIT:
+            logger.warning(f"Limit capped at {MAX_LIMIT} entries")
+            return MAX_LIMIT
+        return limit
@@ -2,19 +2,62 @@
 Player business logic service
 """
 
+from database import UnitOfWork
 from repositories import PlayerRepository, GameRepository, RelationshipRepository
-from models import Player, PlayerOwnsGame, PlayerRatesGame
+from repositories.relationship_repository import MAX_FRIEND_SUGGESTIONS
+from models import Player, PlayerOwnsGame, PlayerRatesGame, PurchaseStatus
 from utils import setup_logger
-from typing import Dict, List, Optional
+from utils.buckets import PLAYER_LEVEL_EDGES, PLAYER_LEVEL_LABELS, bucket_label
+from utils.statistics import DEFAULT_PERCENTILES, describe, merge_percentiles
+from services import columnar_analytics
+from typing import Dict, Iterable, List, Optional, Sequence
 from datetime import date
 
 logger = setup_logger(__name__)
 
 
+def log_purchase(player_id: str, game_id: str, status: PurchaseStatus) -> None:
+    """Log the outcome of a purchase"""
+    if status == PurchaseStatus.CREATED:
+        logger.info(f"Player '{player_id}' purchased game '{game_id}'")
+    elif status == PurchaseStatus.ALREADY_OWNED:
+        logger.info(f"Player '{player_id}' already owns game '{game_id}'")
+    elif status == PurchaseStatus.MISSING_PLAYER:
+        logger.error(f"Player '{player_id}' does not exist")
+    else:
+        logger.error(f"Game '{game_id}' does not exist")
+
+
+def format_player_statistics(aggregates: Dict) -> Dict:
+    """Shape level and playtime summaries into the player statistics report"""
+    if not aggregates['count']:
+        return {"total_players": 0}
+
+    level, playtime = aggregates['level'], aggregates['playtime']
+    return {
+        "total_players": aggregates['count'],
+        "average_level": round(level['avg'], 1),
+        "highest_level": level['max'],
+        "lowest_level": level['min'],
+        "level_stdev": round(level['stdev'], 1),
+        "level_percentiles": level['percentiles'],
+        "average_playtime": round(playtime['avg'], 1),
+        "total_playtime_all_players": playtime['sum'],
+        "playtime_stdev": round(playtime['stdev'], 1),
+        "playtime_percentiles": playtime['percentiles']
+    }
+
+
+def categorize_player_level(level: int) -> str:
+    """Categorize player by level"""
+    return bucket_label(level, PLAYER_LEVEL_EDGES, PLAYER_LEVEL_LABELS)
+
+
 class PlayerService:
     """Service for player-related business logic"""
 
     def __init__(self, connection):
+        self.connection = connection
         self.player_repo = PlayerRepository(connection)
         self.game_repo = GameRepository(connection)
         self.relationship_repo = RelationshipRepository(connection)
@@ -54,73 +97,77 @@ class PlayerService:
             return False
 
     def purchase_game(self, player_id: str, game_id: str, purchase_date: date = None) -> bool:
-        """Handle game purchase logic"""
+        """Handle game purchase logic; repeat purchases are idempotent"""
         try:
-            # Validate player exists
-            if not self.player_repo.player_exists(player_id):
-                logger.error(f"Player '{player_id}' does not exist")
-                return False
-
-            # Validate game exists
-            if not self.game_repo.game_exists(game_id):
-                logger.error(f"Game '{game_id}' does not exist")
-                return False
-
-            # Check if player already owns the game
-            player_games = self.player_repo.get_player_games(player_id)
-            owned_game_ids = [game.get('title') for game in player_games]  # Need to adjust this logic
-
-            # Create ownership
             ownership = PlayerOwnsGame(
                 purchase_date=purchase_date or date.today(),
                 playtime=0  # Start with 0 playtime
             )
 
-            if self.relationship_repo.create_player_owns_game(player_id, game_id, ownership):
-                logger.info(f"Player '{player_id}' purchased game '{game_id}'")
-                return True
-            else:
-                logger.error("Failed to create ownership relationship")
-                return False
+            status = self.relationship_repo.purchase_game(player_id, game_id, ownership)
+            log_purchase(player_id, game_id, status)
+            return status.owned
 
         except Exception as e:
             logger.error(f"Error processing game purchase: {e}")
             return False
 
+    def checkout_cart(self, player_id: str, game_ids: List[str],
+                      purchase_date: date = None) -> Dict[str, PurchaseStatus]:
+        """Purchase every game of a storefront cart in one statement"""
+        try:
+            ownership = PlayerOwnsGame(
+                purchase_date=purchase_date or date.today(),
+                playtime=0
+            )
+
+            statuses = self.relationship_repo.purchase_games(player_id, game_ids, ownership)
+            for game_id, status in statuses.items():
+                log_purchase(player_id, game_id, status)
+            return statuses
+
+        except Exception as e:
+            logger.error(f"Error processing checkout: {e}")
+            return {}
+
     def rate_game(self, player_id: str, game_id: str, rating: float, review_text: str = None) -> bool:
-        """Handle game rating logic"""
+        """Handle game rating logic in a single transaction"""
         try:
             # Validate inputs
             if not (1 <= rating <= 10):
                 logger.error("Rating must be between 1 and 10")
                 return False
 
-            if not self.player_repo.player_exists(player_id):
-                logger.error(f"Player '{player_id}' does not exist")
-                return False
-
-            if not self.game_repo.game_exists(game_id):
-                logger.error(f"Game '{game_id}' does not exist")
-                return False
-
-            # Create rating
             player_rating = PlayerRatesGame(
                 rating=rating,
                 review_date=date.today(),
                 review_text=review_text
             )
 
-            if self.relationship_repo.create_player_rates_game(player_id, game_id, player_rating):
+            rated = self.connection.run_unit_of_work(
+                lambda uow: self._rate_game(uow, player_id, game_id, player_rating)
+            )
+            if rated:
                 logger.info(f"Player '{player_id}' rated game '{game_id}' with {rating}/10")
-                return True
-            else:
-                logger.error("Failed to create rating relationship")
-                return False
+            return rated
 
         except Exception as e:
             logger.error(f"Error processing game rating: {e}")
             return False
 
+    def _rate_game(self, uow: UnitOfWork, player_id: str, game_id: str, rating: PlayerRatesGame) -> bool:
+        """Validate both endpoints and write the RATED relationship inside one unit of work"""
+        if not uow.repository(PlayerRepository).player_exists(player_id):
+            logger.error(f"Player '{player_id}' does not exist")
+            return False
+
+        if not uow.repository(GameRepository).game_exists(game_id):
+            logger.error(f"Game '{game_id}' does not exist")
+            return False
+
+        uow.repository(RelationshipRepository).create_player_rates_game(player_id, game_id, rating)
+        return True
+
     def get_player_profile(self, player_id: str) -> Optional[Dict]:
         """Get comprehensive player profile"""
         try:
@@ -142,7 +189,7 @@ class PlayerService:
                 'games_owned': total_games,
                 'total_playtime_hours': total_playtime,
                 'average_playtime_per_game': round(total_playtime / total_games, 1) if total_games > 0 else 0,
-                'player_level_category': self._categorize_player_level(player['level']),
+                'player_level_category': categorize_player_level(player['level']),
                 'games': player_games
             })
 
@@ -153,35 +200,54 @@ class PlayerService:
             logger.error(f"Error getting player profile: {e}")
             return None
 
-    def get_player_statistics(self) -> Dict:
-        """Get overall player statistics"""
-        total_players = self.player_repo.get_players_count()
-        all_players = self.player_repo.get_all_players()
+    def suggest_friends(self, player_id: str, limit: int = 10) -> List[Dict]:
+        """Suggest friends of friends, most mutual friends and then most shared games first"""
+        if limit <= 0:
+            limit = 10
+        elif limit > MAX_FRIEND_SUGGESTIONS:
+            limit = MAX_FRIEND_SUGGESTIONS
+            logger.warning(f"Limit capped at {MAX_FRIEND_SUGGESTIONS} suggestions")
 
-        if not all_players:
-            return {"total_players": 0}
-
-        levels = [player['level'] for player in all_players]
-        playtimes = [player['total_playtime'] for player in all_players]
+        try:
+            return self.relationship_repo.get_friend_suggestions(player_id, limit)
 
-        stats = {
-            "total_players": total_players,
-            "average_level": round(sum(levels) / len(levels), 1),
-            "highest_level": max(levels),
-            "average_playtime": round(sum(playtimes) / len(playtimes), 1),
-            "total_playtime_all_players": sum(playtimes)
-        }
+        except Exception as e:
+            logger.error(f"Error suggesting friends: {e}")
+            return []
+
+    def get_player_statistics(self, extra_percentiles: Optional[Sequence[float]] = None,
+                              columnar: bool = False) -> Dict:
+        """Get overall player statistics, aggregated by the database in one query.
+
+        With columnar=True levels and playtimes are streamed into NumPy arrays
+        and summarized in-process instead (requires NumPy).
+        """
+        percentiles = merge_percentiles(DEFAULT_PERCENTILES, extra_percentiles)
+        if columnar:
+            arrays = columnar_analytics.fetch_arrays(self.player_repo, "Player", ("level", "total_playtime"))
+            aggregates = {
+                "count": len(arrays["level"]),
+                "level": columnar_analytics.describe(arrays["level"], percentiles),
+                "playtime": columnar_analytics.describe(arrays["total_playtime"], percentiles)
+            }
+        else:
+            aggregates = self.player_repo.get_player_statistics(percentiles)
+        stats = format_player_statistics(aggregates)
 
         logger.info("Generated player statistics")
         return stats
 
-    def _categorize_player_level(self, level: int) -> str:
-        """Categorize player by level"""
-        if level < 10:
-            return "Beginner"
-        elif level < 25:
-            return "Intermediate"
-        elif level < 50:
-            return "Advanced"
-        else:
-            return "Expert"
+    @staticmethod
+    def summarize_players(players: Iterable[Dict], extra_percentiles: Optional[Sequence[float]] = None) -> Dict:
+        """Offline fallback: compute get_player_statistics() from player rows already at hand"""
+        percentiles = merge_percentiles(DEFAULT_PERCENTILES, extra_percentiles)
+        levels, playtimes = [], []
+        for player in players:
+            levels.append(player['level'])
+            playtimes.append(player['total_playtime'])
+
+        return format_player_statistics({
+            "count": len(levels),
+            "level": describe(levels, percentiles),
+            "playtime": describe(playtimes, percentiles)
+        })
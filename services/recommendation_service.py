@@ -0,0 +1,159 @@
+"""
+Collaborative-filtering game recommendations
+"""
+
+from dataclasses import dataclass
+from math import sqrt
+from repositories.recommendation_repository import RecommendationRepository
+from utils import setup_logger, chunked
+from typing import Dict, Iterable, List, Optional
+import time
+
+logger = setup_logger(__name__)
+
+# Games stored per game and per player
+DEFAULT_TOP_K = 10
+# A rating at least this high counts as liking the game (owning always counts)
+LIKE_THRESHOLD = 7.0
+# Co-occurring games considered per game before scoring, as a multiple of top_k
+CANDIDATE_FACTOR = 5
+
+
+@dataclass
+class RecommendationRefreshReport:
+    """Outcome of a recommendation refresh"""
+    games_refreshed: int = 0
+    players_refreshed: int = 0
+    failed_rows: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def success(self) -> bool:
+        """True when every batch was written"""
+        return not self.failed_rows
+
+
+class RecommendationService:
+    """Precomputed "players who own/like this also own/like" recommendations.
+
+    Refreshing runs in two passes. First every game gets its top-k similar
+    games: those most often owned or liked by the same players, scored by
+    cosine similarity (shared players / sqrt(players of one x players of the
+    other)) and stored as Game-[:RECOMMENDED]->Game. Then every player gets
+    the top-k games summed over the similar-game lists of their library,
+    stored as Player-[:RECOMMENDED]->Game. Serving reads at most k stored
+    relationships and drops games owned or rated since the last refresh.
+
+    Owning or rating a game bumps the player's library version, so
+    refresh_stale_players() recomputes only the players whose library changed
+    (and the similar-game lists of the games in those libraries).
+    """
+
+    def __init__(self, connection, top_k: int = DEFAULT_TOP_K, like_threshold: float = LIKE_THRESHOLD):
+        self.connection = connection
+        self.recommendation_repo = RecommendationRepository(connection)
+        self.top_k = top_k
+        self.like_threshold = like_threshold
+
+    def recommend_for_player(self, player_id: str, limit: Optional[int] = None) -> List[Dict]:
+        """Top stored games for a player that they do not own yet"""
+        return self.recommendation_repo.get_player_recommendations(player_id, self._limit(limit))
+
+    def recommend_for_game(self, game_id: str, limit: Optional[int] = None,
+                           player_id: Optional[str] = None) -> List[Dict]:
+        """Games most owned or liked by this game's players, without games player_id already owns"""
+        return self.recommendation_repo.get_similar_games(game_id, self._limit(limit), player_id)
+
+    def refresh_all(self, batch_size: Optional[int] = None) -> RecommendationRefreshReport:
+        """Recompute every game's and every player's recommendations"""
+        started = time.perf_counter()
+        report = RecommendationRefreshReport()
+        popularity = self.recommendation_repo.get_interaction_counts(self.like_threshold)
+        self._refresh_games(list(popularity), popularity, report, batch_size)
+
+        player_ids = list(self.recommendation_repo.iter_player_ids())
+        self._refresh_players(player_ids, report, batch_size)
+        return self._finish(report, started, "Full")
+
+    def refresh_stale_players(self, batch_size: Optional[int] = None) -> RecommendationRefreshReport:
+        """Recompute recommendations of players whose library changed since their last refresh"""
+        started = time.perf_counter()
+        report = RecommendationRefreshReport()
+        player_ids = list(self.recommendation_repo.iter_stale_player_ids())
+        if not player_ids:
+            return self._finish(report, started, "Incremental")
+
+        batch_size = batch_size or self.connection.config.batch_size
+        game_ids = set()
+        for chunk in chunked(player_ids, batch_size):
+            game_ids.update(self.recommendation_repo.get_games_of_players(chunk, self.like_threshold))
+
+        # Popularity is fetched per chunk for just the affected games and their candidates
+        self._refresh_games(sorted(game_ids), None, report, batch_size)
+        self._refresh_players(player_ids, report, batch_size)
+        return self._finish(report, started, "Incremental")
+
+    def _refresh_games(self, game_ids: List[str], popularity: Optional[Dict[str, int]],
+                       report: RecommendationRefreshReport, batch_size: Optional[int]) -> None:
+        """Score and store the similar games of game_ids, one chunk of games at a time.
+
+        Without a popularity map, each chunk reads the counts of its games and their candidates.
+        """
+        batch_size = batch_size or self.connection.config.batch_size
+        candidate_limit = self.top_k * CANDIDATE_FACTOR
+        for chunk in chunked(game_ids, batch_size):
+            candidates = self.recommendation_repo.get_co_occurring_games(chunk, self.like_threshold, candidate_limit)
+            counts = popularity
+            if counts is None:
+                involved = set(chunk).union(other for shared in candidates.values() for other, _ in shared)
+                counts = self.recommendation_repo.get_interaction_counts_for_games(
+                    sorted(involved), self.like_threshold
+                )
+            rows = [
+                {"game_id": game_id, "recommendations": self._score_candidates(game_id, shared, counts)}
+                for game_id, shared in candidates.items()
+            ]
+            written = self.recommendation_repo.store_game_recommendations(rows, batch_size)
+            report.games_refreshed += written.rows_written
+            report.failed_rows += written.failed_rows
+
+    def _score_candidates(self, game_id: str, shared: Iterable, popularity: Dict[str, int]) -> List[Dict]:
+        """Rank co-occurring games by cosine similarity and keep the top k"""
+        players = popularity.get(game_id, 0)
+        scored = sorted(
+            (
+                (together / sqrt(players * popularity[other]), other)
+                for other, together in shared
+                if players and popularity.get(other)
+            ),
+            key=lambda item: (-item[0], item[1])
+        )[:self.top_k]
+        return [
+            {"game_id": other, "rank": rank, "score": round(score, 6)}
+            for rank, (score, other) in enumerate(scored, start=1)
+        ]
+
+    def _refresh_players(self, player_ids: List[str], report: RecommendationRefreshReport,
+                         batch_size: Optional[int]) -> None:
+        """Recompute the personal recommendations of players from the stored similar games"""
+        written = self.recommendation_repo.refresh_player_recommendations(
+            player_ids, self.like_threshold, self.top_k, batch_size
+        )
+        report.players_refreshed += written.rows_written
+        report.failed_rows += written.failed_rows
+
+    def _limit(self, limit: Optional[int]) -> int:
+        """Clamp a serving limit to what was precomputed"""
+        if limit is None or limit <= 0:
+            return self.top_k
+        return min(limit, self.top_k)
+
+    @staticmethod
+    def _finish(report: RecommendationRefreshReport, started: float, kind: str) -> RecommendationRefreshReport:
+        """Stamp the elapsed time and log the refresh"""
+        report.elapsed_seconds = time.perf_counter() - started
+        logger.info(
+            f"{kind} recommendation refresh: {report.games_refreshed} games, {report.players_refreshed} players "
+            f"in {report.elapsed_seconds:.2f}s, {report.failed_rows} rows failed"
+        )
+        return report
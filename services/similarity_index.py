@@ -0,0 +1,199 @@
+"""
+Item-item game similarity from the rating matrix of a graph projection
+
+The RATED edges of a GraphProjection form a sparse player x game rating
+matrix. Each rating is centered on its player's mean rating (so generous and
+harsh raters compare fairly), and every game keeps its top-k most similar
+games by cosine similarity of those centered columns (adjusted cosine).
+Only positive similarities backed by at least min_common shared raters are
+kept. The neighbour lists are CSR arrays saved and loaded like projections,
+so similar_games() is an in-memory lookup that never queries the database.
+"""
+
+from typing import Any, Dict, List, Tuple
+import time
+
+from services.graph_projection import (
+    CsrAdjacency, GraphProjection, IdMap, STALE_VERSION, load_versioned_arrays, require_numpy,
+    save_versioned_arrays
+)
+from utils import setup_logger
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+logger = setup_logger(__name__)
+
+# Similar games kept per game
+DEFAULT_TOP_K = 20
+# Raters two games must share before their similarity counts
+DEFAULT_MIN_COMMON = 2
+
+
+def _rating_matrix(projection: GraphProjection) -> Tuple[CsrAdjacency, CsrAdjacency, Any]:
+    """Mean-centered ratings as player -> game and game -> player CSR, and each game's column norm.
+
+    Repeated ratings of a game by one player are averaged.
+    """
+    n_players, n_games = len(projection.players), len(projection.games)
+    rated = projection.rated
+    keys = rated.edge_rows() * max(n_games, 1) + rated.indices.astype(np.int64)
+    keys, inverse = np.unique(keys, return_inverse=True)
+    ratings = np.bincount(inverse, weights=rated.weights.astype(np.float64)) / np.bincount(inverse)
+    rows, columns = keys // max(n_games, 1), keys % max(n_games, 1)
+
+    counts = np.bincount(rows, minlength=n_players)
+    means = np.bincount(rows, weights=ratings, minlength=n_players) / np.maximum(counts, 1)
+    centered = ratings - means[rows]
+
+    by_player = CsrAdjacency.from_edges(rows, columns, centered, n_players)
+    by_game = CsrAdjacency.from_edges(columns, rows, centered, n_games)
+    norms = np.sqrt(np.bincount(columns, weights=centered * centered, minlength=n_games))
+    return by_player, by_game, norms
+
+
+def _gather(indptr, rows):
+    """Positions of every entry of the given CSR rows, row after row"""
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    return np.arange(int(lengths.sum()), dtype=np.int64) + offsets, lengths
+
+
+class GameSimilarityIndex:
+    """Top-k similar games per game, as CSR rows of (game index, similarity).
+
+    Game indices are those of the projection the index was built from, so an
+    index can follow a projection as it refreshes: update() recomputes only
+    the games rated by players whose library changed since the last build or
+    update, and the games whose lists contained them. An unaffected game that
+    should now list an affected one picks it up at the next build().
+    """
+
+    def __init__(self, games: IdMap, neighbors: CsrAdjacency, library_versions,
+                 top_k: int = DEFAULT_TOP_K, min_common: int = DEFAULT_MIN_COMMON):
+        self.games = games
+        self.neighbors = neighbors
+        self.library_versions = library_versions
+        self.top_k = top_k
+        self.min_common = min_common
+
+    @classmethod
+    def build(cls, projection: GraphProjection, top_k: int = DEFAULT_TOP_K,
+              min_common: int = DEFAULT_MIN_COMMON) -> "GameSimilarityIndex":
+        """Compute the similar games of every game in the projection"""
+        require_numpy()
+        started = time.perf_counter()
+        index = cls(projection.games, CsrAdjacency.empty(len(projection.games)),
+                    np.array(projection.library_versions, dtype=np.int64), top_k, min_common)
+        index._recompute(projection, np.arange(len(projection.games), dtype=np.int64))
+        logger.info(f"Built similarity index of {len(index.games)} games ({index.neighbors.n_edges} pairs) "
+                    f"in {time.perf_counter() - started:.2f}s")
+        return index
+
+    def update(self, projection: GraphProjection) -> int:
+        """Recompute the games affected by ratings since the last build or update; returns how many"""
+        require_numpy()
+        n_players = len(projection.players)
+        known = np.full(n_players, STALE_VERSION, dtype=np.int64)
+        known[:len(self.library_versions)] = self.library_versions
+        changed_players = np.flatnonzero((projection.library_versions != known)
+                                         | (projection.library_versions == STALE_VERSION))
+
+        rated_games = projection.rated.indices[_gather(projection.rated.indptr, changed_players)[0]]
+        affected = np.unique(rated_games.astype(np.int64))
+        listing = self.neighbors.edge_rows()[np.isin(self.neighbors.indices, affected)]
+        new_games = np.arange(len(self.games), len(projection.games), dtype=np.int64)
+        games = np.unique(np.concatenate([affected, listing, new_games]))
+
+        self.games = projection.games
+        self.library_versions = np.array(projection.library_versions, dtype=np.int64)
+        self._recompute(projection, games)
+        logger.info(f"Updated similarity index: {games.size} games from {changed_players.size} changed players")
+        return int(games.size)
+
+    def _recompute(self, projection: GraphProjection, games) -> None:
+        """Replace the neighbour lists of games with freshly scored ones"""
+        by_player, by_game, norms = _rating_matrix(projection)
+        rows, columns, scores = [], [], []
+        for game in games.tolist():
+            similar, similarity = self._score_game(game, by_player, by_game, norms)
+            rows.append(np.full(similar.size, game, dtype=np.int64))
+            columns.append(similar)
+            scores.append(similarity)
+
+        empty = [np.empty(0, dtype=np.int64)]
+        self.neighbors = self.neighbors.with_rows_replaced(
+            games,
+            np.concatenate(rows or empty),
+            np.concatenate(columns or empty),
+            np.concatenate(scores or [np.empty(0, dtype=np.float32)]).astype(np.float32),
+            len(projection.games)
+        )
+
+    def _score_game(self, game: int, by_player: CsrAdjacency, by_game: CsrAdjacency, norms):
+        """(game indices, similarities) of a game's top-k positive neighbours"""
+        raters = by_game.neighbors(game).astype(np.int64)
+        if not raters.size or not norms[game]:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+        positions, lengths = _gather(by_player.indptr, raters)
+        others = by_player.indices[positions]
+        products = np.repeat(by_game.edge_weights(game).astype(np.float64), lengths) * by_player.weights[positions]
+        candidates, inverse = np.unique(others.astype(np.int64), return_inverse=True)
+        dots = np.bincount(inverse, weights=products)
+        common = np.bincount(inverse)
+
+        denominators = norms[game] * norms[candidates]
+        keep = (candidates != game) & (common >= self.min_common) & (denominators > 0)
+        candidates = candidates[keep]
+        similarity = dots[keep] / denominators[keep]
+        positive = similarity > 0
+        candidates, similarity = candidates[positive], similarity[positive]
+
+        if similarity.size > self.top_k:
+            best = np.argpartition(-similarity, self.top_k - 1)[:self.top_k]
+            candidates, similarity = candidates[best], similarity[best]
+        return candidates, similarity
+
+    def similar_games(self, game_id: str, k: int = 10) -> List[Tuple[str, float]]:
+        """(game id, similarity) of up to k games most similar to game_id, best first"""
+        index = self.games.index_of(game_id)
+        if index < 0 or index >= self.neighbors.n_rows:
+            return []
+        similar = self.neighbors.neighbors(index)
+        similarity = self.neighbors.edge_weights(index)
+        order = np.lexsort((similar, -similarity))[:max(k, 0)]
+        return [(self.games.id_of(similar[position]), float(similarity[position])) for position in order]
+
+    def stats(self) -> Dict[str, int]:
+        """Game and pair counts and the parameters used"""
+        return {
+            "games": len(self.games),
+            "pairs": self.neighbors.n_edges,
+            "top_k": self.top_k,
+            "min_common": self.min_common
+        }
+
+    def save(self, directory: str) -> str:
+        """Write a new version under directory and point CURRENT at it; returns the version's path"""
+        arrays = {
+            "games_ids": self.games.ids,
+            "games_sorted_ids": self.games.sorted_ids,
+            "games_order": self.games.order,
+            "neighbors_indptr": self.neighbors.indptr,
+            "neighbors_indices": self.neighbors.indices,
+            "neighbors_weights": self.neighbors.weights,
+            "library_versions": self.library_versions
+        }
+        return save_versioned_arrays(directory, arrays, self.stats())
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "GameSimilarityIndex":
+        """Load the current saved version, memory-mapped read-only unless mmap=False"""
+        array, meta = load_versioned_arrays(directory, mmap)
+        games = IdMap(array("games_ids"), array("games_sorted_ids"), array("games_order"))
+        neighbors = CsrAdjacency(array("neighbors_indptr"), array("neighbors_indices"), array("neighbors_weights"))
+        return cls(games, neighbors, array("library_versions"), meta["top_k"], meta["min_common"])
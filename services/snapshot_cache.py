@@ -0,0 +1,188 @@
+"""
+Versioned snapshot cache for expensive analytics results
+"""
+
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set
+import asyncio
+import threading
+import time
+
+from repositories.cache import DataVersion, data_version_for
+from utils import setup_logger
+
+logger = setup_logger(__name__)
+
+
+@dataclass
+class _Snapshot:
+    """A computed result and the data version it was built at"""
+    value: Any
+    version: int
+    built_at: float
+
+
+class SnapshotCache:
+    """Serves analytics results from snapshots refreshed in the background.
+
+    A snapshot is stale once the data version has moved past the one it was
+    built at, or once it is older than `max_staleness` seconds (None: no time
+    bound). Stale snapshots are still returned immediately while a single
+    refresh per key runs in the background; only the very first call for a
+    key waits for the computation. Snapshots are shared between callers, so
+    treat returned values as read-only.
+    """
+
+    def __init__(self, data_version: DataVersion, max_staleness: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.data_version = data_version
+        self.max_staleness = max_staleness
+        self._clock = clock
+        self._snapshots: Dict[Hashable, _Snapshot] = {}
+        self._refreshing: Set[Hashable] = set()
+        self._lock = threading.Lock()
+        self._build_locks: Dict[Hashable, threading.Lock] = {}
+        self._async_build_locks: Dict[Hashable, asyncio.Lock] = {}
+        # The event loop only keeps weak references to tasks; these stay alive until done
+        self._refresh_tasks: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    def _is_fresh(self, snapshot: _Snapshot) -> bool:
+        """True while neither the data version nor the time bound has moved on"""
+        if snapshot.version != self.data_version.current:
+            return False
+        return self.max_staleness is None or self._clock() - snapshot.built_at < self.max_staleness
+
+    def _store(self, key: Hashable, value: Any, version: int) -> None:
+        """Keep a snapshot unless a newer one was stored meanwhile"""
+        with self._lock:
+            current = self._snapshots.get(key)
+            if current is None or current.version <= version:
+                self._snapshots[key] = _Snapshot(value, version, self._clock())
+
+    def _lookup(self, key: Hashable) -> Optional[_Snapshot]:
+        """Get the snapshot of a key (None if never built), counting the access"""
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is None:
+                self.misses += 1
+            elif self._is_fresh(snapshot):
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+            return snapshot
+
+    def _claim_refresh(self, key: Hashable) -> bool:
+        """True (once) if no refresh of key is running; the caller must then refresh"""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def _refresh_done(self, key: Hashable, error: Exception = None) -> None:
+        """Release the refresh claim of a key"""
+        with self._lock:
+            self._refreshing.discard(key)
+            if error is None:
+                self.refreshes += 1
+            else:
+                self.refresh_failures += 1
+        if error is not None:
+            logger.error(f"Snapshot refresh of {key!r} failed, serving the previous one: {error}")
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Get the snapshot of key, computing it on first use and refreshing it in the background"""
+        snapshot = self._lookup(key)
+        if snapshot is None:
+            with self._lock:
+                build_lock = self._build_locks.setdefault(key, threading.Lock())
+            # Concurrent first callers wait for one computation
+            with build_lock:
+                snapshot = self._snapshots.get(key)
+                if snapshot is None:
+                    version = self.data_version.current
+                    value = compute()
+                    self._store(key, value, version)
+                    return value
+                return snapshot.value
+
+        if not self._is_fresh(snapshot) and self._claim_refresh(key):
+            threading.Thread(
+                target=self._refresh, args=(key, compute), name=f"snapshot-refresh-{key}", daemon=True
+            ).start()
+        return snapshot.value
+
+    def _refresh(self, key: Hashable, compute: Callable[[], Any]) -> None:
+        """Recompute a stale snapshot (background thread)"""
+        version = self.data_version.current
+        try:
+            self._store(key, compute(), version)
+        except Exception as e:
+            self._refresh_done(key, e)
+        else:
+            self._refresh_done(key)
+
+    async def get_async(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Async get(): the first call awaits compute(), stale snapshots are refreshed in a task"""
+        snapshot = self._lookup(key)
+        if snapshot is None:
+            with self._lock:
+                build_lock = self._async_build_locks.setdefault(key, asyncio.Lock())
+            # Concurrent first callers await one computation
+            async with build_lock:
+                snapshot = self._snapshots.get(key)
+                if snapshot is None:
+                    version = self.data_version.current
+                    value = await compute()
+                    self._store(key, value, version)
+                    return value
+                return snapshot.value
+
+        if not self._is_fresh(snapshot) and self._claim_refresh(key):
+            task = asyncio.get_running_loop().create_task(self._refresh_async(key, compute))
+            self._refresh_tasks.add(task)
+            task.add_done_callback(self._refresh_tasks.discard)
+        return snapshot.value
+
+    async def _refresh_async(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> None:
+        """Recompute a stale snapshot (background task)"""
+        version = self.data_version.current
+        try:
+            self._store(key, await compute(), version)
+        except Exception as e:
+            self._refresh_done(key, e)
+        else:
+            self._refresh_done(key)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a snapshot so the next call recomputes it"""
+        with self._lock:
+            self._snapshots.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit, staleness and refresh counters"""
+        with self._lock:
+            return {
+                "snapshots": len(self._snapshots),
+                "data_version": self.data_version.current,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+                "refresh_failures": self.refresh_failures
+            }
+
+
+def snapshot_cache_for(connection) -> SnapshotCache:
+    """Get the snapshot cache shared by every analytics service on this connection"""
+    if 'snapshots' not in connection.shared:
+        connection.shared['snapshots'] = SnapshotCache(
+            data_version_for(connection),
+            max_staleness=connection.config.snapshot_max_staleness
+        )
+    return connection.shared['snapshots']
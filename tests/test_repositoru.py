@@ -11,7 +11,7 @@ sys.path.insert(0, parent_dir)
 
 from config import DatabaseConfig
 from database import Neo4jConnection
-from repositories import GameRepository, PlayerRepository, DeveloperRepository, RelationshipRepository
+from repositories import GameRepository, PlayerRepository, DeveloperRepository, RelationshipRepository, RowFormat
 from models import Game, Player, Developer, PlayerOwnsGame, PlayerRatesGame
 from queries import DatabaseQueries
 from utils import setup_logger
@@ -165,6 +165,83 @@ def test_repositories(connection):
     logger.info(f"   Developer 'CD Projekt RED' exists: {developer_repo.developer_exists('CD Projekt RED')}")
     logger.info(f"   Non-existent game exists: {game_repo.game_exists('fake_game')}")
 
+    # Test 8: Bulk ingestion
+    logger.info("📦 Testing Bulk Ingestion...")
+    bulk_players = [
+        Player(
+            id=f"bulk{i:03d}",
+            username=f"BulkGamer{i}",
+            email=f"bulk{i}@gamer.com",
+            join_date=date(2021, 1, 1),
+            level=i,
+            total_playtime=i * 10
+        )
+        for i in range(25)
+    ]
+    report = player_repo.create_players_bulk(bulk_players, batch_size=10)
+    if report.success and report.rows_written == len(bulk_players):
+        logger.info(f"   ✅ {report.rows_written} players in {report.chunks_written} chunks")
+    else:
+        logger.error(f"   ❌ Bulk player creation failed chunks: {report.failed_chunks}")
+
+    ownerships = [
+        (player.id, "witcher3", PlayerOwnsGame(purchase_date=date(2021, 2, 1), playtime=5))
+        for player in bulk_players
+    ]
+    report = relationship_repo.create_player_owns_game_bulk(ownerships, batch_size=10)
+    logger.info(f"   📈 {report.entities_created} OWNS relationships ({report.rows_per_second:.0f} rows/s)")
+
+    ratings = [
+        (player.id, "witcher3", PlayerRatesGame(rating=8.0, review_date=date(2021, 3, 1), review_text=None))
+        for player in bulk_players
+    ]
+    report = relationship_repo.create_player_rates_game_parallel(ratings, batch_size=5, workers=3)
+    if report.success and report.rows_written == len(ratings):
+        logger.info(
+            f"   ✅ {report.rows_written} RATED relationships on {report.workers} workers "
+            f"({report.deadlocks} deadlocks, {report.retries} retries)"
+        )
+    else:
+        logger.error(f"   ❌ Parallel rating write failed chunks: {report.failed_chunks}")
+
+    stats = game_repo.get_game_stats("witcher3")
+    repair = game_repo.repair_game_aggregates(batch_size=10)
+    repaired = game_repo.get_game_stats("witcher3")
+    consistent = (
+        (stats['total_owners'], stats['total_ratings']) == (repaired['total_owners'], repaired['total_ratings'])
+        and abs((stats['avg_user_rating'] or 0) - (repaired['avg_user_rating'] or 0)) < 1e-9
+    )
+    if repair.success and consistent:
+        logger.info(f"   ✅ Maintained aggregates match a full recount: {stats}")
+    else:
+        logger.error(f"   ❌ Aggregates drifted: {stats} vs {repaired}")
+
+    # Test 9: Keyset pagination
+    logger.info("📄 Testing Keyset Pagination...")
+    seen = []
+    page = player_repo.get_players_page(limit=10)
+    seen.extend(page.items)
+    while page.has_more:
+        page = player_repo.get_players_page(limit=10, page_token=page.next_token)
+        seen.extend(page.items)
+    usernames = [p['username'] for p in seen]
+    if usernames == sorted(usernames) and len(seen) == player_repo.get_players_count():
+        logger.info(f"   ✅ Paged through {len(seen)} players in order")
+    else:
+        logger.error("   ❌ Pagination returned players out of order or incomplete")
+
+    # Test 10: Row formats
+    logger.info("🧱 Testing Row Formats...")
+    as_dicts = game_repo.get_all_games()
+    as_tuples = game_repo.get_all_games(row_format="tuple")
+    as_entities = game_repo.get_all_games(row_format=RowFormat.ENTITY)
+    if (all(isinstance(game, Game) for game in as_entities)
+            and [tuple(row.values()) for row in as_dicts] == as_tuples
+            and all(type(game.release_date) is date for game in as_entities)):
+        logger.info(f"   ✅ {len(as_entities)} games as dicts, tuples and entities with native dates")
+    else:
+        logger.error("   ❌ Row formats disagree")
+
     return True
 
 
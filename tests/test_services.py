@@ -11,12 +11,18 @@ sys.path.insert(0, parent_dir)
 
 from config import DatabaseConfig
 from database import Neo4jConnection
-from services import GameService, PlayerService, AnalyticsService
-from models import Developer
-from repositories import DeveloperRepository
+from services import (
+    GameService, PlayerService, AnalyticsService, ExportService, GameSimilarityIndex, GraphProjection,
+    LeaderboardService, RecommendationService, columnar_analytics
+)
+from services.export_service import read_export, verify_export
+from services.import_service import IMPORT_KINDS, Checkpoint, ImportService, RowError, parse_row, read_rows
+from models import Developer, PlayerFriendship
+from repositories import DeveloperRepository, RelationshipRepository
 from queries import DatabaseQueries
 from utils import setup_logger
 from datetime import date
+import tempfile
 
 logger = setup_logger(__name__)
 
@@ -115,6 +121,17 @@ def test_services(connection):
     else:
         logger.error("   ❌ Game purchase failed")
 
+    # Repeat purchase must not create a second OWNS relationship
+    if player_service.purchase_game('player001', 'gta5'):
+        logger.info("   ✅ Repeat purchase is idempotent")
+    else:
+        logger.error("   ❌ Repeat purchase failed")
+
+    # Checkout cart with an owned, a new and a missing game
+    statuses = player_service.checkout_cart('player001', ['gta5', 'rdr2', 'missing_game'])
+    for game_id, status in statuses.items():
+        logger.info(f"      - {game_id}: {status.value}")
+
     # Test 6: Player rates game
     logger.info("⭐ Testing Game Rating...")
     if player_service.rate_game('player001', 'gta5', 8.5, "Great game, loved the story!"):
@@ -148,11 +165,28 @@ def test_services(connection):
 
     # Test 10: Game statistics
     logger.info("📈 Testing Game Statistics...")
-    game_stats = game_service.get_game_statistics()
+    game_stats = game_service.get_game_statistics(extra_percentiles=[0.95])
     logger.info(f"   📊 Game Statistics:")
     logger.info(f"      - Total games: {game_stats['total_games']}")
     logger.info(f"      - Average rating: {game_stats['average_rating']}")
     logger.info(f"      - Average price: ${game_stats['average_price']}")
+    logger.info(f"      - Rating p95: {game_stats['rating_percentiles']['p95']}")
+
+    offline_stats = GameService.summarize_games(game_service.get_all_games_with_details())
+    if offline_stats['average_rating'] == game_stats['average_rating']:
+        logger.info("   ✅ Offline statistics match the server-side aggregate")
+    else:
+        logger.error("   ❌ Offline statistics differ from the server-side aggregate")
+
+    if columnar_analytics.numpy_available():
+        columnar_stats = game_service.get_game_statistics(extra_percentiles=[0.95], columnar=True)
+        if columnar_stats == game_stats:
+            logger.info("   ✅ Columnar statistics match the server-side aggregate")
+        else:
+            logger.error("   ❌ Columnar statistics differ from the server-side aggregate")
+        game_metrics = analytics_service.get_game_metrics()
+        logger.info(f"      - Price histogram: {game_metrics['price_histogram']}")
+        logger.info(f"      - Price/rating correlation: {game_metrics['price_rating_correlation']}")
 
     # Test 11: Player statistics
     logger.info("📈 Testing Player Statistics...")
@@ -176,6 +210,118 @@ def test_services(connection):
     logger.info(f"      - Player engagement: {insights['player_engagement']}")
     logger.info(f"      - Game quality: {insights['game_quality']}")
 
+    # Export round trip
+    with tempfile.TemporaryDirectory() as directory:
+        manifest = ExportService(connection).export(directory, rows_per_file=2)
+        exported_games = list(read_export(directory, "Game"))
+        if not verify_export(directory) and len(exported_games) == overview['games']['total']:
+            logger.info(f"   ✅ Exported {len(manifest['nodes'])} labels and {len(manifest['relationships'])} types")
+        else:
+            logger.error("   ❌ Export does not match its manifest or the database")
+
+    # Recommendations: player002 owns GTA V, whose other owner also owns RDR2
+    logger.info("🎁 Testing Recommendations...")
+    recommendation_service = RecommendationService(connection)
+    player_service.create_player({**player_data, 'id': 'player002', 'username': 'SecondGamer',
+                                  'email': 'second@gamer.com'})
+    player_service.purchase_game('player002', 'gta5')
+    recommendation_service.refresh_all()
+    picks = [game['id'] for game in recommendation_service.recommend_for_player('player002')]
+    if picks == ['rdr2']:
+        logger.info(f"   ✅ player002 is recommended {picks}")
+    else:
+        logger.error(f"   ❌ Unexpected recommendations for player002: {picks}")
+
+    player_service.purchase_game('player002', 'rdr2')
+    report = recommendation_service.refresh_stale_players()
+    if report.players_refreshed == 1 and not recommendation_service.recommend_for_player('player002'):
+        logger.info("   ✅ Incremental refresh only recomputed the changed player")
+    else:
+        logger.error(f"   ❌ Incremental refresh refreshed {report.players_refreshed} players")
+
+    # Friend suggestions: player003 is a friend of player001's friend player002
+    logger.info("🤝 Testing Friend Suggestions...")
+    relationship_repo = RelationshipRepository(connection)
+    player_service.create_player({**player_data, 'id': 'player003', 'username': 'ThirdGamer',
+                                  'email': 'third@gamer.com'})
+    since = PlayerFriendship(since=date(2021, 5, 1))
+    relationship_repo.create_friendship('player001', 'player002', since)
+    relationship_repo.create_friendship('player002', 'player003', since)
+    suggestions = player_service.suggest_friends('player001')
+    cached = player_service.suggest_friends('player001')
+    if [s['id'] for s in suggestions] == ['player003'] and cached == suggestions:
+        logger.info(f"   ✅ Suggested {suggestions}")
+    else:
+        logger.error(f"   ❌ Unexpected friend suggestions: {suggestions}")
+
+    relationship_repo.create_friendship('player001', 'player003', since)
+    if not player_service.suggest_friends('player001'):
+        logger.info("   ✅ New friendship invalidated the cached suggestions")
+    else:
+        logger.error("   ❌ Stale friend suggestions served after a new friendship")
+
+    # Graph projection: friendships from above, refreshed after a purchase and loaded back memory-mapped
+    if columnar_analytics.numpy_available():
+        logger.info("🕸️  Testing Graph Projection...")
+        projection = GraphProjection.from_database(connection)
+        player_service.purchase_game('player003', 'gta5')
+        changes = projection.refresh(connection)
+        with tempfile.TemporaryDirectory() as directory:
+            projection.save(directory)
+            loaded = GraphProjection.load(directory)
+            if (sorted(loaded.friends_of('player001')) == ['player002', 'player003']
+                    and changes['library_changed'] == 1 and 'player003' in loaded.owners_of('gta5')):
+                logger.info(f"   ✅ Projection {loaded.stats()} refreshed incrementally ({changes})")
+            else:
+                logger.error(f"   ❌ Projection does not match the graph: {loaded.stats()}, {changes}")
+
+        # Game similarity: both players rate rdr2 above and gtaiv below their average, like gta5
+        logger.info("🎯 Testing Game Similarity Index...")
+        game_service.create_game_with_developer({**game_data, 'id': 'gtaiv', 'title': 'Grand Theft Auto IV'},
+                                                "Rockstar Games")
+        player_service.rate_game('player001', 'rdr2', 9)
+        player_service.rate_game('player001', 'gtaiv', 4)
+        player_service.rate_game('player002', 'gta5', 9)
+        player_service.rate_game('player002', 'rdr2', 8)
+        player_service.rate_game('player002', 'gtaiv', 5)
+        projection.refresh(connection)
+        index = GameSimilarityIndex.build(projection)
+        with tempfile.TemporaryDirectory() as directory:
+            index.save(directory)
+            similar = GameSimilarityIndex.load(directory).similar_games('gta5', 5)
+        if [game_id for game_id, _ in similar] == ['rdr2']:
+            logger.info(f"   ✅ Games similar to gta5: {similar}")
+        else:
+            logger.error(f"   ❌ Unexpected similar games for gta5: {similar}")
+
+    # Leaderboards: every player so far is level 30; a new level 50 player must move the loaded board
+    logger.info("🏆 Testing Leaderboards...")
+    leaderboard_service = LeaderboardService(connection)
+    before = leaderboard_service.player_rank('player001', 'level')
+    player_service.create_player({**player_data, 'id': 'player004', 'username': 'FourthGamer',
+                                  'email': 'fourth@gamer.com', 'level': 50})
+    after = leaderboard_service.player_rank('player001', 'level')
+    top = leaderboard_service.top_players('level', 2)
+    if before['rank'] == 1 and after['rank'] == 2 and top[0]['id'] == 'player004':
+        logger.info(f"   ✅ player001 moved from #{before['rank']} to #{after['rank']} by level")
+    else:
+        logger.error(f"   ❌ Unexpected leaderboard: {before}, {after}, {top}")
+
+    # Import: replaying a file (as after a crash between commit and checkpoint) must create nothing
+    logger.info("📥 Testing Import Replay...")
+    import_service = ImportService(connection)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "owns.csv")
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write("player_id,game_id,purchase_date,playtime\n"
+                         "player004,gta5,2024-01-01,10\nplayer004,missing,2024-01-01,1\n")
+        first = import_service.import_file("owns", path)
+        replay = import_service.import_file("owns", path, restart=True)
+    if (first.rows_imported, first.rows_skipped, replay.rows_imported, replay.rows_skipped) == (1, 1, 0, 2):
+        logger.info("   ✅ Replayed import skipped every row")
+    else:
+        logger.error(f"   ❌ Unexpected import reports: {first}, {replay}")
+
     # Test 13: Error handling
     logger.info("⚠️  Testing Error Handling...")
 
@@ -196,10 +342,78 @@ def test_services(connection):
     return True
 
 
+def test_import_parsing():
+    """Test row parsing, file reading and checkpoints of the importer (no database needed)"""
+    logger.info("🧪 Testing Import Parsing...")
+    passed = True
+
+    player = parse_row(IMPORT_KINDS["players"], {
+        "id": "p1", "username": "One", "email": "one@gamer.com", "join_date": "2024-01-01",
+        "level": "3", "total_playtime": "4.0"
+    })
+    ownership = parse_row(IMPORT_KINDS["owns"], {
+        "player_id": "p1", "game_id": "g1", "purchase_date": "2024-01-02", "playtime": "15"
+    })
+    if player.level == 3 and player.join_date == date(2024, 1, 1) and ownership[:2] == ("p1", "g1"):
+        logger.info("   ✅ Valid rows parsed")
+    else:
+        logger.error(f"   ❌ Unexpected parsed rows: {player}, {ownership}")
+        passed = False
+
+    for row in ({"id": "p1"}, {"id": "p1", "username": "One", "email": "one@gamer.com",
+                               "join_date": "2024-01-01", "level": "3.5", "total_playtime": "4"}):
+        try:
+            parse_row(IMPORT_KINDS["players"], row)
+            logger.error(f"   ❌ Invalid row accepted: {row}")
+            passed = False
+        except RowError:
+            pass
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "games.csv")
+        with open(csv_path, "w", encoding="utf-8", newline="") as handle:
+            handle.write('id,description\ng1,"two\nlines"\ng2,plain\n')
+        rows = list(read_rows(csv_path, "csv"))
+        resumed = [row for _, row in read_rows(csv_path, "csv", rows[0][0])]
+        if [row["description"] for _, row in rows] == ["two\nlines", "plain"] and resumed == [rows[1][1]]:
+            logger.info("   ✅ CSV rows read, including a quoted field spanning lines, and resumed")
+        else:
+            logger.error(f"   ❌ Unexpected CSV rows: {rows}, resumed {resumed}")
+            passed = False
+
+        jsonl_path = os.path.join(directory, "games.jsonl")
+        with open(jsonl_path, "w", encoding="utf-8") as handle:
+            handle.write('{"id": "g1"}\nnot json\n[1, 2]\n"x"\n{"id": "g2"}\n')
+        rows = list(read_rows(jsonl_path, "jsonl"))
+        resumed = [row for _, row in read_rows(jsonl_path, "jsonl", rows[3][0])]
+        if all("__error__" in row for _, row in rows[1:4]) and resumed == [{"id": "g2"}]:
+            logger.info("   ✅ JSONL rows read, invalid lines flagged, and resumed")
+        else:
+            logger.error(f"   ❌ Unexpected JSONL rows: {rows}, resumed {resumed}")
+            passed = False
+
+        checkpoint = Checkpoint(csv_path, "games", directory)
+        checkpoint.save(rows[0][0], 1, 0, 0)
+        saved = checkpoint.load()
+        other = Checkpoint(jsonl_path, "games", directory)
+        checkpoint.clear()
+        if saved.get("offset") == rows[0][0] and other.load() == {} and checkpoint.load() == {}:
+            logger.info("   ✅ Checkpoint saved, loaded and cleared")
+        else:
+            logger.error(f"   ❌ Unexpected checkpoint state: {saved}")
+            passed = False
+
+    return passed
+
+
 def main():
     """Main test function"""
     logger.info("🎮 Testing Services Layer")
 
+    if not test_import_parsing():
+        logger.error("💥 Import parsing tests failed")
+        return False
+
     # Load configuration and connect
     config = DatabaseConfig.from_environment()
     connection = Neo4jConnection(config)
@@ -0,0 +1,21 @@
+"""
+Batching utilities
+"""
+
+from itertools import islice
+from typing import Iterable, Iterator, List, TypeVar
+
+T = TypeVar('T')
+
+
+def chunked(iterable: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Split an iterable into lists of at most `size` items without materializing it"""
+    if size <= 0:
+        raise ValueError("Chunk size must be positive")
+
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
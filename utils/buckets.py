@@ -0,0 +1,18 @@
+"""
+Bucket edges and labels shared by the services, insights and columnar analytics
+"""
+
+from bisect import bisect_right
+from typing import Sequence
+
+# Game price ranges: Budget below 20, Mid-range below 40, Premium below 60, AAA from 60
+PRICE_RANGE_EDGES = (20.0, 40.0, 60.0)
+PRICE_RANGE_LABELS = ("Budget", "Mid-range", "Premium", "AAA")
+# Player level categories: Beginner below 10, Intermediate below 25, Advanced below 50, Expert from 50
+PLAYER_LEVEL_EDGES = (10, 25, 50)
+PLAYER_LEVEL_LABELS = ("Beginner", "Intermediate", "Advanced", "Expert")
+
+
+def bucket_label(value: float, edges: Sequence[float], labels: Sequence[str]) -> str:
+    """Label of the bucket holding value: labels[i] for edges[i-1] <= value < edges[i]"""
+    return labels[bisect_right(edges, value)]
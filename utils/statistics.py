@@ -0,0 +1,73 @@
+"""
+Descriptive statistics helpers shared by the Cypher aggregates and the offline fold
+"""
+
+import math
+import statistics
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+# Percentiles reported by every statistics call unless callers ask for more
+DEFAULT_PERCENTILES = (0.25, 0.5, 0.75)
+
+
+def merge_percentiles(base: Sequence[float], extra: Optional[Iterable[float]] = None) -> List[float]:
+    """Combine the default percentiles with caller extras, validated and sorted"""
+    merged = sorted(set(base) | set(extra or ()))
+    for percentile in merged:
+        if not 0.0 <= percentile <= 1.0:
+            raise ValueError(f"Percentile must be between 0 and 1, got {percentile}")
+    return merged
+
+
+def percentile_key(percentile: float) -> str:
+    """Readable key for a percentile: 0.5 -> 'p50', 0.999 -> 'p99.9'"""
+    return f"p{percentile * 100:g}"
+
+
+def percentile_parameters(percentiles: Sequence[float]) -> Dict[str, float]:
+    """Query parameters for the $percentile_<i> placeholders of a statistics query"""
+    return {f"percentile_{i}": percentile for i, percentile in enumerate(percentiles)}
+
+
+def percentile_cont(sorted_values: Sequence[float], percentile: float) -> Optional[float]:
+    """Linear-interpolated percentile, matching Cypher's percentileCont"""
+    if not sorted_values:
+        return None
+    position = percentile * (len(sorted_values) - 1)
+    lower, upper = math.floor(position), math.ceil(position)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def describe_from_record(record: Dict[str, Any], alias: str, percentiles: Sequence[float]) -> Dict[str, Any]:
+    """Collect the <alias>_* columns of a statistics query into a summary"""
+    return {
+        "sum": record[f"{alias}_sum"],
+        "avg": record[f"{alias}_avg"],
+        "min": record[f"{alias}_min"],
+        "max": record[f"{alias}_max"],
+        "stdev": record[f"{alias}_stdev"],
+        "percentiles": {
+            percentile_key(percentile): record[f"{alias}_percentile_{i}"]
+            for i, percentile in enumerate(percentiles)
+        }
+    }
+
+
+def describe(values: Iterable[float], percentiles: Sequence[float]) -> Dict[str, Any]:
+    """Summarize values in Python with the same shape and semantics as the Cypher aggregates"""
+    ordered = sorted(values)
+    if not ordered:
+        return {"sum": 0, "avg": None, "min": None, "max": None, "stdev": None, "percentiles": {}}
+
+    return {
+        "sum": sum(ordered),
+        "avg": statistics.fmean(ordered),
+        "min": ordered[0],
+        "max": ordered[-1],
+        # stDev() in Cypher is the sample standard deviation and 0 for a single value
+        "stdev": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        "percentiles": {
+            percentile_key(percentile): percentile_cont(ordered, percentile)
+            for percentile in percentiles
+        }
+    }